@@ -0,0 +1,58 @@
+"""
+一時ファイル＋rename によるファイルの書き込み
+
+書き込み途中でプロセスが落ちても、書き込み先には古い内容か新しい内容の
+どちらかだけが残る（途中までしか書かれていないファイルは残らない）。
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+
+def _file_mode(path):
+    try:
+        return path.stat().st_mode & 0o777
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+@contextmanager
+def atomic_open(path, mode='w', **kwargs):
+    """書き込み用に一時ファイルを開き、正常に閉じたときだけ path に置き換える
+
+    例:
+        with atomic_open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows(rows)
+    """
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        # mkstemp は所有者だけが読める 0600 で作るため、既存のファイルか umask に合わせる
+        os.chmod(tmp_path, _file_mode(path))
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_bytes(path, data):
+    """バイト列を書き込む"""
+    with atomic_open(path, 'wb') as f:
+        f.write(data)
+
+
+def atomic_write_text(path, text, encoding='utf-8'):
+    """文字列を書き込む"""
+    with atomic_open(path, 'w', encoding=encoding, newline='') as f:
+        f.write(text)
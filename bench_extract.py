@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+kanji_extract の抽出エンジンのベンチマーク
+
+保存済みのページ（またはレベルの mappings.csv から生成したフィクスチャページ）に対して、
+従来の h3 兄弟要素走査と新しい抽出エンジン（html.parser / lxml / ストリーミング）を実行し、
+所要時間を比較する。全ての方式の結果が一致することも確認する。
+生成したフィクスチャは --save-fixture を指定しなければ一時ファイルに書き、終了時に消す。
+
+なお html.parser での新しい抽出エンジンは従来の走査より速くなるとは限らない
+（レベル7のフィクスチャで 256 ms 対 220 ms と遅くなった環境も、ほぼ同じ環境もある）。
+速くなるのは lxml とストリーミングの方式で、html.parser は lxml が無い環境の代わりに使う。
+
+使用方法:
+    python bench_extract.py [保存済みページ.html] [--repeat N]
+
+例:
+    python bench_extract.py
+    python bench_extract.py --save-fixture /tmp/level7_fixture.html
+    python bench_extract.py /tmp/level7_fixture.html --repeat 5
+"""
+
+import argparse
+import csv
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+import kanji_extract
+from kanji_extract import KanjiRecord, extract_reading_from_h3
+
+BASE_URL = 'https://w.atwiki.jp/yuia_sk/pages/16.html'
+
+
+def legacy_extract_records(html_content, base_url):
+    """従来の scrape_kanji_data と同じ走査（h3ごとに next_sibling を辿る）"""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    records = []
+    for idx, h3 in enumerate(soup.find_all('h3'), start=1):
+        match = re.match(r'^ID:(\d{4})', h3.get_text(strip=True))
+        if not match:
+            continue
+        reading = extract_reading_from_h3(h3)
+        if not reading:
+            continue
+
+        image_url = None
+        main_div = None
+        current = h3.next_sibling
+        while current:
+            if hasattr(current, 'name') and current.name == 'h3':
+                break
+            if hasattr(current, 'name') and current.name and not image_url:
+                if current.name == 'div':
+                    main_div = current
+                img_tag = None
+                picture = current.find('picture') if current.name != 'picture' else current
+                if picture:
+                    img_tag = picture.find('img')
+                if not (img_tag and img_tag.get('src')):
+                    img_tag = current.find('img') if current.name != 'img' else current
+                if img_tag and img_tag.get('src'):
+                    src = img_tag.get('src')
+                    if src.startswith('//'):
+                        src = 'https:' + src
+                    image_url = urljoin(base_url, src)
+                    texts = []
+                    if main_div:
+                        for child in main_div.children:
+                            if isinstance(child, str):
+                                text = child.strip()
+                                if text and not text.startswith('<!--'):
+                                    texts.append(text)
+                    records.append(KanjiRecord(idx, match.group(1), reading, image_url, '　'.join(texts)))
+            current = current.next_sibling
+    return records
+
+
+def build_fixture(mappings_csv):
+    """mappings.csv から atwiki と同じ構造のページを生成する"""
+    with open(mappings_csv, 'r', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+
+    parts = ['<!DOCTYPE html><html><head><meta charset="utf-8"><title>fixture</title></head>',
+             '<body><div id="wikibody"><h2>一覧</h2>']
+    for i, row in enumerate(rows, start=1):
+        reading = re.sub(r"'([^']*)'", r'<span style="color: #F54738;">\1</span>', row.get('reading', ''))
+        parts.append(f'<h3 id="id_{i:04d}">ID:{i:04d}<br /><!--@@@@@-->{reading}</h3>')
+        src = f'//img.atwiki.jp/yuia_sk/attach/16/{i}/ID{i:04d}.png'
+        info = row.get('additional_info', '')
+        if i % 3 == 0:
+            parts.append(f'<div><a href="{src}"><img src="{src}" alt="" /></a><br />{info}</div>')
+        else:
+            parts.append(f'<div>\n<picture><source srcset="{src}" type="image/png" />'
+                         f'<img src="{src}" alt="" /></picture>\n{info}\n</div>')
+        parts.append('<p><br /></p>')
+    parts.append('<h3>コメント</h3><div>-</div></div></body></html>')
+    return '\n'.join(parts)
+
+
+def bench(label, func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"  {label:<28} {best * 1000:9.1f} ms  ({len(result)}件)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='抽出エンジンのベンチマーク')
+    parser.add_argument('page', nargs='?', help='保存済みのページ (省略時は mappings.csv から生成)')
+    parser.add_argument('--mappings', default='public/kanji/level-7/mappings.csv',
+                        help='フィクスチャ生成に使う mappings.csv')
+    parser.add_argument('--save-fixture', help='生成したフィクスチャページの保存先')
+    parser.add_argument('--repeat', type=int, default=3, help='各方式の繰り返し回数 (最良値を表示)')
+    args = parser.parse_args()
+
+    temporary = None
+    if args.page:
+        page_path = args.page
+    else:
+        html = build_fixture(args.mappings)
+        if args.save_fixture:
+            page_path = args.save_fixture
+        else:
+            fd, page_path = tempfile.mkstemp(suffix='.html')
+            os.close(fd)
+            temporary = page_path
+        Path(page_path).write_text(html, encoding='utf-8')
+        print(f"フィクスチャを生成: {page_path}")
+
+    try:
+        with open(page_path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        print(f"ページ: {page_path} ({len(html.encode('utf-8')) / 1024:.0f} KB)\n")
+
+        results = {
+            'legacy (h3 sibling walk)': bench('legacy (h3 sibling walk)', lambda: legacy_extract_records(html, BASE_URL), args.repeat),
+            'html.parser': bench('html.parser', lambda: kanji_extract.extract_records(html, BASE_URL, 'html.parser'), args.repeat),
+        }
+        if kanji_extract.etree is not None:
+            results['lxml'] = bench('lxml', lambda: kanji_extract.extract_records(html, BASE_URL, 'lxml'), args.repeat)
+            results['lxml streaming'] = bench(
+                'lxml streaming', lambda: kanji_extract.extract_records_streaming(page_path, BASE_URL), args.repeat)
+        else:
+            print("  (lxml が無いため lxml / ストリーミングは省略)")
+
+        # 抽出エンジンは画像のあるレコードだけを比較する（従来の走査と同じ条件）
+        expected = results.pop('legacy (h3 sibling walk)')
+        ok = True
+        for label, records in results.items():
+            records = [r for r in records if r.reading and r.image_url]
+            if records != expected:
+                print(f"\n✗ {label} の結果が従来の走査と一致しません")
+                ok = False
+        if ok:
+            print("\n✓ 全ての方式で結果が一致しました")
+    finally:
+        if temporary:
+            os.unlink(temporary)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
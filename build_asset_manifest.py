@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Service Worker 用の資産の一覧（asset-manifest.json）を作るスクリプト
+
+public/sw.js はこれまで画像を CACHE_NAME ('kanji-images-v2') のキャッシュに入れ、
+画像を差し替えるたびに CACHE_NAME を手で上げてキャッシュ全体を捨てていた
+（上げ忘れると古い画像が表示され続ける）。
+このスクリプトはビルドの出力（dist）の kanji・images・nazo・voice の画像と音声を走査し、
+dist/asset-manifest.json に内容のハッシュと大きさを書き出す。
+
+    {
+      "format": 1,
+      "version": "<全体のハッシュ>",
+      "files": {"/kanji/level-7/images/1_xxx.png": ["<内容のハッシュ>", <バイト数>], ...},
+      "groups": {"level-7": ["/kanji/level-7/images/1_xxx.webp", ...],
+                 "level-7-thumbs": ["/kanji/level-7/thumbs/1_xxx.webp", ...], ...}
+    }
+
+Service Worker は前回の一覧と比べて、ハッシュが変わった・無くなったファイルだけをキャッシュから消す。
+groups はレベルごとにアプリが表示する画像（mappings.csv の webp / path 列）と
+サムネイル（thumb 列）の一覧で、サムネイルはレベルを選んだときに、画像は利用者が
+「画像を保存」を押したときに先読みする（src/utils/precache.ts）。
+
+npm run build の後（package.json の postbuild）にビルドの出力（dist）に対して実行する。
+asset-manifest.json も圧縮されるように precompress_assets.py より前に実行する。
+
+使用方法:
+    python build_asset_manifest.py [--public dist] [--check]
+"""
+
+import argparse
+import hashlib
+import json
+import posixpath
+import sys
+from pathlib import Path
+
+from atomic_io import atomic_write_text
+from compile_levels import filename_column
+from mappings_io import read_mappings
+from merge_level import file_sha256
+from pipeline_stats import STATS, add_stats_arguments, finish_stats, log, start_stats
+
+# 出力の形式を変えたら上げる（sw.js の ASSET_MANIFEST_FORMAT も合わせる）
+FORMAT_VERSION = 1
+OUTPUT_NAME = 'asset-manifest.json'
+ROOTS = ['kanji', 'images', 'nazo', 'voice']
+# キャッシュの対象（CSV などのデータはハッシュ入りの名前で配信する。precompress_assets.py を参照）
+ASSET_SUFFIXES = {'.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.svg', '.mp3', '.opus', '.ogg', '.m4a'}
+HASH_LENGTH = 12
+
+
+def iter_assets(public_dir):
+    """public/ からの URL の順に資産のファイルを返す"""
+    for root in ROOTS:
+        for path in sorted((public_dir / root).rglob('*')):
+            rel = path.relative_to(public_dir)
+            # .image_store/ などの隠しディレクトリ・作業用ファイルは配信しない
+            if any(part.startswith('.') for part in rel.parts):
+                continue
+            if path.is_file() and path.suffix.lower() in ASSET_SUFFIXES:
+                yield '/' + rel.as_posix(), path
+
+
+def _image_url(base_url, path):
+    if not path:
+        return ''
+    # image_store.py --dedupe は他のレベルの画像を ../level-7/... で指す
+    return path if path.startswith('/') else posixpath.normpath(f'{base_url}/{path}')
+
+
+def level_image_urls(header, rows, base_url):
+    """行ごとに (画像の URL, サムネイルの URL) を返す（dataLoader.ts の imageUrl / thumbUrl と同じ対応）"""
+    filename_field = filename_column(header)
+    urls = []
+    for raw in rows:
+        d = {name.strip().lower(): value.strip() for name, value in raw.items()}
+        urls.append((_image_url(base_url, d.get('webp') or d.get(filename_field, '')),
+                     _image_url(base_url, d.get('thumb', ''))))
+    return urls
+
+
+def level_groups(public_dir, files):
+    """レベルごとにアプリが表示する画像の URL の一覧を返す（サムネイルは level-N-thumbs に分ける）"""
+    groups = {}
+    for csv_path in sorted((public_dir / 'kanji').glob('level-*/mappings.csv')):
+        level_dir = csv_path.parent
+        header, rows = read_mappings(csv_path)
+        base_url = '/' + level_dir.relative_to(public_dir).as_posix()
+        images = []
+        thumbs = []
+        for image_url, thumb_url in level_image_urls(header, rows, base_url):
+            for url, urls in ((thumb_url, thumbs), (image_url, images)):
+                if url in files and url not in urls:
+                    urls.append(url)
+        groups[level_dir.name] = images
+        groups[f'{level_dir.name}-thumbs'] = thumbs
+    return groups
+
+
+def build_manifest(public_dir):
+    public_dir = Path(public_dir)
+    files = {}
+    for url, path in iter_assets(public_dir):
+        with STATS.timer('hash'):
+            files[url] = [file_sha256(path)[:HASH_LENGTH], path.stat().st_size]
+        STATS.count('files')
+    groups = level_groups(public_dir, files)
+    version = hashlib.sha256(json.dumps([FORMAT_VERSION, files, groups]).encode('utf-8')).hexdigest()[:16]
+    return {'format': FORMAT_VERSION, 'version': version, 'files': files, 'groups': groups}
+
+
+def read_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Service Worker 用の資産の一覧 (asset-manifest.json) を作ります')
+    parser.add_argument('--public', default='dist', help='ビルドの出力ディレクトリ (既定: dist)')
+    parser.add_argument('--check', action='store_true', help='書き出さずに一覧が最新か確認する')
+    add_stats_arguments(parser)
+    args = parser.parse_args()
+
+    public_dir = Path(args.public)
+    if not public_dir.is_dir():
+        print(f"✗ {public_dir} がありません（先に npm run build を実行してください）")
+        sys.exit(1)
+
+    start_stats('build_asset_manifest', args)
+    out_path = public_dir / OUTPUT_NAME
+    manifest = build_manifest(public_dir)
+    previous = read_manifest(out_path)
+
+    if args.check:
+        if not previous or previous.get('version') != manifest['version']:
+            print(f"✗ {out_path} が {public_dir} の資産と一致しません")
+            finish_stats(args)
+            sys.exit(1)
+        print(f"✓ {out_path}: 最新 (version {manifest['version']})")
+        finish_stats(args)
+        return
+
+    # 前回からの差分（Service Worker がキャッシュから消すファイル）
+    old_files = (previous or {}).get('files', {})
+    changed = [url for url, entry in manifest['files'].items() if url in old_files and old_files[url] != entry]
+    removed = [url for url in old_files if url not in manifest['files']]
+    added = [url for url in manifest['files'] if url not in old_files]
+    for url in changed:
+        log(f"  変更: {url}")
+    for url in removed:
+        log(f"  削除: {url}")
+
+    with STATS.timer('write'):
+        text = json.dumps(manifest, ensure_ascii=False, separators=(',', ':'))
+        atomic_write_text(out_path, text)
+    total = sum(size for _, size in manifest['files'].values())
+    groups = ', '.join(f"{name} {len(urls)} 件" for name, urls in manifest['groups'].items())
+    print(f"✓ {out_path}: {len(manifest['files'])} ファイル ({total / 1024 / 1024:.1f} MB), "
+          f"一覧 {len(text.encode('utf-8')) // 1024} KB (version {manifest['version']})")
+    if groups:
+        print(f"  先読みの一覧: {groups}")
+    if previous:
+        print(f"  前回から 追加 {len(added)} / 変更 {len(changed)} / 削除 {len(removed)} 件")
+    finish_stats(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+全レベルの構成要素の転置索引（component-index.json）を作るスクリプト
+
+一覧表示の構成要素検索（SEARCH_FEATURE_GUIDE.md）は、検索のたびに読み込んだレベルの全ての行の
+components 列を空白で分けて調べている。このスクリプトは public/kanji/level-*/mappings.csv の
+components 列（全角・半角の空白区切り）を読み、構成要素ごとに含む行とその個数の一覧を
+public/kanji/component-index.json に書き出す。
+
+    {
+      "format": 2,
+      "version": "<入力のハッシュ>",
+      "levels": {"level-7": {"offset": 0, "count": 620, "version": "<mappings.csv のハッシュ>"}, ...},
+      "components": {"火": [行の通し番号, 個数, 行の通し番号, 個数, ...], ...},  // 通し番号の昇順
+      "substrings": {"にょう": ["しんにょう", ...], ...}
+    }
+
+行の通し番号は levels の offset + レベル内の行番号。levels の version は level.json と同じ
+mappings.csv のハッシュで、アプリは読み込んだデータと違うレベルでは索引を使わない。
+検索語は空白で区切ると AND 検索になり、各語は従来どおり構成要素の部分一致で調べる
+（しんにょう は にょう でも見つかる）。同じ語を繰り返すと、その個数以上含む行だけに絞る
+（火 火 → 炎）。substrings は構成要素の部分文字列 → それを含む構成要素の一覧で、
+部分文字列がその構成要素自身だけの場合（多くの1文字の構成要素）は省く。検索語ごとに
+substrings（無ければ components の同じ名前）を引くため、全ての構成要素を調べずに済み、
+一致する構成要素の行の一覧の長さに比例した時間で済む。
+ComponentIndex クラスは src/utils/componentIndex.ts と同じ検索を Python で行う（確認用）。
+
+使用方法:
+    python build_component_index.py [--public public] [--check]
+    python build_component_index.py --public dist   # npm run build の後（package.json の postbuild）
+    python build_component_index.py --query '火 火'
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import unicodedata
+from collections import Counter
+from pathlib import Path
+
+from atomic_io import atomic_write_text
+from mappings_io import mappings_version, read_mappings
+from pipeline_stats import STATS, add_stats_arguments, finish_stats, start_stats
+
+# 出力の形式を変えたら上げる（componentIndex.ts の COMPONENT_INDEX_FORMAT も合わせる）
+FORMAT_VERSION = 2
+OUTPUT_NAME = 'kanji/component-index.json'
+
+
+def fold(text):
+    """検索用に正規化する（全角・半角の統一、小文字化）"""
+    return unicodedata.normalize('NFKC', text).strip().lower()
+
+
+def split_components(text):
+    """components 列・検索語を構成要素に分ける（str.split は全角の空白でも区切る）"""
+    return [c for c in fold(text or '').split() if c]
+
+
+def build_index(public_dir):
+    public_dir = Path(public_dir)
+    levels = {}
+    postings = {}
+    version = hashlib.sha256(f'{FORMAT_VERSION}'.encode('ascii'))
+    offset = 0
+    for csv_path in sorted((public_dir / 'kanji').glob('level-*/mappings.csv')):
+        version.update(csv_path.read_bytes())
+        _, rows = read_mappings(csv_path)
+        for row, raw in enumerate(rows):
+            # 末尾の空の列（ヘッダーが空）は無視する
+            components = next((v for k, v in raw.items() if k and k.strip().lower() == 'components'), '')
+            for component, count in Counter(split_components(components)).items():
+                postings.setdefault(component, []).extend([offset + row, count])
+                STATS.count('postings')
+        levels[csv_path.parent.name] = {'offset': offset, 'count': len(rows), 'version': mappings_version(csv_path)}
+        offset += len(rows)
+
+    return {
+        'format': FORMAT_VERSION,
+        'version': version.hexdigest()[:16],
+        'levels': levels,
+        'components': dict(sorted(postings.items())),
+        'substrings': substring_map(postings),
+    }
+
+
+def substring_map(components):
+    """{部分文字列: [それを含む構成要素...]}。構成要素自身だけを含む部分文字列は省く"""
+    found = {}
+    for component in sorted(components):
+        for start in range(len(component)):
+            for end in range(start + 1, len(component) + 1):
+                containing = found.setdefault(component[start:end], [])
+                if component not in containing:
+                    containing.append(component)
+    return {sub: names for sub, names in sorted(found.items()) if names != [sub]}
+
+
+class ComponentIndex:
+    """component-index.json を使った検索（componentIndex.ts と同じ結果を返す）"""
+
+    def __init__(self, index):
+        self.index = index
+        self.components = index['components']
+        self.substrings = index['substrings']
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def matching(self, term):
+        """term を含む構成要素の一覧"""
+        if term in self.substrings:
+            return self.substrings[term]
+        return [term] if term in self.components else []
+
+    def counts(self, term):
+        """term を含む構成要素ごとの個数を行ごとに足した {通し番号: 個数} を返す"""
+        found = {}
+        for component in self.matching(term):
+            flat = self.components[component]
+            for i in range(0, len(flat), 2):
+                found[flat[i]] = found.get(flat[i], 0) + flat[i + 1]
+        return found
+
+    def search(self, query):
+        """構成要素に検索語を全て含む行を [(レベル, 行番号)] で返す"""
+        terms = Counter(split_components(query))
+        if not terms:
+            return []
+        matches = []
+        for term, need in terms.items():
+            found = self.counts(term)
+            matches.append({n for n, count in found.items() if count >= need})
+        rows = None
+        # 候補の少ない語から絞り込む
+        for found in sorted(matches, key=len):
+            rows = found if rows is None else rows & found
+            if not rows:
+                break
+        return sorted(self.locate(n) for n in rows)
+
+    def locate(self, n):
+        """行の通し番号を (レベル, 行番号) にする"""
+        for name, level in self.index['levels'].items():
+            if level['offset'] <= n < level['offset'] + level['count']:
+                return name, n - level['offset']
+        raise IndexError(n)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='全レベルの構成要素の転置索引を作ります')
+    parser.add_argument('--public', default='public', help='公開ディレクトリ (既定: public)')
+    parser.add_argument('--check', action='store_true', help='書き出さずに索引が最新か確認する')
+    parser.add_argument('--query', help="書き出した索引で検索して結果を表示する（空白区切りで AND 検索）")
+    add_stats_arguments(parser)
+    args = parser.parse_args()
+
+    start_stats('build_component_index', args)
+    out_path = Path(args.public) / OUTPUT_NAME
+
+    if args.query:
+        index = ComponentIndex.load(out_path)
+        with STATS.timer('search'):
+            hits = index.search(args.query)
+        components = {}
+        for name, row in hits:
+            if name not in components:
+                _, rows = read_mappings(Path(args.public) / 'kanji' / name / 'mappings.csv')
+                components[name] = [(r.get('reading', ''), r.get('components', '')) for r in rows]
+            reading, parts = components[name][row]
+            print(f"  {name} {row}: {reading} [{parts}]")
+        print(f"✓ {len(hits)} 件")
+        finish_stats(args)
+        return
+
+    with STATS.timer('build'):
+        index = build_index(args.public)
+    if args.check:
+        try:
+            with open(out_path, 'r', encoding='utf-8') as f:
+                current = json.load(f).get('version') == index['version']
+        except (OSError, ValueError):
+            current = False
+        print(f"✓ {out_path}: 最新 (version {index['version']})" if current
+              else f"✗ {out_path} が mappings.csv と一致しません")
+        finish_stats(args)
+        sys.exit(0 if current else 1)
+
+    with STATS.timer('write'):
+        text = json.dumps(index, ensure_ascii=False, separators=(',', ':'))
+        atomic_write_text(out_path, text)
+    rows = sum(level['count'] for level in index['levels'].values())
+    frequent = sorted(index['components'].items(), key=lambda c: -len(c[1]))[:5]
+    print(f"✓ {out_path}: {len(index['levels'])} レベル {rows} 行, 構成要素 {len(index['components'])} 種 "
+          f"({len(text.encode('utf-8')) // 1024} KB, version {index['version']})")
+    print("  多い構成要素: " + ', '.join(f"{c} {len(flat) // 2} 行" for c, flat in frequent))
+    finish_stats(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+四択問題の誤答（読みの似た選択肢）の表（distractors.json）をレベルごとに作るスクリプト
+
+問題モードの四択（QuizMode.tsx の generateChoices）は、問題ごとにレベルの全ての問題から
+誤答を無作為に3つ選んでいるため、読みが全く似ていない選択肢になりやすい。
+このスクリプトは public/kanji/level-*/mappings.csv の読みごとに、送り仮名を除いた読みが
+  1. 拍（モーラ、きょ・っ・ん・ー を1拍とする）の編集距離
+  2. 拍の数の差
+  3. 母音の並び（けむ → eu）の編集距離
+  4. 仮名の編集距離
+の順に近い他の読みを k 個選び、レベルのディレクトリの distractors.json に書き出す。
+
+    {
+      "format": 2,
+      "version": "<mappings.csv のハッシュ>",
+      "k": 6,
+      "distractors": {"あや'しい'": ["あやつ", "あか", ...], ...}  // 読み → 選択肢の表示（readingCore）
+    }
+
+正解の読みの候補（「、」区切り）と同じになる選択肢は除く（正解が2つある問題にしない）。
+近い読みは拍の数ごとの拍の編集距離の BK 木で探す。ただし読みの多くは互いの距離が 1〜4 に集まり
+枝をあまり刈れないため、距離の計算の回数は全ての組とほぼ変わらない（level-7 では全ての組 約35万に対して
+約28万回）。速さは主に編集距離のビット並列化（edit_distance）による。
+アプリは表から3つを選び、表が無い・読みが載っていない場合は従来どおり無作為に選ぶ。
+version は level.json と同じ mappings.csv のハッシュで、アプリは読み込んだデータと一致しない表を使わない。
+
+使用方法:
+    python build_distractors.py [public/kanji/level-7 ...] [--public public] [--k 6] [--check]
+    python build_distractors.py public/kanji/level-7 --show "あや'しい'"
+    python build_distractors.py --public dist   # npm run build の後（package.json の postbuild）
+"""
+
+import argparse
+import json
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+from atomic_io import atomic_write_text
+from build_search_index import fold
+from compile_levels import accepted_readings, extract_reading_core
+from mappings_io import mappings_version, read_mappings
+from pipeline_stats import STATS, add_stats_arguments, finish_stats, start_stats
+
+# 出力の形式を変えたら上げる（dataLoader.ts の DISTRACTOR_FORMAT も合わせる）
+FORMAT_VERSION = 2
+OUTPUT_NAME = 'distractors.json'
+DEFAULT_K = 6
+# 前の仮名と合わせて1拍になる小書きの仮名（fold でひらがなに揃えた後）
+SMALL_KANA = set('ぁぃぅぇぉゃゅょゎゕゖ')
+IGNORED_CHARS = set("'・ 　")
+# 拍の母音（拍の最後の仮名で決まる。ん・っ・ー はそのまま）
+VOWELS = {c: v for v, kana in {
+    'a': 'ぁあかがさざただなはばぱまゃやらゎわ',
+    'i': 'ぃいきぎしじちぢにひびぴみりゐ',
+    'u': 'ぅうくぐすずつづぬふぶぷむゅゆるゔ',
+    'e': 'ぇえけげせぜてでねへべぺめれゑ',
+    'o': 'ぉおこごそぞとどのほぼぽもょよろを',
+}.items() for c in kana}
+
+
+def morae(text):
+    """仮名の文字列を拍の一覧にする（きょう → [きょ, う]）"""
+    result = []
+    for c in text:
+        if c in SMALL_KANA and result:
+            result[-1] += c
+        else:
+            result.append(c)
+    return result
+
+
+@lru_cache(maxsize=4096)
+def _match_masks(a):
+    masks = {}
+    for i, c in enumerate(a):
+        masks[c] = masks.get(c, 0) | (1 << i)
+    return masks
+
+
+def edit_distance(a, b):
+    """編集距離（a, b は文字列でも拍のタプルでもよい）。Myers のビット並列法で1文字ずつ1列をまとめて計算する"""
+    if not a:
+        return len(b)
+    masks = _match_masks(a)
+    full = (1 << len(a)) - 1
+    last = 1 << (len(a) - 1)
+    vp, vn, score = full, 0, len(a)
+    for c in b:
+        eq = masks.get(c, 0)
+        xv = eq | vn
+        xh = (((eq & vp) + vp) ^ vp) | eq
+        hp = (vn | ~(xh | vp)) & full
+        hn = vp & xh
+        if hp & last:
+            score += 1
+        elif hn & last:
+            score -= 1
+        hp = (hp << 1) | 1
+        hn <<= 1
+        vp = (hn | ~(xv | hp)) & full
+        vn = hp & xv
+    return score
+
+
+def vowel_pattern(key):
+    """拍の一覧の母音の並び（けむ → eu）。母音の並びが同じ読みは聞き間違えやすい"""
+    return ''.join(VOWELS.get(mora[-1], mora[-1]) for mora in key)
+
+
+def reading_options(reading):
+    """読みの候補（「、」区切り）ごとの、送り仮名を除いて正規化した読み"""
+    options = []
+    for option in reading.split('、'):
+        core = ''.join(c for c in fold(extract_reading_core(option)) if c not in IGNORED_CHARS)
+        if core and core not in options:
+            options.append(core)
+    return options
+
+
+class BKTree:
+    """拍の編集距離の BK 木"""
+
+    def __init__(self, distance):
+        self.distance = distance
+        self.root = None
+
+    def add(self, key, value):
+        if self.root is None:
+            self.root = (key, [value], {})
+            return
+        node = self.root
+        while True:
+            STATS.count('distance')
+            d = self.distance(key, node[0])
+            if d == 0:
+                node[1].append(value)
+                return
+            if d not in node[2]:
+                node[2][d] = (key, [value], {})
+                return
+            node = node[2][d]
+
+    def nearest(self, key, k, accept=lambda value: True, found=()):
+        """accept を満たす値を近い順に k 個（k 個目と同じ距離のものは全て）(距離, 値) で返す。
+        found に他の木で見つけた分を渡すと、それと合わせた k 個を返す"""
+        found = sorted(found, key=lambda f: f[0])
+        radius = found[k - 1][0] if len(found) >= k else float('inf')
+        stack = [self.root] if self.root else []
+        visited = 0
+        while stack:
+            node = stack.pop()
+            d = self.distance(key, node[0])
+            visited += 1
+            if d <= radius:
+                added = [(d, value) for value in node[1] if accept(value)]
+                if added:
+                    found.extend(added)
+                    if len(found) >= k:
+                        found.sort(key=lambda f: f[0])
+                        radius = found[k - 1][0]
+                        found = [f for f in found if f[0] <= radius]
+            # 三角不等式により |d - 子の距離| <= radius の子だけを調べる
+            stack.extend(child for dist, child in node[2].items() if d - radius <= dist <= d + radius)
+        STATS.count('distance', visited)
+        return sorted(found, key=lambda f: f[0])
+
+
+def build_table(readings, k=DEFAULT_K):
+    """{読み: [選択肢の表示, ...]} を返す"""
+    # 選択肢の表示（readingCore）ごとに1つ
+    choices = {}
+    for reading in readings:
+        display = extract_reading_core(reading)
+        options = reading_options(reading)
+        if options and display not in choices:
+            choices[display] = (options, tuple(morae(options[0])))
+
+    # 拍の数ごとの木にする。拍の数の差は編集距離の下限なので、差の大きい木は調べずに済む
+    trees = {}
+    for display, (_, key) in choices.items():
+        trees.setdefault(len(key), BKTree(edit_distance)).add(key, display)
+
+    table = {}
+    for reading in dict.fromkeys(readings):
+        options = reading_options(reading)
+        if not options:
+            continue
+        key = tuple(morae(options[0]))
+        own = extract_reading_core(reading)
+        # 正解と同じ答えになる選択肢は除く
+        correct = {fold(a) for a in accepted_readings(reading)} | set(options)
+        accept = lambda display: display != own and not correct.intersection(choices[display][0])
+        found = []
+        for length in sorted(trees, key=lambda n: abs(n - len(key))):
+            if len(found) >= k and abs(length - len(key)) > found[k - 1][0]:
+                break
+            found = trees[length].nearest(key, k, accept, found)
+        ranked = sorted(found, key=lambda f: (
+            f[0],
+            abs(len(choices[f[1]][1]) - len(key)),
+            edit_distance(vowel_pattern(key), vowel_pattern(choices[f[1]][1])),
+            edit_distance(options[0], choices[f[1]][0][0]),
+            f[1],
+        ))
+        table[reading] = [display for _, display in ranked[:k]]
+        STATS.progress('読み')
+    return table
+
+
+def build_distractors(level_dir, k=DEFAULT_K):
+    csv_path = Path(level_dir) / 'mappings.csv'
+    _, rows = read_mappings(csv_path)
+    version = mappings_version(csv_path)
+    readings = [(r.get('reading') or '').strip() for r in rows]
+    STATS.expect(len(set(readings)))
+    with STATS.timer('build'):
+        table = build_table([r for r in readings if r], k)
+    return {'format': FORMAT_VERSION, 'version': version, 'k': k, 'distractors': table}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='四択問題の読みの似た誤答の表をレベルごとに作ります')
+    parser.add_argument('levels', nargs='*', help='レベルのディレクトリ (既定: <--public>/kanji/level-*)')
+    parser.add_argument('--public', default='public', help='公開ディレクトリ (既定: public)')
+    parser.add_argument('--k', type=int, default=DEFAULT_K, help=f'読みごとに残す誤答の数 (既定: {DEFAULT_K})')
+    parser.add_argument('--check', action='store_true', help='書き出さずに表が最新か確認する')
+    parser.add_argument('--show', metavar='READING', help='書き出さずに指定した読みの誤答を表示する')
+    add_stats_arguments(parser)
+    args = parser.parse_args()
+
+    if args.k < 3:
+        print("エラー: --k は四択の誤答の数 (3) 以上にしてください")
+        sys.exit(1)
+
+    start_stats('build_distractors', args)
+    level_dirs = ([Path(d) for d in args.levels]
+                  or sorted(p.parent for p in (Path(args.public) / 'kanji').glob('level-*/mappings.csv')))
+    stale = []
+    for level_dir in level_dirs:
+        if not (level_dir / 'mappings.csv').exists():
+            print(f"✗ {level_dir}: mappings.csv がありません")
+            stale.append(level_dir)
+            continue
+        result = build_distractors(level_dir, args.k)
+        out_path = level_dir / OUTPUT_NAME
+
+        if args.show:
+            choices = result['distractors'].get(args.show)
+            print(f"  {level_dir.name}: {args.show} → {' / '.join(choices) if choices is not None else '(読みがありません)'}")
+            continue
+        if args.check:
+            try:
+                with open(out_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                current = all(data.get(key) == result[key] for key in ('format', 'version', 'k'))
+            except (OSError, ValueError):
+                current = False
+            if not current:
+                stale.append(level_dir)
+            print(f"✓ {out_path}: 最新" if current else f"✗ {out_path} が mappings.csv と一致しません")
+            continue
+
+        with STATS.timer('write'):
+            text = json.dumps(result, ensure_ascii=False, separators=(',', ':'))
+            atomic_write_text(out_path, text)
+        short = sum(1 for choices in result['distractors'].values() if len(choices) < 3)
+        print(f"✓ {out_path}: {len(result['distractors'])} 件の読み ({len(text.encode('utf-8')) // 1024} KB, "
+              f"version {result['version']})" + (f", 誤答が3つ未満 {short} 件" if short else ''))
+
+    finish_stats(args)
+    if stale:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
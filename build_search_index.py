@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+全レベルの読み・送り仮名の検索用の索引（search-index.json）を作るスクリプト
+
+一覧表示の送り仮名検索（SEARCH_FEATURE_GUIDE.md）は、検索のたびに読み込んだレベルの全ての行の
+読みを正規表現で切り出して部分一致を調べている。このスクリプトは public/kanji/level-*/mappings.csv の
+読みを「、」「,」で候補ごとに分け、
+  - full      : 読み全体（あや'しい' → あやしい）
+  - core      : 送り仮名を除いた読み（あや）
+  - okurigana : '...' で囲まれた送り仮名（しい）
+を、カタカナをひらがなに揃えてから public/kanji/search-index.json に書き出す。
+
+    {
+      "format": 2,
+      "version": "<入力のハッシュ>",
+      "kinds": ["full", "core", "okurigana"],
+      "levels": {"level-7": {"offset": 0, "count": 620, "version": "<mappings.csv のハッシュ>"}, ...},
+      "keys": [["あやしい", 0, [0]], ...],          // [文字列, kinds の番号, 行の通し番号の一覧]
+      "suffixes": [キーの番号, 開始位置, キーの番号, 開始位置, ...]  // 接尾辞の辞書順
+    }
+
+行の通し番号は levels の offset + レベル内の行番号。levels の version は level.json と同じ
+mappings.csv のハッシュで、アプリは読み込んだデータと違うレベルでは索引を使わない。
+suffixes は全てのキーの全ての接尾辞を（UTF-16 の）辞書順に並べた接尾辞配列で、
+部分一致は二分探索で範囲を求めるだけで済む（src/utils/searchIndex.ts）。
+SearchIndex クラスは同じ検索を Python で行う（テストや確認用）。
+
+使用方法:
+    python build_search_index.py [--public public] [--check]
+    python build_search_index.py --public dist   # npm run build の後（package.json の postbuild）
+    python build_search_index.py --query しい [--kind okurigana] [--prefix]
+"""
+
+import argparse
+import bisect
+import hashlib
+import json
+import re
+import sys
+import unicodedata
+from pathlib import Path
+
+from atomic_io import atomic_write_text
+from compile_levels import OKURIGANA_RE
+from mappings_io import mappings_version, read_mappings
+from pipeline_stats import STATS, add_stats_arguments, finish_stats, start_stats
+
+# 出力の形式を変えたら上げる（searchIndex.ts の SEARCH_INDEX_FORMAT も合わせる）
+FORMAT_VERSION = 2
+OUTPUT_NAME = 'kanji/search-index.json'
+KINDS = ['full', 'core', 'okurigana']
+ALTERNATE_RE = re.compile(r'[、,，]')
+OKURIGANA_SEGMENT_RE = re.compile(r"'([^']*)'")
+
+
+def fold(text):
+    """検索用に正規化する（全角・半角の統一、カタカナ → ひらがな、小文字化）"""
+    text = unicodedata.normalize('NFKC', text).strip().lower()
+    return ''.join(chr(ord(c) - 0x60) if 'ァ' <= c <= 'ヶ' else c for c in text)
+
+
+def reading_keys(reading):
+    """読みから (kinds の番号, 文字列) の集合を返す"""
+    keys = set()
+    for option in ALTERNATE_RE.split(reading):
+        option = option.strip()
+        if not option:
+            continue
+        keys.add((0, fold(option.replace("'", ''))))
+        keys.add((1, fold(OKURIGANA_RE.sub('', option))))
+        for segment in OKURIGANA_SEGMENT_RE.findall(option):
+            keys.add((2, fold(segment)))
+    return {(kind, text) for kind, text in keys if text}
+
+
+def _utf16(text):
+    # アプリ（JavaScript）の文字列の比較と同じ順に並べる
+    return text.encode('utf-16-be')
+
+
+def build_index(public_dir):
+    public_dir = Path(public_dir)
+    levels = {}
+    postings = {}
+    version = hashlib.sha256(f'{FORMAT_VERSION}'.encode('ascii'))
+    offset = 0
+    for csv_path in sorted((public_dir / 'kanji').glob('level-*/mappings.csv')):
+        version.update(csv_path.read_bytes())
+        _, rows = read_mappings(csv_path)
+        for row, raw in enumerate(rows):
+            reading = next((v for k, v in raw.items() if k.strip().lower() == 'reading'), '')
+            for key in reading_keys(reading):
+                postings.setdefault(key, []).append(offset + row)
+        levels[csv_path.parent.name] = {'offset': offset, 'count': len(rows), 'version': mappings_version(csv_path)}
+        offset += len(rows)
+
+    ordered = sorted(postings.items(), key=lambda p: (_utf16(p[0][1]), p[0][0]))
+    keys = [[text, kind, items] for (kind, text), items in ordered]
+    suffixes = sorted(((i, start) for i, (text, _, _) in enumerate(keys) for start in range(len(text))),
+                      key=lambda s: (_utf16(keys[s[0]][0][s[1]:]), s[0]))
+    return {
+        'format': FORMAT_VERSION,
+        'version': version.hexdigest()[:16],
+        'kinds': KINDS,
+        'levels': levels,
+        'keys': keys,
+        'suffixes': [n for suffix in suffixes for n in suffix],
+    }
+
+
+class SearchIndex:
+    """search-index.json を使った検索（searchIndex.ts と同じ結果を返す）"""
+
+    def __init__(self, index):
+        self.index = index
+        self.keys = index['keys']
+        flat = index['suffixes']
+        self.suffixes = list(zip(flat[0::2], flat[1::2]))
+        self._sorted = [_utf16(self.keys[k][0][start:]) for k, start in self.suffixes]
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def search(self, query, kinds=None, prefix=False):
+        """読みに query を含む（prefix なら query で始まる）行を [(レベル, 行番号)] で返す"""
+        query = fold(query)
+        if not query:
+            return []
+        kind_ids = {KINDS.index(k) for k in kinds} if kinds else set(range(len(KINDS)))
+        encoded = _utf16(query)
+        rows = set()
+        for i in range(bisect.bisect_left(self._sorted, encoded), len(self._sorted)):
+            if not self._sorted[i].startswith(encoded):
+                break
+            key_index, start = self.suffixes[i]
+            _, kind, items = self.keys[key_index]
+            if kind in kind_ids and (not prefix or start == 0):
+                rows.update(items)
+        return sorted(self.locate(n) for n in rows)
+
+    def locate(self, n):
+        """行の通し番号を (レベル, 行番号) にする"""
+        for name, level in self.index['levels'].items():
+            if level['offset'] <= n < level['offset'] + level['count']:
+                return name, n - level['offset']
+        raise IndexError(n)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='全レベルの読み・送り仮名の検索用の索引を作ります')
+    parser.add_argument('--public', default='public', help='公開ディレクトリ (既定: public)')
+    parser.add_argument('--check', action='store_true', help='書き出さずに索引が最新か確認する')
+    parser.add_argument('--query', help='書き出した索引で検索して結果を表示する')
+    parser.add_argument('--kind', action='append', choices=KINDS, help='--query で検索する種類 (複数指定可、既定: 全て)')
+    parser.add_argument('--prefix', action='store_true', help='--query を前方一致で検索する')
+    add_stats_arguments(parser)
+    args = parser.parse_args()
+
+    start_stats('build_search_index', args)
+    out_path = Path(args.public) / OUTPUT_NAME
+
+    if args.query:
+        index = SearchIndex.load(out_path)
+        with STATS.timer('search'):
+            hits = index.search(args.query, args.kind, args.prefix)
+        readings = {}
+        for name, row in hits:
+            if name not in readings:
+                _, rows = read_mappings(Path(args.public) / 'kanji' / name / 'mappings.csv')
+                readings[name] = [r.get('reading', '') for r in rows]
+            print(f"  {name} {row}: {readings[name][row]}")
+        print(f"✓ {len(hits)} 件")
+        finish_stats(args)
+        return
+
+    with STATS.timer('build'):
+        index = build_index(args.public)
+    if args.check:
+        try:
+            with open(out_path, 'r', encoding='utf-8') as f:
+                current = json.load(f).get('version') == index['version']
+        except (OSError, ValueError):
+            current = False
+        print(f"✓ {out_path}: 最新 (version {index['version']})" if current
+              else f"✗ {out_path} が mappings.csv と一致しません")
+        finish_stats(args)
+        sys.exit(0 if current else 1)
+
+    with STATS.timer('write'):
+        text = json.dumps(index, ensure_ascii=False, separators=(',', ':'))
+        atomic_write_text(out_path, text)
+    rows = sum(level['count'] for level in index['levels'].values())
+    print(f"✓ {out_path}: {len(index['levels'])} レベル {rows} 行, キー {len(index['keys'])} 件, "
+          f"接尾辞 {len(index['suffixes']) // 2} 件 ({len(text.encode('utf-8')) // 1024} KB, version {index['version']})")
+    finish_stats(args)
+
+
+if __name__ == '__main__':
+    main()
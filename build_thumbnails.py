@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+一覧表示用のサムネイルと低画質プレースホルダー (LQIP) を作るスクリプト
+
+mappings.csv に載っている画像（optimize_images.py で作った webp 列があればそちら）ごとに、
+  - thumbs/<名前>.webp   : 一覧のカード幅に合わせて縮小したサムネイル
+  - lqip                 : 読み込み中に表示する数十バイトのぼかし画像（data: URI）
+  - width / height       : 表示する画像の大きさ（読み込み前に枠の大きさを確保するため）
+を作り、mappings.csv に width / height / thumb / lqip 列を追加する。
+
+画像の内容ハッシュを <レベル>/.thumbs_manifest.json に記録し、
+内容の変わっていない画像はサムネイルを作り直さない。
+
+使用方法:
+    python build_thumbnails.py <レベルのディレクトリ>... [--workers N]
+
+例:
+    python build_thumbnails.py public/kanji/level-7 public/kanji/level-8
+"""
+
+import argparse
+import base64
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from atomic_io import atomic_open
+from image_manifest import sha256_bytes
+from mappings_io import add_columns, read_mappings, write_mappings
+from pipeline_stats import STATS, add_stats_arguments, finish_stats, log, start_stats
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+MANIFEST_NAME = '.thumbs_manifest.json'
+THUMBS_DIR = 'thumbs'
+COLUMNS = ['width', 'height', 'thumb', 'lqip']
+
+# ListMode のカード幅 160px の1.5倍（高解像度の画面向け）
+DEFAULT_THUMB_SIZE = 240
+DEFAULT_THUMB_QUALITY = 75
+LQIP_SIZE = 16
+LQIP_QUALITY = 30
+
+
+def _webp_bytes(im, quality):
+    buf = io.BytesIO()
+    im.save(buf, 'WEBP', quality=quality, method=6)
+    return buf.getvalue()
+
+
+def make_thumbnail(src_path, thumb_path, thumb_size=DEFAULT_THUMB_SIZE, quality=DEFAULT_THUMB_QUALITY):
+    """サムネイルを書き出し、元の画像の大きさと LQIP を返す（プロセスプールで実行される）"""
+    start = time.perf_counter()
+    with Image.open(src_path) as im:
+        im.load()
+        width, height = im.size
+        im = im.convert('RGBA' if 'A' in im.getbands() or 'transparency' in im.info else 'RGB')
+
+    thumb = im.copy()
+    thumb.thumbnail((thumb_size, thumb_size), Image.LANCZOS)
+    data = _webp_bytes(thumb, quality)
+    thumb_path = Path(thumb_path)
+    thumb_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = thumb_path.with_name(f'.{thumb_path.name}.{os.getpid()}.tmp')
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, thumb_path)
+
+    tiny = im.copy()
+    tiny.thumbnail((LQIP_SIZE, LQIP_SIZE), Image.BILINEAR)
+    lqip = 'data:image/webp;base64,' + base64.b64encode(_webp_bytes(tiny, LQIP_QUALITY)).decode('ascii')
+    return {
+        'width': width,
+        'height': height,
+        'thumb_bytes': len(data),
+        'lqip': lqip,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def load_manifest(level_dir):
+    try:
+        with open(Path(level_dir) / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f).get('images', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(level_dir, entries):
+    with atomic_open(Path(level_dir) / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump({'images': dict(sorted(entries.items()))}, f, ensure_ascii=False, indent=2)
+
+
+def build_level(level_dir, executor, thumb_size, quality, force=False):
+    """レベル1つ分のサムネイルを作って mappings.csv に列を追加する。失敗した件数を返す"""
+    level_dir = Path(level_dir)
+    csv_path = level_dir / 'mappings.csv'
+    header, rows = read_mappings(csv_path)
+    manifest = load_manifest(level_dir)
+    settings = {'thumb_size': thumb_size, 'quality': quality}
+
+    futures = {}
+    reused = 0
+    src_bytes = 0
+    thumb_bytes = 0
+    for row in rows:
+        # 一覧に表示する画像（WebP があればそちら）を元にする
+        src = row.get('webp') or row.get('path')
+        src_path = level_dir / (src or '')
+        if not src or not src_path.is_file():
+            print(f"  警告: 画像がありません: {src_path}")
+            continue
+        data = src_path.read_bytes()
+        src_bytes += len(data)
+        digest = sha256_bytes(data)
+        thumb = f"{THUMBS_DIR}/{Path(row['path']).stem}.webp"
+
+        entry = manifest.get(src)
+        if (not force and entry and entry.get('sha256') == digest and entry.get('settings') == settings
+                and entry.get('thumb') == thumb and (level_dir / thumb).exists()):
+            row.update({name: entry[name] for name in COLUMNS})
+            reused += 1
+            thumb_bytes += (level_dir / thumb).stat().st_size
+            continue
+        future = executor.submit(make_thumbnail, str(src_path), str(level_dir / thumb), thumb_size, quality)
+        futures[future] = (row, src, digest, thumb)
+    STATS.expect(len(futures))
+
+    failed = 0
+    for future in as_completed(futures):
+        row, src, digest, thumb = futures[future]
+        STATS.progress('サムネイル')
+        try:
+            result = future.result()
+        except Exception as e:
+            failed += 1
+            print(f"  サムネイルの作成に失敗: {src} - {e}")
+            continue
+        STATS.add_time('thumbnail', result['seconds'])
+        thumb_bytes += result['thumb_bytes']
+        entry = {'sha256': digest, 'settings': settings, 'thumb': thumb,
+                 'width': result['width'], 'height': result['height'], 'lqip': result['lqip']}
+        manifest[src] = entry
+        row.update({name: entry[name] for name in COLUMNS})
+        log(f"  {thumb}: {result['width']}x{result['height']} -> {result['thumb_bytes'] // 1024} KB")
+
+    with STATS.timer('write'):
+        write_mappings(csv_path, add_columns(header, COLUMNS), rows)
+        save_manifest(level_dir, manifest)
+
+    print(f"✓ {level_dir}: 作成 {len(futures) - failed} 枚 / 変更なし {reused} 枚 / 失敗 {failed} 枚"
+          f"  画像 {src_bytes / 1024 / 1024:.1f} MB -> サムネイル {thumb_bytes / 1024:.0f} KB")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='一覧表示用のサムネイルと LQIP を作ります')
+    parser.add_argument('levels', nargs='+', help='mappings.csv のあるレベルのディレクトリ')
+    parser.add_argument('--workers', type=int, default=None, help='変換するプロセス数 (既定: CPUコア数)')
+    parser.add_argument('--size', type=int, default=DEFAULT_THUMB_SIZE,
+                        help=f'サムネイルの長辺のピクセル数 (既定: {DEFAULT_THUMB_SIZE})')
+    parser.add_argument('--quality', type=int, default=DEFAULT_THUMB_QUALITY,
+                        help=f'サムネイルの WebP の品質 (既定: {DEFAULT_THUMB_QUALITY})')
+    parser.add_argument('--force', action='store_true', help='変更の無い画像のサムネイルも作り直す')
+    add_stats_arguments(parser)
+    args = parser.parse_args()
+
+    if Image is None:
+        print("エラー: Pillow が必要です (pip install Pillow)")
+        sys.exit(1)
+
+    start_stats('build_thumbnails', args)
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for level_dir in args.levels:
+            failed += build_level(level_dir, executor, args.size, args.quality, force=args.force)
+    finish_stats(args)
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == '__main__':
+    main()
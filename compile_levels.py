@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+各レベルの mappings.csv をアプリがそのまま使える JSON (level.json) に変換するスクリプト
+
+アプリ (src/utils/dataLoader.ts) はクイズの前に mappings.csv を取得し、
+ブラウザで1行ずつ解析・正規化している。このスクリプトはその処理を事前に行い、
+ビルドの出力（dist）の mappings.csv と同じ場所に列ごとの配列を持つ level.json を書き出す。
+
+    {
+      "format": 2,
+      "version": "<mappings.csv のハッシュ>",
+      "count": <行数>,
+      "columns": {"filename": [...], "reading": [...], "webp": [...], ...}
+    }
+
+列名はアプリの Item のフィールド名と同じで（webp / thumb は mappings.csv の値のまま）、
+列名の小文字化・値の前後の空白の除去・末尾の名前の無い列の除去・数値の変換と、
+読みから readingCore（送り仮名を除いた読み）・acceptedReadings（正解とする読み）を求める処理を済ませてある。
+readingCore・acceptedReadings は読みと同じ・[readingCore] の行では null にして大きさを抑える。
+画像の URL（webp / thumb 列があればそちらを使う）とエクストラの reading・questionType は
+列の値をつなぐだけで求められるため書き出さず、アプリが読み込むときに求める。全ての行で空の列は書き出さない。
+
+level.json は npm run build の後（package.json の postbuild）に dist にだけ書き出す。
+public には置かないため、開発サーバーや mappings.csv を更新した後に古い level.json が
+使われることはない。level.json が無い・古い形式の場合、アプリは従来どおり mappings.csv を読み込む。
+
+使用方法:
+    python compile_levels.py [レベルのディレクトリ...] [--public public] [--out dist] [--check]
+
+例:
+    npm run build   # postbuild で python compile_levels.py -q を実行する
+    python compile_levels.py public/kanji/level-7 --check
+"""
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+
+from atomic_io import atomic_write_text
+from mappings_io import mappings_version, read_mappings
+from pipeline_stats import STATS, add_stats_arguments, finish_stats, start_stats
+
+# 出力の形式を変えたら上げる（dataLoader.ts の COMPILED_FORMAT も合わせる）
+FORMAT_VERSION = 2
+OUTPUT_NAME = 'level.json'
+OKURIGANA_RE = re.compile(r"'[^']*'")
+DEFAULT_LEVELS = ['public/kanji/level-7', 'public/kanji/level-8', 'public/kanji/extra']
+
+
+def extract_reading_core(reading):
+    """送り仮名（'...'）を除いた読み（kanjiUtils.tsx の extractReadingCore と同じ）"""
+    return OKURIGANA_RE.sub('', reading)
+
+
+def accepted_readings(reading):
+    """正解とする読みの一覧（kanjiUtils.tsx の acceptedReadings と同じ）"""
+    answers = []
+    for option in reading.split('、'):
+        option = option.strip()
+        for answer in (extract_reading_core(option), option.replace("'", '')):
+            if answer not in answers:
+                answers.append(answer)
+    return answers
+
+
+def filename_column(header):
+    """行の画像のファイル名の列（dataLoader.ts と同じ: path → filename → 先頭の列）"""
+    names = [h.strip().lower() for h in header]
+    return 'path' if 'path' in names else ('filename' if 'filename' in names else names[0])
+
+
+def compiled_items(header, rows):
+    """level.json に書き出すレベルの行（URL は webp / thumb 列から、アプリが読み込むときに求める）
+
+    readingCore は読みと同じ（送り仮名が無い）場合、acceptedReadings は [readingCore] の場合に
+    None にして書き出さない。アプリはその場合だけ読み・readingCore で補う。
+    """
+    filename_field = filename_column(header)
+    items = []
+    for raw in rows:
+        d = {name.strip().lower(): value.strip() for name, value in raw.items()}
+        reading = d.get('reading', '')
+        core = extract_reading_core(reading)
+        answers = accepted_readings(reading)
+        items.append({
+            'filename': d.get(filename_field, '') or d.get('kanji', ''),
+            'reading': reading,
+            'readingCore': core if core != reading else None,
+            'acceptedReadings': answers if answers != [core] else None,
+            'meaning': d.get('meaning', ''),
+            'webp': d.get('webp', ''),
+            'thumb': d.get('thumb', ''),
+            'lqip': d.get('lqip', ''),
+            'width': int(d['width']) if d.get('width') else None,
+            'height': int(d['height']) if d.get('height') else None,
+            'kanji': d.get('kanji', ''),
+            'additionalInfo': d.get('additional_info', ''),
+            'components': d.get('components', ''),
+        })
+    return items
+
+
+def extra_items(rows):
+    """エクストラの行（reading・questionType は answer・answer2 から求められるため除く）"""
+    items = []
+    for raw in rows:
+        d = {name.strip().lower(): value.strip() for name, value in raw.items()}
+        # answer2 があれば誤字訂正問題（answer に誤字、answer2 に正しい字）、無ければ answer が読み
+        items.append({'sentence': d.get('sentence', ''), 'answer': d.get('answer', ''), 'answer2': d.get('answer2', '')})
+    return items
+
+
+def to_columns(items):
+    """辞書のリストを列ごとの配列にする。全ての行で空の列は除く"""
+    names = []
+    for item in items:
+        names.extend(name for name in item if name not in names)
+    columns = {}
+    for name in names:
+        values = [item.get(name) for item in items]
+        if any(v not in (None, '', []) for v in values):
+            columns[name] = values
+    return columns
+
+
+def compile_level(level_dir):
+    """level.json の内容（dict）を返す"""
+    level_dir = Path(level_dir)
+    csv_path = level_dir / 'mappings.csv'
+    version = mappings_version(csv_path)
+
+    header, rows = read_mappings(csv_path)
+    items = extra_items(rows) if level_dir.name == 'extra' else compiled_items(header, rows)
+    return {'format': FORMAT_VERSION, 'version': version, 'count': len(items), 'columns': to_columns(items)}
+
+
+def read_version(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data.get('format'), data.get('version')
+    except (OSError, ValueError):
+        return None, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='mappings.csv をアプリ用の level.json に変換します')
+    parser.add_argument('levels', nargs='*', default=DEFAULT_LEVELS,
+                        help=f'mappings.csv のあるディレクトリ (既定: {" ".join(DEFAULT_LEVELS)})')
+    parser.add_argument('--public', default='public', help='公開ディレクトリ (既定: public)')
+    parser.add_argument('--out', default='dist', help='level.json を書き出すビルドの出力ディレクトリ (既定: dist)')
+    parser.add_argument('--check', action='store_true', help='書き出さずに level.json が最新か確認する')
+    add_stats_arguments(parser)
+    args = parser.parse_args()
+
+    if not Path(args.out).is_dir():
+        print(f"✗ {args.out} がありません（先に npm run build を実行してください）")
+        sys.exit(1)
+
+    start_stats('compile_levels', args)
+    stale = 0
+    for level_dir in args.levels:
+        level_dir = Path(level_dir)
+        if not (level_dir / 'mappings.csv').exists():
+            print(f"✗ mappings.csv がありません: {level_dir}")
+            sys.exit(1)
+        with STATS.timer('compile'):
+            compiled = compile_level(level_dir)
+        # dist の中の mappings.csv と同じ場所に書き出す
+        out_path = Path(args.out) / level_dir.resolve().relative_to(Path(args.public).resolve()) / OUTPUT_NAME
+        current = read_version(out_path) == (compiled['format'], compiled['version'])
+
+        if args.check:
+            if not current:
+                stale += 1
+                print(f"✗ {out_path} が mappings.csv と一致しません")
+            else:
+                print(f"✓ {out_path}: 最新 (version {compiled['version']})")
+            continue
+
+        with STATS.timer('write'):
+            text = json.dumps(compiled, ensure_ascii=False, separators=(',', ':'))
+            atomic_write_text(out_path, text)
+        csv_size = (level_dir / 'mappings.csv').stat().st_size
+        print(f"✓ {out_path}: {compiled['count']} 件, {len(compiled['columns'])} 列 "
+              f"(mappings.csv {csv_size // 1024} KB -> {len(text.encode('utf-8')) // 1024} KB, "
+              f"version {compiled['version']})")
+    finish_stats(args)
+    sys.exit(1 if stale else 0)
+
+
+if __name__ == '__main__':
+    main()
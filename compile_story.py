@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+public/story.json を章ごとのファイルに分割するスクリプト
+
+story.json は全ての章を含む1つのファイル（約240KB）で、ビジュアルノベルは
+最初の台詞を表示する前に全体を取得・解析する必要がある。
+また voice のパスは Windows 形式（voice\\001_....mp3）で書かれている。
+
+このスクリプトはビルドの出力（dist）の story/ に
+  - chapter-00.json ...  : 章ごとの {title, dialogues, prefetch}（voice は /voice/... の形式に直す）
+  - manifest.json        : 全体のタイトルと、章ごとのタイトル・ファイル・台詞の数・大きさ
+を書き出す。prefetch は章の中で最初に使われる順に並べた背景・立ち絵・ボイスの URL とバイト数で、
+アプリは章を始める前にその章のファイルだけを読み込んで資産を先読みし、
+次の章の資産もバックグラウンドで先読みする。
+
+立ち絵の対応は src/VisualNovel.tsx の CHARACTER_IMAGES から読み取る。
+零のアニメーションは pack_frames.py のアトラスがあればそれを先読みする。
+
+章ごとのファイルは npm run build の後（package.json の postbuild）に dist にだけ書き出す。
+manifest.json が無い場合（開発サーバーなど）、アプリは従来どおり story.json を読み込む。
+
+使用方法:
+    python compile_story.py [--story public/story.json] [--public public] [--out dist] [--check]
+
+例:
+    npm run build   # postbuild で python compile_story.py -q を実行する
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+
+from atomic_io import atomic_write_text
+from pipeline_stats import STATS, add_stats_arguments, finish_stats, log, start_stats
+
+# 出力の形式を変えたら上げる（storyParser.ts の STORY_MANIFEST_FORMAT も合わせる）
+FORMAT_VERSION = 1
+PUBLIC_DIR = Path('public')
+# 章ごとのファイルを置く、ビルドの出力の中のディレクトリ（storyParser.ts の /story/manifest.json）
+STORY_DIR = 'story'
+VISUAL_NOVEL_SOURCE = Path('src/VisualNovel.tsx')
+
+# VisualNovel.css の背景のクラスと同じ拡張子の優先順
+BACKGROUND_EXTENSIONS = ['.jpg', '.png', '.jpeg', '.webp']
+BACKGROUND_DIR = '/images/backgrounds'
+ZERO_CHARACTER = '零'
+ZERO_FRAME_URL = '/images/zeroAnime/frame{:02d}.png'
+# pack_frames.py でまとめたアトラス（あればフレームの代わりに先読みする）
+ZERO_ATLAS = 'images/zeroAnime/atlas.json'
+
+
+def read_character_images(source=VISUAL_NOVEL_SOURCE):
+    """VisualNovel.tsx の CHARACTER_IMAGES と ZERO_FRAMES を読み取る"""
+    text = Path(source).read_text(encoding='utf-8')
+    block = re.search(r'const CHARACTER_IMAGES[^{]*\{(.*?)\};', text, re.S)
+    if not block:
+        raise ValueError(f'{source} に CHARACTER_IMAGES が見つかりません')
+    images = dict(re.findall(r"'([^']+)'\s*:\s*'([^']+)'", block.group(1)))
+    frames = re.search(r'const ZERO_FRAMES = (\d+)', text)
+    return images, int(frames.group(1)) if frames else 0
+
+
+def normalize_voice_path(path):
+    """voice\\001_....mp3 → /voice/001_....mp3"""
+    path = str(path or '').replace('\\', '/')
+    return '/' + path.lstrip('/')
+
+
+class AssetResolver:
+    """台詞が参照する資産の URL を決め、public/ 内のファイルの大きさを調べる"""
+
+    def __init__(self, public_dir, character_images, zero_frames):
+        self.public_dir = Path(public_dir)
+        self.character_images = character_images
+        self.zero_urls = self._zero_atlas_pages() or [ZERO_FRAME_URL.format(i) for i in range(1, zero_frames + 1)]
+        self.missing = set()
+
+    def _zero_atlas_pages(self):
+        try:
+            with open(self.public_dir / ZERO_ATLAS, 'r', encoding='utf-8') as f:
+                return json.load(f).get('pages') or []
+        except (OSError, ValueError):
+            return []
+
+    def size(self, url):
+        path = self.public_dir / url.lstrip('/')
+        if path.is_file():
+            return path.stat().st_size
+        self.missing.add(url)
+        return None
+
+    def background(self, name):
+        for ext in BACKGROUND_EXTENSIONS:
+            url = f'{BACKGROUND_DIR}/{name}{ext}'
+            if (self.public_dir / url.lstrip('/')).is_file():
+                return url
+        # CSS だけで描く背景（bg_city_fading など）は画像が無い
+        return None
+
+    def dialogue_assets(self, dialogue):
+        """台詞が使う資産の URL を、使われる順に返す"""
+        urls = []
+        if dialogue.get('background'):
+            url = self.background(dialogue['background'])
+            if url:
+                urls.append(url)
+        for name in dialogue.get('characters') or []:
+            if name in self.character_images:
+                urls.append(self.character_images[name])
+            if name == ZERO_CHARACTER:
+                urls.extend(self.zero_urls)
+        urls.extend(dialogue.get('voice') or [])
+        return urls
+
+
+def compile_chapter(chapter, resolver):
+    """章のデータ（台詞と先読みの一覧）を返す"""
+    dialogues = []
+    prefetch = []
+    seen = set()
+    for raw in chapter.get('dialogues') or []:
+        dialogue = dict(raw)
+        if 'voice' in dialogue:
+            dialogue['voice'] = [normalize_voice_path(v) for v in dialogue.get('voice') or []]
+        dialogues.append(dialogue)
+        for url in resolver.dialogue_assets(dialogue):
+            if url in seen:
+                continue
+            seen.add(url)
+            size = resolver.size(url)
+            if size is not None:
+                prefetch.append({'url': url, 'bytes': size})
+    return {
+        'title': chapter.get('title', ''),
+        'dialogues': dialogues,
+        'prefetchBytes': sum(p['bytes'] for p in prefetch),
+        'prefetch': prefetch,
+    }
+
+
+def compile_story(story_path, public_dir=PUBLIC_DIR, source=VISUAL_NOVEL_SOURCE):
+    """{ファイル名: 内容の文字列} と manifest を返す"""
+    data = Path(story_path).read_bytes()
+    # story.json は BOM 付きで保存されていることがある
+    story = json.loads(data.decode('utf-8-sig'))
+    character_images, zero_frames = read_character_images(source)
+    resolver = AssetResolver(public_dir, character_images, zero_frames)
+    base_url = f'/{STORY_DIR}'
+
+    outputs = {}
+    chapters = []
+    for i, chapter in enumerate(story.get('chapters') or []):
+        compiled = compile_chapter(chapter, resolver)
+        name = f'chapter-{i:02d}.json'
+        outputs[name] = json.dumps(compiled, ensure_ascii=False, separators=(',', ':'))
+        chapters.append({
+            'title': compiled['title'],
+            'file': f'{base_url}/{name}',
+            'dialogues': len(compiled['dialogues']),
+            'bytes': len(outputs[name].encode('utf-8')),
+            'prefetchBytes': compiled['prefetchBytes'],
+        })
+        log(f"  {name}: {compiled['title']} 台詞 {len(compiled['dialogues'])} / 資産 {len(compiled['prefetch'])} 件")
+
+    version = hashlib.sha256(f'{FORMAT_VERSION}:'.encode('ascii') + data
+                             + json.dumps(chapters, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+    manifest = {'format': FORMAT_VERSION, 'version': version, 'title': story.get('title', ''), 'chapters': chapters}
+    outputs['manifest.json'] = json.dumps(manifest, ensure_ascii=False, indent=2)
+    return outputs, manifest, resolver.missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description='story.json を章ごとのファイルと先読みの一覧に分割します')
+    parser.add_argument('--story', default='public/story.json', help='元の story.json (既定: public/story.json)')
+    parser.add_argument('--public', default=str(PUBLIC_DIR), help='資産の大きさを調べる公開ディレクトリ (既定: public)')
+    parser.add_argument('--out', default='dist', help=f'{STORY_DIR}/ を書き出すビルドの出力ディレクトリ (既定: dist)')
+    parser.add_argument('--check', action='store_true', help='書き出さずに出力が最新か確認する')
+    add_stats_arguments(parser)
+    args = parser.parse_args()
+
+    if not Path(args.out).is_dir():
+        print(f"✗ {args.out} がありません（先に npm run build を実行してください）")
+        sys.exit(1)
+
+    start_stats('compile_story', args)
+    out_dir = Path(args.out) / STORY_DIR
+    with STATS.timer('compile'):
+        outputs, manifest, missing = compile_story(args.story, args.public)
+    if missing:
+        print(f"  警告: public/ に無いファイル {len(missing)} 件を先読みの一覧から除きました")
+        for url in sorted(missing):
+            log(f"    {url}")
+
+    if args.check:
+        stale = [name for name, text in outputs.items()
+                 if not (out_dir / name).exists() or (out_dir / name).read_text(encoding='utf-8') != text]
+        for name in stale:
+            print(f"✗ {out_dir / name} が story.json と一致しません")
+        if not stale:
+            print(f"✓ {out_dir}: 最新 (version {manifest['version']})")
+        finish_stats(args)
+        sys.exit(1 if stale else 0)
+
+    with STATS.timer('write'):
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for name, text in outputs.items():
+            atomic_write_text(out_dir / name, text)
+        # 章が減った場合に残った古いファイルを消す
+        for path in out_dir.glob('chapter-*.json'):
+            if path.name not in outputs:
+                path.unlink()
+
+    total = sum(c['bytes'] for c in manifest['chapters'])
+    largest = max((c['bytes'] for c in manifest['chapters']), default=0)
+    print(f"✓ {out_dir}: {len(manifest['chapters'])} 章 (合計 {total // 1024} KB, 最大 {largest // 1024} KB)"
+          f" / manifest.json {len(outputs['manifest.json'].encode('utf-8')) // 1024} KB (version {manifest['version']})")
+    finish_stats(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,10 +4,13 @@ level-8のデータを直接抽出するスクリプト
 ユーザーから提供されたHTMLデータを元に、CSVと画像URLのリストを生成する
 """
 
+import argparse
 import csv
 import re
 from pathlib import Path
 
+from pipeline_stats import STATS, add_stats_arguments, finish_stats, log, start_stats
+
 # ユーザーから提供されたHTMLから抽出したデータ
 kanji_data = [
     {"id": "0001", "reading": "せい", "image_url": "https://img.atwiki.jp/yuia_sk/attach/17/55/ID081.png"},
@@ -92,12 +95,8 @@ kanji_data = [
     {"id": "0080", "reading": "さむい", "image_url": "https://img.atwiki.jp/yuia_sk/attach/17/1931/ID0880.png"},
 ]
 
-def main():
-    output_dir = Path("public/kanji/level-8")
-    images_dir = output_dir / "images"
-    images_dir.mkdir(parents=True, exist_ok=True)
-    
-    # CSVデータを作成
+def build_rows():
+    """kanji_data から CSV の行（ダウンロード用の image_url 付き）を作成する"""
     csv_data = []
     
     for idx, item in enumerate(kanji_data, start=1):
@@ -121,33 +120,53 @@ def main():
             'image_url': image_url  # ダウンロード用に保存
         })
         
-        print(f"{idx}. {reading} -> {image_filename}")
+        log(f"{idx}. {reading} -> {image_filename}")
+    
+    return csv_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description='level-8 の mappings.csv と image_urls.txt を生成します')
+    add_stats_arguments(parser)
+    args = parser.parse_args()
+    start_stats('extract_level8', args)
+    
+    output_dir = Path("public/kanji/level-8")
+    images_dir = output_dir / "images"
+    images_dir.mkdir(parents=True, exist_ok=True)
+    
+    # CSVデータを作成
+    with STATS.timer('extract'):
+        csv_data = build_rows()
     
     # CSVファイルに書き込み
     csv_path = output_dir / 'mappings.csv'
-    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=['path', 'reading', 'additional_info'])
-        writer.writeheader()
-        for row in csv_data:
-            writer.writerow({
-                'path': row['path'],
-                'reading': row['reading'],
-                'additional_info': row['additional_info']
-            })
+    with STATS.timer('write'):
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=['path', 'reading', 'additional_info'])
+            writer.writeheader()
+            for row in csv_data:
+                writer.writerow({
+                    'path': row['path'],
+                    'reading': row['reading'],
+                    'additional_info': row['additional_info']
+                })
     
     print(f"\n✓ CSVファイルを保存: {csv_path}")
     print(f"✓ 合計 {len(csv_data)} 件のデータを保存しました")
     
     # 画像URLリストを保存
     urls_path = output_dir / 'image_urls.txt'
-    with open(urls_path, 'w', encoding='utf-8') as f:
-        for item in csv_data:
-            f.write(f"{item['image_url']}\t{item['path']}\n")
+    with STATS.timer('write'):
+        with open(urls_path, 'w', encoding='utf-8') as f:
+            for item in csv_data:
+                f.write(f"{item['image_url']}\t{item['path']}\n")
     
     print(f"✓ 画像URLリストを保存: {urls_path}")
     print("\n次のステップ:")
     print("画像をダウンロードするには:")
-    print(f"  cd {output_dir} && cat image_urls.txt | while IFS=$'\\t' read url path; do curl -L -o \"$path\" \"$url\"; done")
+    print(f"  python fetch_images.py {urls_path}")
+    finish_stats(args)
 
 if __name__ == '__main__':
     main()
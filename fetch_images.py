@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+image_urls.txt に列挙された画像を並列にダウンロードするスクリプト
+
+image_urls.txt は extract_level8.py が書き出す「URL<TAB>保存先パス」形式のファイル。
+保存先パスは image_urls.txt のあるディレクトリからの相対パスとして扱う。
+画像は HTTPキャッシュ (.http_cache/) を経由して取得する。
+
+取得した画像はマジックバイトから実際の形式を判定し、拡張子が違っていれば
+（例: .png という名前の JPEG）正しい拡張子で保存して、同じディレクトリの mappings.csv と
+image_urls.txt のパスも書き換える。デコードできない画像は保存せず失敗として扱う。
+
+使用方法:
+    python fetch_images.py <image_urls.txt> [--jobs N]
+
+例:
+    python fetch_images.py public/kanji/level-8/image_urls.txt
+    python fetch_images.py public/kanji/level-8/image_urls.txt --cache-mode replay
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from atomic_io import atomic_write_bytes, atomic_write_text
+from http_cache import add_cache_arguments, cache_from_args
+from image_format import detect_format, verify_image, with_correct_extension
+from mappings_io import read_mappings, write_mappings
+from pipeline_stats import STATS, add_stats_arguments, finish_stats, log, start_stats
+from scrape_kanji import DEFAULT_JOBS, USER_AGENT, create_session
+
+
+def read_url_list(urls_path):
+    """image_urls.txt を読み込み (URL, 保存先パス) のリストを返す"""
+    entries = []
+    with open(urls_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line.strip():
+                continue
+            url, path = line.split('\t', 1)
+            entries.append((url.strip(), path.strip()))
+    return entries
+
+
+def write_url_list(urls_path, entries):
+    """(URL, 保存先パス) のリストを image_urls.txt に書き出す"""
+    atomic_write_text(urls_path, ''.join(f"{url}\t{path}\n" for url, path in entries))
+
+
+def fetch_image(url, path, base_dir, session, cache):
+    """画像を1件取得・検証して保存し、実際に保存したパス（base_dir からの相対パス）を返す"""
+    with STATS.timer('fetch'):
+        headers = {'User-Agent': USER_AGENT}
+        response = (cache.get(url, session=session, headers=headers) if cache is not None
+                    else session.get(url, headers=headers, timeout=10))
+    STATS.record_response(response)
+    response.raise_for_status()
+    data = response.content
+
+    fmt = detect_format(data)
+    if fmt is None:
+        raise ValueError(f"画像ではありません (Content-Type: {response.headers.get('Content-Type')})")
+    with STATS.timer('verify'):
+        problem = verify_image(data, fmt)
+    if problem:
+        raise ValueError(problem)
+
+    new_path = with_correct_extension(path, fmt)
+    save_path = base_dir / new_path
+    save_path.parent.mkdir(parents=True, exist_ok=True)
+    with STATS.timer('write'):
+        atomic_write_bytes(save_path, data)
+    STATS.count('bytes_written', len(data))
+    if new_path != path:
+        # 誤った拡張子で保存済みのファイルは削除する
+        (base_dir / path).unlink(missing_ok=True)
+    return new_path
+
+
+def update_paths(base_dir, urls_path, entries, renamed):
+    """拡張子を直したパスを mappings.csv と image_urls.txt に反映する"""
+    csv_path = base_dir / 'mappings.csv'
+    if csv_path.exists():
+        header, rows = read_mappings(csv_path)
+        changed = 0
+        for row in rows:
+            if row.get('path') in renamed:
+                row['path'] = renamed[row['path']]
+                changed += 1
+        if changed:
+            write_mappings(csv_path, header, rows)
+            print(f"✓ mappings.csv のパスを {changed} 件修正しました: {csv_path}")
+
+    write_url_list(urls_path, [(url, renamed.get(path, path)) for url, path in entries])
+    print(f"✓ 画像URLリストを更新しました: {urls_path}")
+
+
+def fetch_images(urls_path, cache, jobs=DEFAULT_JOBS):
+    """image_urls.txt の画像を並列にダウンロードする"""
+    urls_path = Path(urls_path)
+    base_dir = urls_path.parent
+    entries = read_url_list(urls_path)
+    session = create_session(jobs)
+
+    failed = 0
+    renamed = {}
+    done = 0
+    STATS.expect(len(entries))
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(fetch_image, url, path, base_dir, session, cache): (url, path)
+                   for url, path in entries}
+        for future in as_completed(futures):
+            url, path = futures[future]
+            done += 1
+            STATS.progress('画像')
+            try:
+                new_path = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"[{done}/{len(entries)}] 失敗: {url} - {e}")
+                continue
+            if new_path != path:
+                renamed[path] = new_path
+                log(f"[{done}/{len(entries)}] 保存: {base_dir / new_path} (拡張子を修正: {os.path.basename(path)})")
+            else:
+                log(f"[{done}/{len(entries)}] 保存: {base_dir / new_path}")
+
+    if renamed:
+        update_paths(base_dir, urls_path, entries, renamed)
+
+    print(f"\n✓ {len(entries) - failed} 件を保存しました（拡張子を修正 {len(renamed)} 件、失敗 {failed} 件）")
+    return failed == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='image_urls.txt の画像をダウンロードします')
+    parser.add_argument('urls_file', help='image_urls.txt のパス')
+    parser.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                        help=f'同時ダウンロード数 (既定: {DEFAULT_JOBS})')
+    add_cache_arguments(parser)
+    add_stats_arguments(parser)
+    args = parser.parse_args()
+
+    start_stats('fetch_images', args)
+    success = fetch_images(args.urls_file, cache_from_args(args), jobs=max(1, args.jobs))
+    finish_stats(args)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == '__main__':
+    main()
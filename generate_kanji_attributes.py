@@ -1,10 +1,43 @@
 #!/usr/bin/env python3
 """
 常用漢字にゲーム属性（レアリティ、属性、スキル）を付与するスクリプト
+
+public/kanji/always/all.csv の漢字ごとの属性を public/kanji/always/attributes.csv に書き出す
+（all.csv は書き換えない）。numpy があれば全ての漢字の属性を配列でまとめて計算する
+（--range 4E00-9FFF で CJK 統合漢字の全体のような大きな範囲も1秒かからずに試せる）。
+numpy が無い場合は1文字ずつ計算する。
+
+同時にアプリが読む src/data/kanjiAttributeTable.ts を書き出す。特別な漢字（SPECIAL_KANJI）は規則と
+違う属性と XP・コインのブースト値を持つため、文字コード順の漢字と1字4バイトに詰めた属性の表にする。
+それ以外の漢字はアプリが規則（kanjiAttributes.ts の getDefaultKanjiAttributes、このスクリプトと同じ式）で
+求めるため表に入れない。--verify で表が SPECIAL_KANJI と一致するか、また attributes.csv の規則で求めた行
+（特別な漢字以外）のレアリティ・属性・スキル・パワーが getDefaultKanjiAttributes の式と一致するかを確認する
+（attributes.csv が無ければ all.csv から行を作って確かめる）。
+getDefaultKanjiAttributes の式は TS のソースから定数（レアリティの境目・属性・スキル・パワー）を読み取って
+計算する（XP・コインのブーストは attributes.csv に無いため比べない）。
+
+使用方法:
+    python generate_kanji_attributes.py [--input all.csv] [--output attributes.csv]
+    python generate_kanji_attributes.py --range 4E00-9FFF --dry-run
+    python generate_kanji_attributes.py --range 4E00-9FFF --output /tmp/attributes-cjk.csv
+    python generate_kanji_attributes.py --verify
 """
 
+import argparse
+import base64
 import csv
-import random
+import hashlib
+import re
+import sys
+from pathlib import Path
+
+from atomic_io import atomic_open, atomic_write_text
+from pipeline_stats import STATS, add_stats_arguments, finish_stats, start_stats
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # 属性定義
 ELEMENTS = ['fire', 'water', 'earth', 'wind', 'light', 'dark']
@@ -17,59 +50,59 @@ SKILLS = [
 
 # 特別な漢字の設定（手動で設定）
 SPECIAL_KANJI = {
-    '龍': {'rarity': 'legendary', 'element': 'fire', 'skill': 'combo_bonus', 'power': 10, 'attack': 10, 'defense': 6, 'speed': 8},
-    '竜': {'rarity': 'legendary', 'element': 'fire', 'skill': 'combo_bonus', 'power': 10, 'attack': 10, 'defense': 7, 'speed': 8},
-    '火': {'rarity': 'rare', 'element': 'fire', 'skill': 'xp_boost', 'power': 6, 'attack': 8, 'defense': 3, 'speed': 5},
-    '水': {'rarity': 'rare', 'element': 'water', 'skill': 'coin_boost', 'power': 6, 'attack': 3, 'defense': 8, 'speed': 5},
-    '土': {'rarity': 'common', 'element': 'earth', 'skill': 'shield', 'power': 5, 'attack': 5, 'defense': 7, 'speed': 4},
-    '風': {'rarity': 'common', 'element': 'wind', 'skill': 'multi_answer', 'power': 4, 'attack': 6, 'defense': 4, 'speed': 8},
-    '光': {'rarity': 'epic', 'element': 'light', 'skill': 'lucky_draw', 'power': 7, 'attack': 7, 'defense': 7, 'speed': 6},
-    '雷': {'rarity': 'rare', 'element': 'light', 'skill': 'streak_power', 'power': 7, 'attack': 9, 'defense': 2, 'speed': 7},
-    '海': {'rarity': 'rare', 'element': 'water', 'skill': 'coin_boost', 'power': 5, 'attack': 4, 'defense': 9, 'speed': 4},
-    '森': {'rarity': 'common', 'element': 'earth', 'skill': 'revival', 'power': 5, 'attack': 5, 'defense': 8, 'speed': 3},
-    '空': {'rarity': 'rare', 'element': 'wind', 'skill': 'multi_answer', 'power': 6, 'attack': 5, 'defense': 5, 'speed': 9},
-    '星': {'rarity': 'epic', 'element': 'light', 'skill': 'xp_boost', 'power': 8, 'attack': 8, 'defense': 5, 'speed': 7},
-    '夜': {'rarity': 'rare', 'element': 'dark', 'skill': 'streak_power', 'power': 8, 'attack': 9, 'defense': 4, 'speed': 6},
-    '炎': {'rarity': 'epic', 'element': 'fire', 'skill': 'xp_boost', 'power': 7, 'attack': 9, 'defense': 4, 'speed': 6},
-    '氷': {'rarity': 'epic', 'element': 'water', 'skill': 'time_freeze', 'power': 8, 'attack': 5, 'defense': 8, 'speed': 5},
-    '岩': {'rarity': 'rare', 'element': 'earth', 'skill': 'shield', 'power': 7, 'attack': 6, 'defense': 10, 'speed': 2},
-    '嵐': {'rarity': 'epic', 'element': 'wind', 'skill': 'combo_bonus', 'power': 7, 'attack': 7, 'defense': 5, 'speed': 9},
-    '聖': {'rarity': 'legendary', 'element': 'light', 'skill': 'revival', 'power': 10, 'attack': 8, 'defense': 8, 'speed': 8},
-    '闇': {'rarity': 'epic', 'element': 'dark', 'skill': 'synergy', 'power': 8, 'attack': 10, 'defense': 3, 'speed': 7},
-    '焔': {'rarity': 'legendary', 'element': 'fire', 'skill': 'xp_boost', 'power': 9, 'attack': 10, 'defense': 5, 'speed': 7},
-    '泉': {'rarity': 'rare', 'element': 'water', 'skill': 'coin_boost', 'power': 7, 'attack': 4, 'defense': 9, 'speed': 5},
-    '煉': {'rarity': 'legendary', 'element': 'fire', 'skill': 'xp_boost', 'power': 10, 'attack': 10, 'defense': 6, 'speed': 8},
-    '滝': {'rarity': 'epic', 'element': 'water', 'skill': 'coin_boost', 'power': 8, 'attack': 5, 'defense': 10, 'speed': 6},
-    '翔': {'rarity': 'legendary', 'element': 'wind', 'skill': 'multi_answer', 'power': 9, 'attack': 7, 'defense': 6, 'speed': 10},
-    '輝': {'rarity': 'legendary', 'element': 'light', 'skill': 'lucky_draw', 'power': 10, 'attack': 9, 'defense': 8, 'speed': 8},
-    '魔': {'rarity': 'legendary', 'element': 'dark', 'skill': 'synergy', 'power': 10, 'attack': 10, 'defense': 5, 'speed': 9},
-    '天': {'rarity': 'epic', 'element': 'light', 'skill': 'xp_boost', 'power': 7, 'attack': 7, 'defense': 6, 'speed': 7},
-    '地': {'rarity': 'epic', 'element': 'earth', 'skill': 'coin_boost', 'power': 7, 'attack': 6, 'defense': 8, 'speed': 5},
-    '山': {'rarity': 'common', 'element': 'earth', 'skill': 'shield', 'power': 4, 'attack': 5, 'defense': 7, 'speed': 3},
-    '川': {'rarity': 'common', 'element': 'water', 'skill': 'revival', 'power': 4, 'attack': 4, 'defense': 6, 'speed': 5},
-    '雨': {'rarity': 'common', 'element': 'water', 'skill': 'coin_boost', 'power': 4, 'attack': 3, 'defense': 6, 'speed': 5},
-    '雪': {'rarity': 'rare', 'element': 'water', 'skill': 'time_freeze', 'power': 6, 'attack': 4, 'defense': 7, 'speed': 4},
-    '雲': {'rarity': 'common', 'element': 'wind', 'skill': 'multi_answer', 'power': 4, 'attack': 5, 'defense': 4, 'speed': 7},
-    '雷': {'rarity': 'rare', 'element': 'light', 'skill': 'streak_power', 'power': 7, 'attack': 9, 'defense': 2, 'speed': 7},
-    '王': {'rarity': 'epic', 'element': 'light', 'skill': 'combo_bonus', 'power': 7, 'attack': 7, 'defense': 7, 'speed': 6},
-    '皇': {'rarity': 'legendary', 'element': 'light', 'skill': 'combo_bonus', 'power': 9, 'attack': 8, 'defense': 8, 'speed': 7},
-    '帝': {'rarity': 'legendary', 'element': 'dark', 'skill': 'combo_bonus', 'power': 9, 'attack': 9, 'defense': 7, 'speed': 7},
-    '神': {'rarity': 'legendary', 'element': 'light', 'skill': 'lucky_draw', 'power': 10, 'attack': 9, 'defense': 9, 'speed': 9},
-    '仏': {'rarity': 'epic', 'element': 'light', 'skill': 'revival', 'power': 8, 'attack': 6, 'defense': 8, 'speed': 6},
-    '悪': {'rarity': 'epic', 'element': 'dark', 'skill': 'streak_power', 'power': 7, 'attack': 8, 'defense': 4, 'speed': 7},
-    '鬼': {'rarity': 'epic', 'element': 'dark', 'skill': 'combo_bonus', 'power': 8, 'attack': 9, 'defense': 5, 'speed': 7},
-    '魂': {'rarity': 'rare', 'element': 'dark', 'skill': 'revival', 'power': 6, 'attack': 6, 'defense': 6, 'speed': 6},
-    '夢': {'rarity': 'rare', 'element': 'light', 'skill': 'lucky_draw', 'power': 6, 'attack': 5, 'defense': 5, 'speed': 7},
-    '愛': {'rarity': 'epic', 'element': 'light', 'skill': 'revival', 'power': 8, 'attack': 6, 'defense': 7, 'speed': 7},
-    '心': {'rarity': 'common', 'element': 'light', 'skill': 'revival', 'power': 4, 'attack': 4, 'defense': 5, 'speed': 5},
-    '力': {'rarity': 'common', 'element': 'fire', 'skill': 'xp_boost', 'power': 4, 'attack': 7, 'defense': 3, 'speed': 5},
-    '剣': {'rarity': 'rare', 'element': 'fire', 'skill': 'streak_power', 'power': 6, 'attack': 8, 'defense': 3, 'speed': 6},
-    '刀': {'rarity': 'rare', 'element': 'fire', 'skill': 'streak_power', 'power': 6, 'attack': 8, 'defense': 2, 'speed': 7},
-    '槍': {'rarity': 'rare', 'element': 'fire', 'skill': 'combo_bonus', 'power': 6, 'attack': 7, 'defense': 3, 'speed': 6},
-    '弓': {'rarity': 'common', 'element': 'wind', 'skill': 'multi_answer', 'power': 4, 'attack': 6, 'defense': 3, 'speed': 7},
-    '矢': {'rarity': 'common', 'element': 'wind', 'skill': 'streak_power', 'power': 4, 'attack': 6, 'defense': 2, 'speed': 8},
-    '盾': {'rarity': 'rare', 'element': 'earth', 'skill': 'shield', 'power': 6, 'attack': 3, 'defense': 9, 'speed': 3},
-    '鎧': {'rarity': 'epic', 'element': 'earth', 'skill': 'shield', 'power': 8, 'attack': 4, 'defense': 10, 'speed': 2},
+    '龍': {'rarity': 'legendary', 'element': 'fire', 'skill': 'combo_bonus', 'power': 10, 'attack': 10, 'defense': 6, 'speed': 8, 'xp': 25, 'coin': 20},
+    '竜': {'rarity': 'legendary', 'element': 'fire', 'skill': 'combo_bonus', 'power': 10, 'attack': 10, 'defense': 7, 'speed': 8, 'xp': 25, 'coin': 20},
+    '火': {'rarity': 'rare', 'element': 'fire', 'skill': 'xp_boost', 'power': 6, 'attack': 8, 'defense': 3, 'speed': 5, 'xp': 15, 'coin': 8},
+    '水': {'rarity': 'rare', 'element': 'water', 'skill': 'coin_boost', 'power': 6, 'attack': 3, 'defense': 8, 'speed': 5, 'xp': 8, 'coin': 15},
+    '土': {'rarity': 'common', 'element': 'earth', 'skill': 'shield', 'power': 5, 'attack': 5, 'defense': 7, 'speed': 4, 'xp': 7, 'coin': 7},
+    '風': {'rarity': 'common', 'element': 'wind', 'skill': 'multi_answer', 'power': 4, 'attack': 6, 'defense': 4, 'speed': 8, 'xp': 8, 'coin': 6},
+    '光': {'rarity': 'epic', 'element': 'light', 'skill': 'lucky_draw', 'power': 7, 'attack': 7, 'defense': 7, 'speed': 6, 'xp': 18, 'coin': 15},
+    '雷': {'rarity': 'rare', 'element': 'light', 'skill': 'streak_power', 'power': 7, 'attack': 9, 'defense': 2, 'speed': 7, 'xp': 16, 'coin': 10},
+    '海': {'rarity': 'rare', 'element': 'water', 'skill': 'coin_boost', 'power': 5, 'attack': 4, 'defense': 9, 'speed': 4, 'xp': 8, 'coin': 16},
+    '森': {'rarity': 'common', 'element': 'earth', 'skill': 'revival', 'power': 5, 'attack': 5, 'defense': 8, 'speed': 3, 'xp': 7, 'coin': 8},
+    '空': {'rarity': 'rare', 'element': 'wind', 'skill': 'multi_answer', 'power': 6, 'attack': 5, 'defense': 5, 'speed': 9, 'xp': 12, 'coin': 10},
+    '星': {'rarity': 'epic', 'element': 'light', 'skill': 'xp_boost', 'power': 8, 'attack': 8, 'defense': 5, 'speed': 7, 'xp': 22, 'coin': 12},
+    '夜': {'rarity': 'rare', 'element': 'dark', 'skill': 'streak_power', 'power': 8, 'attack': 9, 'defense': 4, 'speed': 6, 'xp': 17, 'coin': 11},
+    '炎': {'rarity': 'epic', 'element': 'fire', 'skill': 'xp_boost', 'power': 7, 'attack': 9, 'defense': 4, 'speed': 6, 'xp': 20, 'coin': 10},
+    '氷': {'rarity': 'epic', 'element': 'water', 'skill': 'time_freeze', 'power': 8, 'attack': 5, 'defense': 8, 'speed': 5, 'xp': 12, 'coin': 18},
+    '岩': {'rarity': 'rare', 'element': 'earth', 'skill': 'shield', 'power': 7, 'attack': 6, 'defense': 10, 'speed': 2, 'xp': 9, 'coin': 12},
+    '嵐': {'rarity': 'epic', 'element': 'wind', 'skill': 'combo_bonus', 'power': 7, 'attack': 7, 'defense': 5, 'speed': 9, 'xp': 16, 'coin': 14},
+    '聖': {'rarity': 'legendary', 'element': 'light', 'skill': 'revival', 'power': 10, 'attack': 8, 'defense': 8, 'speed': 8, 'xp': 20, 'coin': 20},
+    '闇': {'rarity': 'epic', 'element': 'dark', 'skill': 'synergy', 'power': 8, 'attack': 10, 'defense': 3, 'speed': 7, 'xp': 19, 'coin': 11},
+    '焔': {'rarity': 'legendary', 'element': 'fire', 'skill': 'xp_boost', 'power': 9, 'attack': 10, 'defense': 5, 'speed': 7, 'xp': 28, 'coin': 15},
+    '泉': {'rarity': 'rare', 'element': 'water', 'skill': 'coin_boost', 'power': 7, 'attack': 4, 'defense': 9, 'speed': 5, 'xp': 10, 'coin': 17},
+    '煉': {'rarity': 'legendary', 'element': 'fire', 'skill': 'xp_boost', 'power': 10, 'attack': 10, 'defense': 6, 'speed': 8, 'xp': 30, 'coin': 18},
+    '滝': {'rarity': 'epic', 'element': 'water', 'skill': 'coin_boost', 'power': 8, 'attack': 5, 'defense': 10, 'speed': 6, 'xp': 14, 'coin': 22},
+    '翔': {'rarity': 'legendary', 'element': 'wind', 'skill': 'multi_answer', 'power': 9, 'attack': 7, 'defense': 6, 'speed': 10, 'xp': 22, 'coin': 20},
+    '輝': {'rarity': 'legendary', 'element': 'light', 'skill': 'lucky_draw', 'power': 10, 'attack': 9, 'defense': 8, 'speed': 8, 'xp': 25, 'coin': 25},
+    '魔': {'rarity': 'legendary', 'element': 'dark', 'skill': 'synergy', 'power': 10, 'attack': 10, 'defense': 5, 'speed': 9, 'xp': 27, 'coin': 18},
+    '天': {'rarity': 'epic', 'element': 'light', 'skill': 'xp_boost', 'power': 7, 'attack': 7, 'defense': 6, 'speed': 7, 'xp': 18, 'coin': 14},
+    '地': {'rarity': 'epic', 'element': 'earth', 'skill': 'coin_boost', 'power': 7, 'attack': 6, 'defense': 8, 'speed': 5, 'xp': 12, 'coin': 18},
+    '山': {'rarity': 'common', 'element': 'earth', 'skill': 'shield', 'power': 4, 'attack': 5, 'defense': 7, 'speed': 3, 'xp': 6, 'coin': 6},
+    '川': {'rarity': 'common', 'element': 'water', 'skill': 'revival', 'power': 4, 'attack': 4, 'defense': 6, 'speed': 5, 'xp': 5, 'coin': 7},
+    '雨': {'rarity': 'common', 'element': 'water', 'skill': 'coin_boost', 'power': 4, 'attack': 3, 'defense': 6, 'speed': 5, 'xp': 5, 'coin': 8},
+    '雪': {'rarity': 'rare', 'element': 'water', 'skill': 'time_freeze', 'power': 6, 'attack': 4, 'defense': 7, 'speed': 4, 'xp': 9, 'coin': 13},
+    '雲': {'rarity': 'common', 'element': 'wind', 'skill': 'multi_answer', 'power': 4, 'attack': 5, 'defense': 4, 'speed': 7, 'xp': 7, 'coin': 6},
+    '雷': {'rarity': 'rare', 'element': 'light', 'skill': 'streak_power', 'power': 7, 'attack': 9, 'defense': 2, 'speed': 7, 'xp': 16, 'coin': 10},
+    '王': {'rarity': 'epic', 'element': 'light', 'skill': 'combo_bonus', 'power': 7, 'attack': 7, 'defense': 7, 'speed': 6, 'xp': 16, 'coin': 16},
+    '皇': {'rarity': 'legendary', 'element': 'light', 'skill': 'combo_bonus', 'power': 9, 'attack': 8, 'defense': 8, 'speed': 7, 'xp': 23, 'coin': 23},
+    '帝': {'rarity': 'legendary', 'element': 'dark', 'skill': 'combo_bonus', 'power': 9, 'attack': 9, 'defense': 7, 'speed': 7, 'xp': 24, 'coin': 22},
+    '神': {'rarity': 'legendary', 'element': 'light', 'skill': 'lucky_draw', 'power': 10, 'attack': 9, 'defense': 9, 'speed': 9, 'xp': 28, 'coin': 28},
+    '仏': {'rarity': 'epic', 'element': 'light', 'skill': 'revival', 'power': 8, 'attack': 6, 'defense': 8, 'speed': 6, 'xp': 15, 'coin': 16},
+    '悪': {'rarity': 'epic', 'element': 'dark', 'skill': 'streak_power', 'power': 7, 'attack': 8, 'defense': 4, 'speed': 7, 'xp': 19, 'coin': 12},
+    '鬼': {'rarity': 'epic', 'element': 'dark', 'skill': 'combo_bonus', 'power': 8, 'attack': 9, 'defense': 5, 'speed': 7, 'xp': 20, 'coin': 14},
+    '魂': {'rarity': 'rare', 'element': 'dark', 'skill': 'revival', 'power': 6, 'attack': 6, 'defense': 6, 'speed': 6, 'xp': 11, 'coin': 11},
+    '夢': {'rarity': 'rare', 'element': 'light', 'skill': 'lucky_draw', 'power': 6, 'attack': 5, 'defense': 5, 'speed': 7, 'xp': 12, 'coin': 12},
+    '愛': {'rarity': 'epic', 'element': 'light', 'skill': 'revival', 'power': 8, 'attack': 6, 'defense': 7, 'speed': 7, 'xp': 16, 'coin': 17},
+    '心': {'rarity': 'common', 'element': 'light', 'skill': 'revival', 'power': 4, 'attack': 4, 'defense': 5, 'speed': 5, 'xp': 5, 'coin': 6},
+    '力': {'rarity': 'common', 'element': 'fire', 'skill': 'xp_boost', 'power': 4, 'attack': 7, 'defense': 3, 'speed': 5, 'xp': 9, 'coin': 4},
+    '剣': {'rarity': 'rare', 'element': 'fire', 'skill': 'streak_power', 'power': 6, 'attack': 8, 'defense': 3, 'speed': 6, 'xp': 14, 'coin': 8},
+    '刀': {'rarity': 'rare', 'element': 'fire', 'skill': 'streak_power', 'power': 6, 'attack': 8, 'defense': 2, 'speed': 7, 'xp': 15, 'coin': 7},
+    '槍': {'rarity': 'rare', 'element': 'fire', 'skill': 'combo_bonus', 'power': 6, 'attack': 7, 'defense': 3, 'speed': 6, 'xp': 13, 'coin': 9},
+    '弓': {'rarity': 'common', 'element': 'wind', 'skill': 'multi_answer', 'power': 4, 'attack': 6, 'defense': 3, 'speed': 7, 'xp': 8, 'coin': 5},
+    '矢': {'rarity': 'common', 'element': 'wind', 'skill': 'streak_power', 'power': 4, 'attack': 6, 'defense': 2, 'speed': 8, 'xp': 9, 'coin': 5},
+    '盾': {'rarity': 'rare', 'element': 'earth', 'skill': 'shield', 'power': 6, 'attack': 3, 'defense': 9, 'speed': 3, 'xp': 7, 'coin': 13},
+    '鎧': {'rarity': 'epic', 'element': 'earth', 'skill': 'shield', 'power': 8, 'attack': 4, 'defense': 10, 'speed': 2, 'xp': 10, 'coin': 20},
 }
 
 def get_rarity_weights(char_code):
@@ -153,77 +186,390 @@ def get_stats_from_element_and_rarity(element, rarity, char_code):
     
     return attack, defense, speed
 
-def generate_attributes_csv():
-    """all.csvを読み込んで属性付きCSVを生成"""
-    input_file = 'public/kanji/always/all.csv'
-    output_file = 'public/kanji/always/all.csv'
+def generate_row(kanji):
+    """漢字1文字分の属性の行を返す"""
+    if kanji in SPECIAL_KANJI:
+        # 特別な漢字
+        special = SPECIAL_KANJI[kanji]
+        return [
+            kanji,
+            special['rarity'],
+            special['element'],
+            special['skill'],
+            special['power'],
+            special['attack'],
+            special['defense'],
+            special['speed']
+        ]
     
-    kanji_list = []
+    # 自動生成
+    char_code = ord(kanji)
+    rarity = get_rarity_weights(char_code)
+    element = get_element_from_code(char_code)
+    skill = get_skill_from_rarity_and_code(rarity, char_code)
+    power = get_power_from_rarity(rarity, char_code)
+    attack, defense, speed = get_stats_from_element_and_rarity(element, rarity, char_code)
     
-    # 既存のCSVを読み込み
+    return [
+        kanji,
+        rarity,
+        element,
+        skill,
+        power,
+        attack,
+        defense,
+        speed
+    ]
+
+# 自動生成の規則を配列で表したもの（上の関数と同じ結果になる）
+# レアリティ: 文字コード % 100 がこの値以上なら次のレアリティ
+RARITY_THRESHOLDS = [60, 85, 96]
+RARITY_SKILLS = {
+    'common': ['revival', 'shield', 'multi_answer', 'xp_boost', 'coin_boost'],
+    'rare': ['xp_boost', 'coin_boost', 'multi_answer', 'shield', 'streak_power'],
+    'epic': ['xp_boost', 'coin_boost', 'streak_power', 'time_freeze', 'combo_bonus'],
+    'legendary': ['combo_bonus', 'lucky_draw', 'synergy', 'xp_boost', 'coin_boost'],
+}
+COLUMNS = ['kanji', 'rarity', 'element', 'skill', 'power', 'attack', 'defense', 'speed']
+DEFAULT_INPUT = 'public/kanji/always/all.csv'
+DEFAULT_OUTPUT = 'public/kanji/always/attributes.csv'
+DEFAULT_TABLE = 'src/data/kanjiAttributeTable.ts'
+# 特別な漢字以外の属性を求める getDefaultKanjiAttributes のあるファイル
+DEFAULT_RULE_SOURCE = 'src/data/kanjiAttributes.ts'
+# 表の1字あたりのバイト数（kanjiAttributes.ts の readKanjiTable を参照）
+RECORD_SIZE = 4
+TABLE_LINE_WIDTH = 100
+
+
+def _lookup_tables():
+    """レアリティ・属性ごとのスキル・パワー・ステータスの表（np.ndarray）を作る"""
+    skill_table = np.array([[SKILLS.index(s) for s in RARITY_SKILLS[r]] for r in RARITIES], dtype=np.uint8)
+    power_base = np.array([get_power_from_rarity(r, 0) for r in RARITIES], dtype=np.uint8)
+    # 文字コードによる調整（攻撃 ±1）を除いた値。文字コード 1 は調整が 0 になる
+    stats_table = np.array([[get_stats_from_element_and_rarity(e, r, 1) for e in ELEMENTS] for r in RARITIES],
+                           dtype=np.int16)
+    return skill_table, power_base, stats_table
+
+
+def _special_table():
+    """SPECIAL_KANJI を文字コード順の配列にする"""
+    chars = sorted(SPECIAL_KANJI, key=ord)
+    codes = np.array([ord(c) for c in chars], dtype=np.uint32)
+    values = np.array([[RARITIES.index(SPECIAL_KANJI[c]['rarity']), ELEMENTS.index(SPECIAL_KANJI[c]['element']),
+                        SKILLS.index(SPECIAL_KANJI[c]['skill']), SPECIAL_KANJI[c]['power'],
+                        SPECIAL_KANJI[c]['attack'], SPECIAL_KANJI[c]['defense'], SPECIAL_KANJI[c]['speed']]
+                       for c in chars], dtype=np.int16)
+    return codes, values
+
+
+def generate_attributes(codes):
+    """文字コードの配列から全ての属性の列をまとめて計算する
+
+    {'rarity', 'element', 'skill': 各リストの番号, 'power', 'attack', 'defense', 'speed'} の配列と
+    レアリティごとの数（RARITIES の順）を返す。
+    """
+    codes = np.asarray(codes, dtype=np.uint32)
+    skill_table, power_base, stats_table = _lookup_tables()
+
+    rarity = np.searchsorted(RARITY_THRESHOLDS, codes % 100, side='right').astype(np.uint8)
+    element = (codes % len(ELEMENTS)).astype(np.uint8)
+    skill = skill_table[rarity, codes % skill_table.shape[1]]
+    power = (power_base[rarity] + codes % 2).astype(np.int16)
+    stats = stats_table[rarity, element]
+    attack = np.maximum(1, stats[:, 0] + (codes % 3).astype(np.int16) - 1)
+    defense = stats[:, 1].copy()
+    speed = stats[:, 2].copy()
+
+    # 特別な漢字で上書きする
+    special_codes, special_values = _special_table()
+    pos = np.minimum(np.searchsorted(special_codes, codes), len(special_codes) - 1)
+    mask = special_codes[pos] == codes
+    overrides = special_values[pos[mask]]
+    columns = {'rarity': rarity, 'element': element, 'skill': skill,
+               'power': power, 'attack': attack, 'defense': defense, 'speed': speed}
+    for i, name in enumerate(columns):
+        columns[name][mask] = overrides[:, i]
+
+    histogram = np.bincount(rarity, minlength=len(RARITIES))
+    return columns, histogram
+
+
+def generate_rows(kanji_list):
+    """漢字のリストから CSV の行とレアリティごとの数を返す"""
+    if np is None:
+        rows = [generate_row(kanji) for kanji in kanji_list]
+        histogram = [sum(1 for row in rows if row[1] == r) for r in RARITIES]
+        return rows, histogram
+    columns, histogram = generate_attributes([ord(kanji) for kanji in kanji_list])
+    names = {'rarity': RARITIES, 'element': ELEMENTS, 'skill': SKILLS}
+    values = [[names[name][v] for v in col.tolist()] if name in names else col.tolist()
+              for name, col in columns.items()]
+    return [[kanji, *row] for kanji, row in zip(kanji_list, zip(*values))], histogram.tolist()
+
+
+def table_rows():
+    """表に入れる特別な漢字の [漢字, レアリティ, 属性, スキル, パワー, XP, コイン] を文字コード順に返す"""
+    return [generate_row(kanji)[:5] + [SPECIAL_KANJI[kanji]['xp'], SPECIAL_KANJI[kanji]['coin']]
+            for kanji in sorted(SPECIAL_KANJI, key=ord)]
+
+
+def pack_table(rows):
+    """行を文字コード順の漢字の文字列と、1字 RECORD_SIZE バイトの表にする
+
+      0: レアリティ | 属性 << 2
+      1: スキル | パワー << 4
+      2: XP ブースト（%）
+      3: コインブースト（%）
+    """
+    rows = sorted(rows, key=lambda row: ord(row[0]))
+    data = bytearray()
+    for kanji, rarity, element, skill, power, xp, coin in rows:
+        if len(kanji) != 1 or ord(kanji) > 0xFFFF:
+            raise ValueError(f'表に入れられない文字です: {kanji!r}（基本多言語面の1文字のみ）')
+        if not 0 <= power <= 15 or not 0 <= xp <= 255 or not 0 <= coin <= 255:
+            raise ValueError(f'{kanji}: 値が範囲にありません（パワーは 0〜15、ブーストは 0〜255）')
+        data += bytes([RARITIES.index(rarity) | ELEMENTS.index(element) << 2,
+                       SKILLS.index(skill) | power << 4, xp, coin])
+    return ''.join(row[0] for row in rows), bytes(data)
+
+
+def unpack_table(chars, data):
+    """pack_table の逆（table_rows と同じ形の行を文字コード順に返す）"""
+    rows = []
+    for i, kanji in enumerate(chars):
+        b = data[i * RECORD_SIZE:(i + 1) * RECORD_SIZE]
+        rows.append([kanji, RARITIES[b[0] & 0x3], ELEMENTS[b[0] >> 2], SKILLS[b[1] & 0xF], b[1] >> 4, b[2], b[3]])
+    return rows
+
+
+def _ts_string_lines(text):
+    return '\n'.join(f"  '{text[i:i + TABLE_LINE_WIDTH]}'," for i in range(0, len(text), TABLE_LINE_WIDTH))
+
+
+def render_table():
+    """src/data/kanjiAttributeTable.ts の内容を返す"""
+    chars, data = pack_table(table_rows())
+    version = hashlib.sha256(chars.encode('utf-8') + data).hexdigest()[:16]
+    encoded = base64.b64encode(data).decode('ascii')
+
+    def ts_list(values):
+        return ', '.join(f"'{v}'" for v in values)
+
+    return f"""// generate_kanji_attributes.py が生成するファイル。直接編集しないこと。
+// 規則と違う属性を持つ特別な漢字（文字コード順）の属性を1字 {RECORD_SIZE} バイトに詰めた表
+// （読み出しは kanjiAttributes.ts の readKanjiTable。表に無い漢字は getDefaultKanjiAttributes の規則で求める）
+
+export const KANJI_TABLE_VERSION = '{version}';
+export const KANJI_TABLE_RECORD_SIZE = {RECORD_SIZE};
+export const KANJI_TABLE_RARITIES = [{ts_list(RARITIES)}] as const;
+export const KANJI_TABLE_ELEMENTS = [{ts_list(ELEMENTS)}] as const;
+export const KANJI_TABLE_SKILLS = [{ts_list(SKILLS)}] as const;
+
+// {len(chars)}字
+export const KANJI_TABLE_CHARS = [
+{_ts_string_lines(chars)}
+].join('');
+
+// base64（{len(data)} バイト）
+export const KANJI_TABLE_DATA = [
+{_ts_string_lines(encoded)}
+].join('');
+"""
+
+
+def read_table(path):
+    """生成した TS の表を読み取り、行を文字コード順に返す"""
+    text = Path(path).read_text(encoding='utf-8')
+
+    def joined(name):
+        block = re.search(rf'export const {name} = \[(.*?)\]\.join', text, re.S)
+        if not block:
+            raise ValueError(f'{path} に {name} が見つかりません')
+        return ''.join(re.findall(r"'([^']*)'", block.group(1)))
+
+    size = re.search(r'KANJI_TABLE_RECORD_SIZE = (\d+)', text)
+    if not size or int(size.group(1)) != RECORD_SIZE:
+        raise ValueError(f'{path} の1字あたりのバイト数が違います')
+    return unpack_table(joined('KANJI_TABLE_CHARS'), base64.b64decode(joined('KANJI_TABLE_DATA')))
+
+
+def verify_table(table_file):
+    """TS の表が SPECIAL_KANJI から作る表と同じ内容か確かめ、違う漢字のリストを返す"""
+    expected = {row[0]: row for row in table_rows()}
+    actual = {row[0]: row for row in read_table(table_file)}
+    return sorted((set(expected) | set(actual)) - {k for k in expected if actual.get(k) == expected[k]}, key=ord)
+
+
+def read_default_rule(path=DEFAULT_RULE_SOURCE):
+    """kanjiAttributes.ts の getDefaultKanjiAttributes から規則の定数を読み取る
+
+    戻り値: {'thresholds': [(境目, レアリティ), ...], 'last': レアリティ, 'elements': [...],
+             'skills': {レアリティ: [...]}, 'power': {レアリティ: パワー}}
+    """
+    text = Path(path).read_text(encoding='utf-8')
+    body = re.search(r'export function getDefaultKanjiAttributes\(.*?\n}\n', text, re.S)
+    if not body:
+        raise ValueError(f'{path} に getDefaultKanjiAttributes が見つかりません')
+    body = body.group(0)
+    # 定数以外の式（文字コードの使い方）が変わっていないこと
+    for expr in ('charCode % 100', 'elements[charCode % elements.length]', 'skills[charCode % skills.length]',
+                 'basePower + (charCode % 2)'):
+        if expr not in body:
+            raise ValueError(f'{path} の getDefaultKanjiAttributes の式が変わっています（{expr} がありません）')
+
+    def names(block):
+        return re.findall(r"'(\w+)'", block)
+
+    thresholds = [(int(v), r) for v, r in re.findall(r"val < (\d+)\) rarity = '(\w+)'", body)]
+    last = re.search(r"else rarity = '(\w+)'", body)
+    elements = re.search(r'const elements[^=]*= \[(.*?)\]', body)
+    skills = dict(re.findall(r"rarity === '(\w+)'\) \{\s*skills = \[(.*?)\]", body))
+    other_skills = re.search(r'\} else \{\s*skills = \[(.*?)\]', body)
+    power = re.search(r'const basePower = \{(.*?)\}\[rarity\]', body)
+    if not (thresholds and last and elements and skills and other_skills and power):
+        raise ValueError(f'{path} の getDefaultKanjiAttributes から規則を読み取れません')
+    rarities = [r for _, r in thresholds] + [last.group(1)]
+    skills = {r: names(block) for r, block in skills.items()}
+    for rarity in rarities:
+        skills.setdefault(rarity, names(other_skills.group(1)))
+    return {
+        'thresholds': thresholds,
+        'last': last.group(1),
+        'elements': names(elements.group(1)),
+        'skills': skills,
+        'power': {r: int(v) for r, v in re.findall(r'(\w+): (\d+)', power.group(1))},
+    }
+
+
+def default_rule_row(kanji, rule):
+    """read_default_rule の規則（getDefaultKanjiAttributes）で求めた [漢字, レアリティ, 属性, スキル, パワー]"""
+    code = ord(kanji)
+    rarity = next((r for limit, r in rule['thresholds'] if code % 100 < limit), rule['last'])
+    skills = rule['skills'][rarity]
+    return [kanji, rarity, rule['elements'][code % len(rule['elements'])], skills[code % len(skills)],
+            rule['power'][rarity] + code % 2]
+
+
+def read_attribute_rows(csv_file):
+    """attributes.csv の [漢字, レアリティ, 属性, スキル, パワー, ...] の行を返す"""
+    with open(csv_file, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        next(reader)  # ヘッダーをスキップ
+        return [row[:4] + [int(row[4])] + row[5:] for row in reader if row]
+
+
+def verify_rule(rows, rule_source=DEFAULT_RULE_SOURCE):
+    """特別な漢字以外の行が getDefaultKanjiAttributes の式と同じか確かめ、
+    (確かめた行の数, 違う漢字のリスト) を返す"""
+    rule = read_default_rule(rule_source)
+    checked = 0
+    mismatched = []
+    for row in rows:
+        kanji = row[0]
+        if kanji in SPECIAL_KANJI:
+            continue
+        checked += 1
+        if list(row[:5]) != default_rule_row(kanji, rule):
+            mismatched.append(kanji)
+    return checked, mismatched
+
+
+def read_kanji_list(input_file):
+    kanji_list = []
     with open(input_file, 'r', encoding='utf-8') as f:
         reader = csv.reader(f)
         next(reader)  # ヘッダーをスキップ
         for row in reader:
             if row:
                 kanji_list.append(row[0])
-    
-    # 新しいCSVを生成
-    with open(output_file, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.writer(f)
-        # ヘッダー
-        writer.writerow(['kanji', 'rarity', 'element', 'skill', 'power', 'attack', 'defense', 'speed'])
-        
-        for kanji in kanji_list:
-            if kanji in SPECIAL_KANJI:
-                # 特別な漢字
-                special = SPECIAL_KANJI[kanji]
-                writer.writerow([
-                    kanji,
-                    special['rarity'],
-                    special['element'],
-                    special['skill'],
-                    special['power'],
-                    special['attack'],
-                    special['defense'],
-                    special['speed']
-                ])
-            else:
-                # 自動生成
-                char_code = ord(kanji)
-                rarity = get_rarity_weights(char_code)
-                element = get_element_from_code(char_code)
-                skill = get_skill_from_rarity_and_code(rarity, char_code)
-                power = get_power_from_rarity(rarity, char_code)
-                attack, defense, speed = get_stats_from_element_and_rarity(element, rarity, char_code)
-                
-                writer.writerow([
-                    kanji,
-                    rarity,
-                    element,
-                    skill,
-                    power,
-                    attack,
-                    defense,
-                    speed
-                ])
-    
-    print(f"✅ 生成完了: {output_file}")
+    return kanji_list
+
+
+def parse_range(text):
+    """'4E00-9FFF' のような文字コードの範囲を漢字のリストにする"""
+    start, _, end = text.partition('-')
+    return [chr(code) for code in range(int(start, 16), int(end or start, 16) + 1)]
+
+
+def generate_attributes_csv(input_file=DEFAULT_INPUT, output_file=DEFAULT_OUTPUT, code_range=None, dry_run=False,
+                            table_file=DEFAULT_TABLE):
+    """all.csv（または文字コードの範囲）の漢字に属性を付けた CSV と TS の表を書き出す"""
+    with STATS.timer('read'):
+        kanji_list = parse_range(code_range) if code_range else read_kanji_list(input_file)
+
+    with STATS.timer('generate'):
+        rows, histogram = generate_rows(kanji_list)
+
+    if not dry_run:
+        # 入力と別のファイルに一時ファイル経由で書き出す（途中で失敗しても入力は壊れない）
+        with STATS.timer('write'):
+            with atomic_open(output_file, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(COLUMNS)
+                writer.writerows(rows)
+        print(f"✅ 生成完了: {output_file}")
+        # 範囲を指定した試行ではアプリの表は書き換えない
+        if table_file and not code_range:
+            with STATS.timer('table'):
+                text = render_table()
+                atomic_write_text(table_file, text)
+            print(f"✅ 生成完了: {table_file} ({len(text.encode('utf-8')) // 1024} KB)")
     print(f"📊 総数: {len(kanji_list)}漢字")
-    
-    # レアリティ分布を表示
-    rarity_count = {'common': 0, 'rare': 0, 'epic': 0, 'legendary': 0}
-    for kanji in kanji_list:
-        if kanji in SPECIAL_KANJI:
-            rarity_count[SPECIAL_KANJI[kanji]['rarity']] += 1
-        else:
-            rarity = get_rarity_weights(ord(kanji))
-            rarity_count[rarity] += 1
-    
+
     print("\n📈 レアリティ分布:")
-    for rarity, count in rarity_count.items():
-        percentage = (count / len(kanji_list)) * 100
+    for rarity, count in zip(RARITIES, histogram):
+        percentage = (count / len(kanji_list)) * 100 if kanji_list else 0
         print(f"  {rarity}: {count}枚 ({percentage:.1f}%)")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='常用漢字にゲーム属性を付与します')
+    parser.add_argument('--input', default=DEFAULT_INPUT, help=f'漢字の一覧の CSV (既定: {DEFAULT_INPUT})')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help=f'属性付きの CSV の出力先 (既定: {DEFAULT_OUTPUT})')
+    parser.add_argument('--range', dest='code_range',
+                        help='入力の代わりに文字コードの範囲（例: 4E00-9FFF）の全ての文字に属性を付ける')
+    parser.add_argument('--dry-run', action='store_true', help='書き出さずにレアリティの分布だけを表示する')
+    parser.add_argument('--table', default=DEFAULT_TABLE, help=f'アプリが読む属性の表の出力先 (既定: {DEFAULT_TABLE})')
+    parser.add_argument('--verify', action='store_true',
+                        help='書き出さずに表が SPECIAL_KANJI と、--output（無ければ --input から作った行）の'
+                             '規則の行が TS の規則と一致するか確認する')
+    add_stats_arguments(parser)
+    args = parser.parse_args()
+    # 範囲の試行で、アプリが使う属性の CSV を上書きしないようにする
+    if args.code_range and not args.dry_run and Path(args.output).resolve() == Path(DEFAULT_OUTPUT).resolve():
+        print(f"✗ --range を指定した場合は --dry-run か、{DEFAULT_OUTPUT} 以外の --output を指定してください")
+        sys.exit(1)
+    if Path(args.input).resolve() == Path(args.output).resolve() and not args.code_range:
+        print("✗ 入力と出力に同じファイルは指定できません")
+        sys.exit(1)
+    start_stats('generate_kanji_attributes', args)
+    if args.verify:
+        with STATS.timer('verify'):
+            mismatched = verify_table(args.table)
+            # attributes.csv が無ければ --input から行を作って確かめる
+            if Path(args.output).exists():
+                rows, source = read_attribute_rows(args.output), args.output
+            else:
+                rows, source = generate_rows(read_kanji_list(args.input))[0], args.input
+            checked, rule_mismatched = verify_rule(rows)
+        for kanji in mismatched[:20]:
+            print(f"  ✗ {kanji}")
+        if mismatched:
+            print(f"✗ {args.table} が SPECIAL_KANJI と {len(mismatched)} 字で一致しません")
+        else:
+            print(f"✓ {args.table} は SPECIAL_KANJI と一致しています")
+        for kanji in rule_mismatched[:20]:
+            print(f"  ✗ {kanji}")
+        if rule_mismatched:
+            print(f"✗ {source} の {len(rule_mismatched)} / {checked} 字が {DEFAULT_RULE_SOURCE} の"
+                  f" getDefaultKanjiAttributes と一致しません")
+        else:
+            print(f"✓ {source} の {checked} 字は {DEFAULT_RULE_SOURCE} の getDefaultKanjiAttributes と一致しています")
+        finish_stats(args)
+        sys.exit(1 if mismatched or rule_mismatched else 0)
+    generate_attributes_csv(args.input, args.output, args.code_range, args.dry_run, args.table)
+    finish_stats(args)
 
 if __name__ == '__main__':
-    generate_attributes_csv()
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+スクレイピング用ツール共通のオンディスクHTTPキャッシュ
+
+URLをキーにレスポンス本文と主要なヘッダーを .http_cache/ に保存する。
+scrape_kanji.py / test_html.py / fetch_images.py / process_html_direct.py が共有する。
+
+モード:
+    record  : キャッシュが有効期限内ならそれを返し、期限切れ・未取得なら取得して保存する（既定）
+              期限切れのものは ETag / Last-Modified の条件付きリクエストで再検証する（変更が無ければ 304 で済む）。
+              既定の有効期限は 0 秒（毎回再検証する）。一覧ページの新しい投稿を見落とさないため
+    replay  : キャッシュだけを使う（ネットワークに接続しない。未取得のURLはエラー）
+    refresh : 常にネットワークから取得し直してキャッシュを更新する
+    off     : キャッシュを使わない（cache_from_args は None を返す）
+
+容量が上限を超えたら、最後に使われた時刻が古いものから削除する（LRU）。
+
+使用方法:
+    python http_cache.py            # キャッシュの件数と容量を表示
+    python http_cache.py --clear    # キャッシュを全て削除
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+CACHE_DIR = '.http_cache'
+MODES = ('record', 'replay', 'refresh', 'off')
+DEFAULT_MODE = 'record'
+# 0 = 毎回条件付きリクエストで再検証する（--cache-ttl で期限内は再検証せずに使える）
+DEFAULT_TTL = 0
+DEFAULT_MAX_MB = 1024
+
+# キャッシュに保存するレスポンスヘッダー
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+class CacheMiss(Exception):
+    """replay モードでキャッシュに無いURLを要求した"""
+
+
+def _make_response(url, status_code, headers, content):
+    """キャッシュの内容から requests.Response を組み立てる（呼び出し側は通常のレスポンスと同じに扱える）"""
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = content
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+class HttpCache:
+    """URL → レスポンス のオンディスクキャッシュ（複数スレッドから利用できる）"""
+
+    def __init__(self, cache_dir=CACHE_DIR, mode=DEFAULT_MODE, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        if mode not in MODES:
+            raise ValueError(f'不明なキャッシュモード: {mode}')
+        self.cache_dir = Path(cache_dir)
+        self.mode = mode
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes = None
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = self.cache_dir / key[:2] / key
+        return base.with_suffix('.body'), base.with_suffix('.json')
+
+    def lookup(self, url):
+        """キャッシュ済みのエントリ (メタ情報, 本文のパス) を返す。無ければ None"""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not body_path.exists():
+            return None
+        return meta, body_path
+
+    def _hit(self, url, meta, body_path):
+        # 本文ファイルの更新時刻を最終利用時刻として使う（LRU用）
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        response = _make_response(url, meta['status'], meta['headers'], body_path.read_bytes())
+        response.from_cache = True
+        return response
+
+    def store(self, url, content, headers=None, status=200):
+        """レスポンスをキャッシュに保存する"""
+        body_path, meta_path = self._paths(url)
+        body_path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            'url': url,
+            'status': status,
+            'headers': {name: headers.get(name) for name in STORED_HEADERS if headers and headers.get(name)},
+            'fetched_at': time.time(),
+            'size': len(content),
+        }
+        old_size = body_path.stat().st_size if body_path.exists() else 0
+
+        tmp_path = body_path.parent / f'{body_path.name}.{threading.get_ident()}.tmp'
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, body_path)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += len(content) - old_size
+        self.evict()
+
+    def _touch_fetched(self, meta_path, meta):
+        meta['fetched_at'] = time.time()
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    def get(self, url, session=None, headers=None, timeout=10):
+        """モードに従ってキャッシュまたはネットワークからレスポンスを返す"""
+        http = session or requests
+        if self.mode == 'off':
+            return http.get(url, headers=headers, timeout=timeout)
+
+        entry = self.lookup(url) if self.mode != 'refresh' else None
+        if entry is not None:
+            meta, body_path = entry
+            if self.mode == 'replay' or time.time() - meta.get('fetched_at', 0) < self.ttl:
+                return self._hit(url, meta, body_path)
+        elif self.mode == 'replay':
+            raise CacheMiss(f'キャッシュにありません: {url}')
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            # キャッシュに本文がある場合は、呼び出し側の条件付きヘッダーではなくキャッシュの内容で再検証する
+            # （キャッシュが無い場合は呼び出し側のもの（image_manifest の検証子など）をそのまま送る）
+            request_headers.pop('If-None-Match', None)
+            request_headers.pop('If-Modified-Since', None)
+            meta, _ = entry
+            if meta['headers'].get('ETag'):
+                request_headers['If-None-Match'] = meta['headers']['ETag']
+            if meta['headers'].get('Last-Modified'):
+                request_headers['If-Modified-Since'] = meta['headers']['Last-Modified']
+
+        with self._lock:
+            self.misses += 1
+        response = http.get(url, headers=request_headers, timeout=timeout)
+
+        if response.status_code == 304 and entry is not None:
+            meta, body_path = entry
+            self._touch_fetched(self._paths(url)[1], meta)
+            return self._hit(url, meta, body_path)
+        # 呼び出し側の条件付きヘッダーへの 304 は本文が無いのでそのまま返す
+
+        if response.status_code == 200:
+            self.store(url, response.content, response.headers, response.status_code)
+        response.from_cache = False
+        return response
+
+    def _entries(self):
+        if not self.cache_dir.exists():
+            return []
+        return [p for p in self.cache_dir.glob('*/*.body')]
+
+    def total_bytes(self):
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(p.stat().st_size for p in self._entries())
+            return self._total_bytes
+
+    def evict(self):
+        """容量の上限を超えていたら、最後に使われた時刻が古いエントリから削除する"""
+        if self.total_bytes() <= self.max_bytes:
+            return 0
+
+        with self._lock:
+            bodies = sorted(self._entries(), key=lambda p: p.stat().st_mtime)
+            removed = 0
+            for body_path in bodies:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                size = body_path.stat().st_size
+                body_path.unlink(missing_ok=True)
+                body_path.with_suffix('.json').unlink(missing_ok=True)
+                self._total_bytes -= size
+                removed += 1
+            return removed
+
+    def clear(self):
+        """全てのエントリを削除する"""
+        with self._lock:
+            for body_path in self._entries():
+                body_path.unlink(missing_ok=True)
+                body_path.with_suffix('.json').unlink(missing_ok=True)
+            self._total_bytes = 0
+
+
+def add_cache_arguments(parser):
+    """各ツール共通のキャッシュ関連オプションを追加する"""
+    group = parser.add_argument_group('HTTPキャッシュ')
+    group.add_argument('--cache-mode', choices=MODES, default=DEFAULT_MODE,
+                       help=f'キャッシュのモード (既定: {DEFAULT_MODE})')
+    group.add_argument('--cache-dir', default=CACHE_DIR, help=f'キャッシュの保存先 (既定: {CACHE_DIR})')
+    group.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL,
+                       help=f'record モードで再検証せずに使う期間（秒、既定: {DEFAULT_TTL} = 毎回再検証）')
+    group.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_MB,
+                       help=f'キャッシュの容量上限（MB、既定: {DEFAULT_MAX_MB}）')
+
+
+def cache_from_args(args):
+    """add_cache_arguments で追加したオプションから HttpCache を作成する（--cache-mode off なら None）"""
+    if args.cache_mode == 'off':
+        return None
+    return HttpCache(
+        cache_dir=args.cache_dir,
+        mode=args.cache_mode,
+        ttl=args.cache_ttl,
+        max_bytes=int(args.cache_max_mb * 1024 * 1024),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTTPキャッシュの状態を表示・削除します')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help=f'キャッシュの保存先 (既定: {CACHE_DIR})')
+    parser.add_argument('--clear', action='store_true', help='キャッシュを全て削除する')
+    args = parser.parse_args()
+
+    cache = HttpCache(cache_dir=args.cache_dir)
+    if args.clear:
+        cache.clear()
+        print(f"✓ キャッシュを削除しました: {cache.cache_dir}")
+        return
+
+    print(f"キャッシュ: {cache.cache_dir}")
+    print(f"  件数: {len(cache._entries())}")
+    print(f"  容量: {cache.total_bytes() / 1024 / 1024:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
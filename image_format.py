@@ -0,0 +1,90 @@
+"""
+画像データの形式判定と検証
+
+拡張子やURLではなく、ファイル先頭のマジックバイトから実際の形式を判定する。
+（atwiki には .png という名前の JPEG などが混ざっている）
+Pillow があれば実際にデコードして検証し、無ければファイル構造だけを確認する。
+"""
+
+import io
+import os
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# 形式 → (拡張子, MIMEタイプ)
+FORMATS = {
+    'png': ('.png', 'image/png'),
+    'jpeg': ('.jpg', 'image/jpeg'),
+    'gif': ('.gif', 'image/gif'),
+    'webp': ('.webp', 'image/webp'),
+}
+
+# 同じ形式として扱う拡張子
+EXTENSION_ALIASES = {'.jpeg': '.jpg', '.jpe': '.jpg'}
+
+
+def detect_format(data):
+    """マジックバイトから画像の形式（'png' / 'jpeg' / 'gif' / 'webp'）を返す。不明なら None"""
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'png'
+    if data[:3] == b'\xff\xd8\xff':
+        return 'jpeg'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+def extension_for(fmt):
+    return FORMATS[fmt][0]
+
+
+def mime_type_for(fmt):
+    return FORMATS[fmt][1]
+
+
+def has_correct_extension(path, fmt):
+    """path の拡張子が形式と一致しているか"""
+    ext = os.path.splitext(str(path))[1].lower()
+    return EXTENSION_ALIASES.get(ext, ext) == extension_for(fmt)
+
+
+def with_correct_extension(path, fmt):
+    """拡張子を形式に合わせたパスを返す（path が str なら str、Path なら Path）"""
+    if has_correct_extension(path, fmt):
+        return path
+    root = os.path.splitext(str(path))[0]
+    fixed = root + extension_for(fmt)
+    return fixed if isinstance(path, str) else type(path)(fixed)
+
+
+def _check_structure(data, fmt):
+    # Pillow が無い場合の簡易チェック（末尾まで揃っているか）
+    if fmt == 'png':
+        return data.rstrip(b'\0').endswith(b'IEND\xaeB`\x82')
+    if fmt == 'jpeg':
+        return data.rstrip(b'\0').endswith(b'\xff\xd9')
+    if fmt == 'gif':
+        return data.rstrip(b'\0').endswith(b';')
+    if fmt == 'webp':
+        return len(data) >= 12 and int.from_bytes(data[4:8], 'little') + 8 <= len(data)
+    return False
+
+
+def verify_image(data, fmt=None):
+    """画像データが壊れていないか確認する。問題があればその理由を、無ければ None を返す"""
+    fmt = fmt or detect_format(data)
+    if fmt is None:
+        return '画像の形式を判定できません'
+    if Image is None:
+        return None if _check_structure(data, fmt) else f'{fmt} のデータが途中で切れています'
+    try:
+        with Image.open(io.BytesIO(data)) as im:
+            im.load()
+    except Exception as e:
+        return f'デコードできません: {e}'
+    return None
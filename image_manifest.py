@@ -0,0 +1,120 @@
+"""
+スクレイピングした画像のマニフェストを管理するモジュール
+
+出力ディレクトリごとに、画像URLをキーとして
+ETag / Last-Modified / 内容ハッシュ / バイト数 / 保存先 / wiki のID を記録する。
+再スクレイピング時は条件付きリクエスト (If-None-Match / If-Modified-Since) を送り、
+304 が返った画像や内容ハッシュが一致した画像はディスクへの書き込みを省略する。
+"""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+from atomic_io import atomic_open
+
+MANIFEST_NAME = '.scrape_manifest.json'
+
+
+def sha256_bytes(data):
+    """バイト列のSHA-256を16進文字列で返す"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ImageManifest:
+    """画像URL → 取得情報 の対応表（ダウンロードワーカーから並列に更新される）"""
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / MANIFEST_NAME
+        self.entries = {}
+        self.counts = {'new': 0, 'updated': 0, 'skipped': 0}
+        self._lock = threading.Lock()
+
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('images', {})
+            except (OSError, ValueError) as e:
+                print(f"警告: マニフェストを読み込めませんでした ({self.path}) - {e}")
+                self.entries = {}
+
+    def _relative(self, save_path):
+        return Path(save_path).relative_to(self.output_dir).as_posix()
+
+    def _is_current(self, entry, save_path):
+        """記録済みのファイルが保存先にそのまま残っているか"""
+        save_path = Path(save_path)
+        return (
+            entry.get('path') == self._relative(save_path)
+            and save_path.exists()
+            and save_path.stat().st_size == entry.get('size')
+        )
+
+    def conditional_headers(self, url, save_path):
+        """前回の取得結果がそのまま使える場合だけ条件付きリクエスト用ヘッダーを返す"""
+        with self._lock:
+            entry = self.entries.get(url)
+        if not entry or not self._is_current(entry, save_path):
+            return {}
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def is_unchanged(self, url, data, save_path):
+        """取得した内容が保存済みのファイルと同一か（ハッシュで判定）"""
+        with self._lock:
+            entry = self.entries.get(url)
+        return bool(entry) and entry.get('sha256') == sha256_bytes(data) and self._is_current(entry, save_path)
+
+    def record_not_modified(self, url):
+        """304 Not Modified を記録する"""
+        with self._lock:
+            self.counts['skipped'] += 1
+
+    def record(self, url, response, data, save_path, skipped=False, wiki_id=None):
+        """取得結果を記録し、'new' / 'updated' / 'skipped' のいずれかを返す"""
+        entry = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'sha256': sha256_bytes(data),
+            'size': len(data),
+            'path': self._relative(save_path),
+        }
+        with self._lock:
+            wiki_id = wiki_id or self.entries.get(url, {}).get('id')
+            if wiki_id:
+                entry['id'] = wiki_id
+            if skipped:
+                status = 'skipped'
+            elif url in self.entries:
+                status = 'updated'
+            else:
+                status = 'new'
+            self.entries[url] = entry
+            self.counts[status] += 1
+        return status
+
+    def remember(self, url, path, wiki_id):
+        """ダウンロードしなかった画像の wiki のIDと保存先を記録する（--delta）"""
+        with self._lock:
+            entry = self.entries.setdefault(url, {})
+            entry['path'] = path
+            entry['id'] = wiki_id
+
+    def paths_by_id(self):
+        """wiki のID（ID:0001 の 0001）→ 保存先 の対応を返す"""
+        with self._lock:
+            return {entry['id']: entry.get('path') for entry in self.entries.values() if entry.get('id')}
+
+    def save(self):
+        """マニフェストを書き出す"""
+        with self._lock:
+            data = {'images': dict(sorted(self.entries.items()))}
+        with atomic_open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+画像のハッシュの記録と、重複・類似画像の検出・まとめ
+
+scrape_kanji.py / merge_level.py は画像を {idx}_{読み}.png という名前で保存するため、
+同じ画像が2回アップロードされたり、別のレベルと共通だったりすると同じ内容が何度も保存される。
+
+このスクリプトは指定したディレクトリの画像ごとに
+  - sha256     : バイト列が完全に同じ画像を見つける
+  - dHash      : 9x8 に縮小したグレースケール画像の隣り合う画素の大小（64ビット）。
+                 少し編集しただけの再アップロードでもハミング距離が小さくなる
+を計算して .image_store/index.json に記録し（大きさと更新時刻が変わっていない画像は計算し直さない）、
+完全に同じ画像と、dHash のハミング距離が --threshold 以下の似ている画像を報告する。
+
+--dedupe を付けると、完全に同じ画像ごとに1枚（パスの順で最初の画像）だけを残し、
+public/kanji/level-*/mappings.csv で残りの画像を指している表示用の列（webp, avif, thumb）を
+残す画像への相対パス（別のレベルなら ../level-7/images/... ）に書き換えてから、残りの画像を消す。
+path 列は行の識別子（アプリの Item.filename、.optimize_manifest.json などのキー）のため書き換えず、
+path 列から参照されている画像と、mappings.csv から参照されていない画像（public/nazo の画像など）は
+報告だけして消さない。似ているだけの画像は内容が違うため、報告だけして置き換えない。
+
+使用方法:
+    python image_store.py [ディレクトリ...] [--threshold N] [--dedupe] [--report report.json]
+
+例:
+    python image_store.py
+    python image_store.py public/kanji/level-7 public/kanji/level-8 public/nazo --dedupe
+"""
+
+import argparse
+import json
+import os
+import posixpath
+from collections import defaultdict
+from pathlib import Path
+
+from atomic_io import atomic_open
+from mappings_io import read_mappings, write_mappings
+from merge_level import file_sha256
+from pipeline_stats import STATS, add_stats_arguments, finish_stats, log, start_stats
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+STORE_DIR = '.image_store'
+DEFAULT_ROOTS = ['public/kanji/level-7', 'public/kanji/level-8', 'public/nazo']
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif'}
+
+# --dedupe で書き換える mappings.csv の列（path 列は行の識別子のため書き換えない）
+DISPLAY_COLUMNS = ('webp', 'avif', 'thumb')
+
+DHASH_SIZE = 8
+DEFAULT_THRESHOLD = 4
+
+
+def dhash(path, size=DHASH_SIZE):
+    """画像の dHash（size*size ビットの整数）を返す"""
+    with Image.open(path) as im:
+        im.load()
+        if 'A' in im.getbands() or 'transparency' in im.info:
+            # 透明な部分は白として扱う（黒になると線画の画像が全て似てしまう）
+            im = im.convert('RGBA')
+            background = Image.new('RGBA', im.size, (255, 255, 255, 255))
+            im = Image.alpha_composite(background, im)
+        small = im.convert('L').resize((size + 1, size), Image.LANCZOS)
+    pixels = small.tobytes()
+    value = 0
+    for y in range(size):
+        row = pixels[y * (size + 1):(y + 1) * (size + 1)]
+        for x in range(size):
+            value = (value << 1) | (row[x] > row[x + 1])
+    return value
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+class HammingIndex:
+    """ハミング距離で近いハッシュを探す索引（マルチインデックスハッシング）
+
+    64ビットのハッシュを bands 個の区間に分け、区間ごとに辞書を持つ。
+    距離が bands - 1 以下の2つのハッシュは、鳩の巣原理でどれかの区間が完全に一致するため、
+    全件と比べずに候補を絞り込める。
+    """
+
+    def __init__(self, bits=DHASH_SIZE * DHASH_SIZE, bands=8):
+        self.bits = bits
+        self.bands = bands
+        self.width = bits // bands
+        self.tables = [defaultdict(list) for _ in range(bands)]
+        self.hashes = {}
+
+    def _keys(self, value):
+        mask = (1 << self.width) - 1
+        return [(value >> (i * self.width)) & mask for i in range(self.bands)]
+
+    def add(self, key, value):
+        self.hashes[key] = value
+        for table, band in zip(self.tables, self._keys(value)):
+            table[band].append(key)
+
+    def query(self, value, threshold):
+        """距離が threshold 以下の [(距離, キー)] を返す"""
+        if threshold >= self.bands:
+            raise ValueError(f'threshold は {self.bands - 1} 以下にしてください')
+        candidates = set()
+        for table, band in zip(self.tables, self._keys(value)):
+            candidates.update(table.get(band, ()))
+        found = [(hamming(value, self.hashes[key]), key) for key in candidates]
+        return sorted((d, key) for d, key in found if d <= threshold)
+
+
+class ImageStore:
+    """.image_store/ の画像ごとのハッシュの記録"""
+
+    def __init__(self, store_dir=STORE_DIR):
+        self.store_dir = Path(store_dir)
+        self.index_path = self.store_dir / 'index.json'
+        self.files = {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.files = json.load(f).get('files', {})
+        except (OSError, ValueError):
+            pass
+
+    def save(self):
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        with atomic_open(self.index_path, 'w', encoding='utf-8') as f:
+            json.dump({'files': dict(sorted(self.files.items()))}, f, ensure_ascii=False, indent=2)
+
+    def scan(self, roots):
+        """roots 以下の画像のハッシュを更新する。見つからなくなった画像は記録から消す"""
+        seen = set()
+        for root in roots:
+            for path in sorted(Path(root).rglob('*')):
+                if path.suffix.lower() not in IMAGE_EXTENSIONS or not path.is_file():
+                    continue
+                key = path.as_posix()
+                seen.add(key)
+                st = path.stat()
+                entry = self.files.get(key)
+                if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+                    STATS.count('cached')
+                    continue
+                with STATS.timer('hash'):
+                    entry = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': file_sha256(path)}
+                    try:
+                        entry['dhash'] = f'{dhash(path):016x}' if Image is not None else None
+                    except Exception as e:
+                        print(f"  警告: dHash を計算できません: {key} - {e}")
+                        entry['dhash'] = None
+                self.files[key] = entry
+                log(f"  {key}: {entry['sha256'][:12]} {entry['dhash']}")
+        # 対象外のディレクトリの記録は残す
+        prefixes = tuple(Path(root).as_posix().rstrip('/') + '/' for root in roots)
+        for key in [k for k in self.files if k.startswith(prefixes) and k not in seen]:
+            del self.files[key]
+
+    def exact_duplicates(self):
+        """{sha256: [パス...]}（2つ以上あるものだけ）"""
+        groups = defaultdict(list)
+        for key, entry in sorted(self.files.items()):
+            groups[entry['sha256']].append(key)
+        return {sha: paths for sha, paths in groups.items() if len(paths) > 1}
+
+    def near_duplicates(self, threshold=DEFAULT_THRESHOLD):
+        """内容は違うが dHash の距離が threshold 以下の組 [(距離, パス, パス)]"""
+        index = HammingIndex()
+        first_path = {}
+        pairs = []
+        with STATS.timer('match'):
+            for key, entry in sorted(self.files.items()):
+                sha = entry['sha256']
+                if not entry.get('dhash') or sha in first_path:
+                    continue
+                first_path[sha] = key
+                value = int(entry['dhash'], 16)
+                for distance, other in index.query(value, threshold):
+                    pairs.append((distance, other, key))
+                index.add(key, value)
+        return sorted(pairs)
+
+    def dedupe(self, exact, public_dir='public'):
+        """完全に同じ画像の mappings.csv の表示用の列の参照を1枚にまとめ、参照されなくなった画像を消す。
+        (書き換えた参照の数, 消したパスの一覧, path 列から参照されている・参照が無いため残したパスの一覧) を返す"""
+        canonical = {}
+        for paths in exact.values():
+            for key in paths[1:]:
+                canonical[os.path.normpath(key)] = paths[0]
+
+        rewritten = 0
+        referenced = set()
+        sources = set()
+        for csv_path in sorted(Path(public_dir).glob('kanji/level-*/mappings.csv')):
+            level_dir = csv_path.parent
+            header, rows = read_mappings(csv_path)
+            changed = False
+            for row in rows:
+                if row.get('path'):
+                    sources.add(os.path.normpath(level_dir / row['path']))
+                for name in DISPLAY_COLUMNS:
+                    value = row.get(name)
+                    if not value:
+                        continue
+                    # 他のレベルの画像は ../level-7/... のように level_dir からの相対パスで指す
+                    target = os.path.normpath(level_dir / value)
+                    if target not in canonical:
+                        continue
+                    referenced.add(target)
+                    row[name] = posixpath.relpath(canonical[target], level_dir.as_posix())
+                    rewritten += 1
+                    changed = True
+            if changed:
+                write_mappings(csv_path, header, rows)
+                log(f"  {csv_path}: 参照を書き換えました")
+
+        removed = []
+        kept = []
+        for target, first in sorted(canonical.items()):
+            key = Path(target).as_posix()
+            if target not in referenced or target in sources:
+                kept.append(key)
+                continue
+            Path(target).unlink()
+            self.files.pop(key, None)
+            removed.append(key)
+            log(f"  削除 {key} (= {first})")
+        return rewritten, removed, kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description='重複・類似した画像を検出し、同じ画像を1枚にまとめます')
+    parser.add_argument('roots', nargs='*', default=DEFAULT_ROOTS,
+                        help=f'画像を探すディレクトリ (既定: {" ".join(DEFAULT_ROOTS)})')
+    parser.add_argument('--threshold', type=int, default=DEFAULT_THRESHOLD,
+                        help=f'似ているとみなす dHash のハミング距離 (0-7, 既定: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--dedupe', action='store_true',
+                        help='完全に同じ画像の mappings.csv の webp / avif / thumb 列の参照を1枚にまとめ、残りの画像を消す')
+    parser.add_argument('--public', default='public', help='公開ディレクトリ (既定: public)')
+    parser.add_argument('--store', default=STORE_DIR, help=f'ストアのディレクトリ (既定: {STORE_DIR})')
+    parser.add_argument('--report', help='重複・類似の一覧を JSON で保存するパス')
+    add_stats_arguments(parser)
+    args = parser.parse_args()
+
+    if Image is None:
+        print("Pillow が無いため、完全に同じ画像だけを検出します (pip install Pillow)")
+
+    start_stats('image_store', args)
+    store = ImageStore(args.store)
+    store.scan(args.roots)
+
+    exact = store.exact_duplicates()
+    wasted = sum(store.files[paths[0]]['size'] * (len(paths) - 1) for paths in exact.values())
+    for sha, paths in exact.items():
+        print(f"  同一: {' = '.join(paths)}")
+    near = store.near_duplicates(args.threshold)
+    for distance, a, b in near:
+        print(f"  類似 (距離 {distance}): {a} ~ {b}")
+
+    if args.dedupe:
+        with STATS.timer('dedupe'):
+            rewritten, removed, kept = store.dedupe(exact, args.public)
+    store.save()
+
+    print(f"✓ 画像 {len(store.files)} 枚: 同一 {len(exact)} 組 ({wasted / 1024:.0f} KB 重複) / 類似 {len(near)} 組")
+    if args.dedupe:
+        print(f"✓ mappings.csv の参照 {rewritten} 件を書き換え、{len(removed)} 枚を削除しました")
+        for key in kept:
+            print(f"  path 列から参照されている・mappings.csv から参照されていないため残しました: {key}")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({
+                'exact': exact,
+                'near': [{'distance': d, 'a': a, 'b': b} for d, a, b in near],
+            }, f, ensure_ascii=False, indent=2)
+        print(f"✓ 一覧を保存: {args.report}")
+    finish_stats(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,371 @@
+"""
+atwiki の漢字ページから (ID, 読み方, 画像URL, 追加情報) を抽出するモジュール
+
+ページは一度だけパースし（lxml があれば lxml、なければ html.parser）、
+h3 を親要素ごとにまとめて兄弟要素を先頭から一度だけ走査する。
+巨大な保存済みページ向けに、lxml.etree.iterparse による
+ストリーミング抽出（処理済みの要素を順次破棄するのでメモリ使用量が一定）も提供する。
+"""
+
+import re
+from collections import namedtuple
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+    DEFAULT_PARSER = 'lxml'
+except ImportError:
+    etree = None
+    DEFAULT_PARSER = 'html.parser'
+
+# idx はページ内でのh3の通し番号（画像ファイル名 {idx}_{読み}.png に使う）
+KanjiRecord = namedtuple('KanjiRecord', ['idx', 'id', 'reading', 'image_url', 'additional_info'])
+
+ID_PATTERN = re.compile(r'^ID:(\d{4})')
+
+# 送り仮名を表す文字色
+OKURIGANA_COLOR = '#f54738'
+
+
+def _is_comment_fragment(text):
+    return text.startswith('<!--') or text == '@@@@@'
+
+
+def _is_okurigana(style):
+    return OKURIGANA_COLOR in (style or '').lower()
+
+
+def _normalize_reading(reading):
+    """全角スペースと「等」を削除する"""
+    if not reading:
+        return None
+    reading = reading.replace('　', '').replace('等', '')
+    return reading.strip() if reading else None
+
+
+def _image_url(src, base_url):
+    # プロトコルがない場合は追加
+    if src.startswith('//'):
+        src = 'https:' + src
+    # 相対URLを絶対URLに変換
+    return urljoin(base_url, src)
+
+
+# ---------------------------------------------------------------------------
+# BeautifulSoup 版
+# ---------------------------------------------------------------------------
+
+def extract_reading_from_element(element, skip_id=False):
+    """要素から読み方を再帰的に抽出する（内部用ヘルパー関数）
+
+    color: #F54738; のspan要素は ''で囲む
+    """
+    parts = []
+
+    for content in element.children:
+        # 文字列ノード
+        if isinstance(content, str):
+            text = content.strip()
+            if not text:
+                continue
+            # HTMLコメントの断片を除外
+            if _is_comment_fragment(text):
+                continue
+            # skip_idがTrueの場合、ID表記を除外
+            if skip_id and text.startswith('ID'):
+                continue
+            parts.append(text)
+
+        # タグノード
+        elif hasattr(content, 'name'):
+            # color: #F54738 の場合は送り仮名として ''で囲む
+            if _is_okurigana(content.get('style', '')):
+                # この要素内のテキストを取得（コメントを除外）
+                inner_text = ''.join([
+                    s.strip() for s in content.strings
+                    if s.strip() and not _is_comment_fragment(s.strip())
+                ])
+                if inner_text:
+                    parts.append(f"'{inner_text}'")
+            else:
+                # 再帰的に子要素を処理
+                sub_parts = extract_reading_from_element(content, skip_id=False)
+                if sub_parts:
+                    parts.append(sub_parts)
+
+    return ''.join(parts)
+
+
+def extract_reading_from_h3(h3_element):
+    """h3要素から読み方を抽出する
+
+    例: "ID:0001 あやしい" -> "あや'しい'"
+    color: #F54738; のspan要素は ''で囲む
+    """
+    return _normalize_reading(extract_reading_from_element(h3_element, skip_id=True))
+
+
+def _soup_direct_texts(div):
+    """divの直接の子のテキストノードを返す"""
+    texts = []
+    for child in div.children:
+        if isinstance(child, str):
+            text = child.strip()
+            if text and not text.startswith('<!--'):
+                texts.append(text)
+    return texts
+
+
+def _pick_image(nodes, is_picture, is_inside):
+    """元の走査（最初の picture 内の img → なければ最初の img）と同じ結果を一度の走査で求める
+
+    nodes は対象要素自身を含む picture/img 要素を文書順に並べたもの
+    """
+    first_picture = None
+    first_img = None
+    for node in nodes:
+        if is_picture(node):
+            if first_picture is None:
+                first_picture = node
+            continue
+        if first_img is None:
+            first_img = node
+        if first_picture is not None and is_inside(node, first_picture):
+            if node.get('src'):
+                return node
+            break
+    if first_img is not None and first_img.get('src'):
+        return first_img
+    return None
+
+
+def _soup_find_image(element):
+    """要素（またはその子孫）から画像のimgタグを探す"""
+    nodes = element.find_all(['picture', 'img'])
+    if element.name in ('picture', 'img'):
+        nodes.insert(0, element)
+    return _pick_image(
+        nodes,
+        lambda node: node.name == 'picture',
+        lambda node, picture: picture in node.parents,
+    )
+
+
+class _Section:
+    """h3 1つ分の抽出状態"""
+
+    __slots__ = ('idx', 'id', 'reading', 'image_url', 'main_div_texts')
+
+    def __init__(self, idx, wiki_id, reading):
+        self.idx = idx
+        self.id = wiki_id
+        self.reading = reading
+        self.image_url = None
+        self.main_div_texts = []
+
+    def to_record(self):
+        return KanjiRecord(self.idx, self.id, self.reading, self.image_url, '　'.join(self.main_div_texts))
+
+
+def make_soup(html_content, parser=None):
+    """ページを一度だけパースする"""
+    return BeautifulSoup(html_content, parser or DEFAULT_PARSER)
+
+
+def records_from_soup(soup, base_url):
+    """パース済みのページから、ID付きのh3ごとに KanjiRecord を返す
+
+    reading が None のもの（読み方なし）や image_url が None のもの（画像なし）も返すので、
+    呼び出し側で警告を出してから除外する。
+    """
+    h3_tags = soup.find_all('h3')
+    numbering = {id(h3): idx for idx, h3 in enumerate(h3_tags, start=1)}
+
+    # h3を親要素ごとにまとめ、各親の子要素を一度だけ走査する
+    parents = []
+    seen = set()
+    for h3 in h3_tags:
+        if id(h3.parent) not in seen:
+            seen.add(id(h3.parent))
+            parents.append(h3.parent)
+
+    records = []
+    for parent in parents:
+        section = None
+        for node in parent.children:
+            name = getattr(node, 'name', None)
+            if not name:
+                continue
+
+            if name == 'h3':
+                if section is not None:
+                    records.append(section.to_record())
+                section = None
+                match = ID_PATTERN.match(node.get_text(strip=True))
+                if match:
+                    section = _Section(numbering[id(node)], match.group(1), extract_reading_from_h3(node))
+                continue
+
+            if section is None or section.image_url or not section.reading:
+                continue
+
+            # divタグを保存（画像とテキストが含まれている）
+            if name == 'div':
+                section.main_div_texts = _soup_direct_texts(node)
+
+            img = _soup_find_image(node)
+            if img is not None:
+                section.image_url = _image_url(img.get('src'), base_url)
+
+        if section is not None:
+            records.append(section.to_record())
+
+    records.sort(key=lambda r: r.idx)
+    return records
+
+
+def extract_records(html_content, base_url, parser=None):
+    """HTML文字列から KanjiRecord のリストを返す"""
+    return records_from_soup(make_soup(html_content, parser), base_url)
+
+
+# ---------------------------------------------------------------------------
+# lxml ストリーミング版
+# ---------------------------------------------------------------------------
+
+def _is_lxml_comment(node):
+    return node.tag is etree.Comment
+
+
+def _lxml_strings(element):
+    """BeautifulSoup の .strings と同じく、コメントを除いた子孫のテキストを順に返す"""
+    if element.text:
+        yield element.text
+    for child in element:
+        if isinstance(child.tag, str):
+            yield from _lxml_strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def _lxml_children(element):
+    """BeautifulSoup の .children と同じ順序で (テキスト or 要素) を返す
+
+    コメントはテキストノードとして扱う（BeautifulSoup の Comment と同じ）
+    """
+    if element.text:
+        yield element.text
+    for child in element:
+        if _is_lxml_comment(child):
+            if child.text:
+                yield child.text
+        elif isinstance(child.tag, str):
+            yield child
+        if child.tail:
+            yield child.tail
+
+
+def _lxml_reading(element, skip_id=False):
+    """extract_reading_from_element の lxml 版"""
+    parts = []
+    for content in _lxml_children(element):
+        if isinstance(content, str):
+            text = content.strip()
+            if not text or _is_comment_fragment(text):
+                continue
+            if skip_id and text.startswith('ID'):
+                continue
+            parts.append(text)
+        elif _is_okurigana(content.get('style')):
+            inner_text = ''.join(
+                s.strip() for s in _lxml_strings(content)
+                if s.strip() and not _is_comment_fragment(s.strip())
+            )
+            if inner_text:
+                parts.append(f"'{inner_text}'")
+        else:
+            sub_parts = _lxml_reading(content)
+            if sub_parts:
+                parts.append(sub_parts)
+    return ''.join(parts)
+
+
+def _lxml_direct_texts(div):
+    texts = []
+    for content in _lxml_children(div):
+        if isinstance(content, str):
+            text = content.strip()
+            if text and not text.startswith('<!--'):
+                texts.append(text)
+    return texts
+
+
+def _lxml_is_inside(node, ancestor):
+    parent = node.getparent()
+    while parent is not None:
+        if parent is ancestor:
+            return True
+        parent = parent.getparent()
+    return False
+
+
+def _lxml_find_image(element):
+    """_soup_find_image の lxml 版"""
+    return _pick_image(
+        element.iter('picture', 'img'),
+        lambda node: node.tag == 'picture',
+        _lxml_is_inside,
+    )
+
+
+def iter_records_streaming(source, base_url, encoding='utf-8'):
+    """保存済みのページファイルを iterparse で読みながら KanjiRecord を順に返す
+
+    h3 とその兄弟要素は処理が終わり次第破棄するため、ページの大きさに関わらず
+    メモリ使用量はほぼ一定になる。h3 が同じ親要素の下に並んでいる
+    （atwiki のページ構造）ことを前提とする。
+    """
+    if etree is None:
+        raise RuntimeError('ストリーミング抽出には lxml が必要です (pip install lxml)')
+
+    h3_count = 0
+    section = None
+    container = None
+
+    for _, elem in etree.iterparse(source, events=('end',), html=True, encoding=encoding):
+        parent = elem.getparent()
+
+        if elem.tag == 'h3':
+            if section is not None:
+                yield section.to_record()
+            h3_count += 1
+            container = parent
+            section = None
+            h3_text = ''.join(s.strip() for s in _lxml_strings(elem))
+            match = ID_PATTERN.match(h3_text)
+            if match:
+                section = _Section(h3_count, match.group(1), _normalize_reading(_lxml_reading(elem, skip_id=True)))
+        elif parent is None or parent is not container or not isinstance(elem.tag, str):
+            # h3と同じ階層の要素以外は、親要素の処理時にまとめて扱う
+            continue
+        elif section is not None and not section.image_url and section.reading:
+            if elem.tag == 'div':
+                section.main_div_texts = _lxml_direct_texts(elem)
+            img = _lxml_find_image(elem)
+            if img is not None:
+                section.image_url = _image_url(img.get('src'), base_url)
+
+        # 処理済みの要素と、それより前の兄弟要素を破棄する
+        elem.clear(keep_tail=True)
+        while elem.getprevious() is not None:
+            del parent[0]
+
+    if section is not None:
+        yield section.to_record()
+
+
+def extract_records_streaming(source, base_url, encoding='utf-8'):
+    """iter_records_streaming の結果をリストで返す"""
+    return list(iter_records_streaming(source, base_url, encoding))
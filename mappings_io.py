@@ -0,0 +1,101 @@
+"""
+各レベルの mappings.csv の読み書き
+
+level-7 の mappings.csv のように、末尾に名前の無い空の列（components,,,）がある
+ファイルでも、ヘッダーの並びを保ったまま読み書きする。
+行は {列名: 値} の辞書として扱い、名前の無い列は常に空文字として書き出す。
+"""
+
+import csv
+import hashlib
+import io
+import os
+import shutil
+from pathlib import Path
+
+from atomic_io import atomic_open
+
+DEFAULT_HEADER = ['path', 'reading', 'additional_info']
+
+
+def safe_filename(s: str):
+    # 画像用の簡易ファイル名クリーニング
+    for bad in ['/', '\\', '"', "'", ':', '*', '?', '<', '>', '|']:
+        s = s.replace(bad, '_')
+    s = s.replace('、', ',')
+    return s
+
+
+def scraped_image_path(idx, reading):
+    """scrape_kanji.py が保存する画像のパス（images/12_よみ.png）"""
+    # ファイル名を安全な形式に変換（'を削除）
+    safe_reading = reading.replace('、', ',').replace('/', '_').replace('\\', '_').replace("'", '')
+    return f'images/{idx}_{safe_reading}.png'
+
+
+def image_index(path):
+    """images/12_よみ.png のようなパスから連番 12 を返す。連番が無ければ None"""
+    name = os.path.basename(path or '')
+    try:
+        return int(name.split('_', 1)[0])
+    except ValueError:
+        return None
+
+
+def mappings_version(csv_path):
+    """mappings.csv の内容のハッシュ（level.json・検索の索引の version。dataLoader.ts の getDataVersion と同じ値）"""
+    return hashlib.sha256(Path(csv_path).read_bytes()).hexdigest()[:16]
+
+
+def read_mappings(csv_path):
+    """mappings.csv を読み込み (ヘッダー, 行のリスト) を返す"""
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None) or list(DEFAULT_HEADER)
+        rows = []
+        for values in reader:
+            if not any(values):
+                continue
+            rows.append({name: value for name, value in zip(header, values) if name})
+    return header, rows
+
+
+def add_columns(header, names):
+    """ヘッダーに無い列を、名前の無い末尾の列より前に追加したヘッダーを返す"""
+    header = list(header)
+    for name in names:
+        if name and name not in header:
+            header.insert(len([h for h in header if h]), name)
+    return header
+
+
+def _format_rows(header, rows):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow([row.get(name, '') if name else '' for name in header])
+    return buf.getvalue()
+
+
+def write_mappings(csv_path, header, rows):
+    """mappings.csv を書き出す（一時ファイルに書いてから置き換える）"""
+    with atomic_open(csv_path, 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f).writerow(header)
+        f.write(_format_rows(header, rows))
+
+
+def append_mappings(csv_path, header, rows):
+    """既存の mappings.csv の末尾に行を追加する
+
+    既存部分は解析せずにバイト列のままコピーし、一時ファイルに書いてから置き換える。
+    """
+    csv_path = Path(csv_path)
+    with atomic_open(csv_path, 'wb') as out:
+        with open(csv_path, 'rb') as src:
+            shutil.copyfileobj(src, out)
+            # 最終行に改行が無い場合は補う
+            if src.tell() > 0:
+                src.seek(-1, os.SEEK_END)
+                if src.read(1) not in (b'\n', b'\r'):
+                    out.write(b'\r\n')
+        out.write(_format_rows(header, rows).encode('utf-8'))
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""temp_dir の mappings.csv と images を既存のレベルのディレクトリにマージするスクリプト
+
+マージ先には .merge_index.json（既存の読み方・画像の内容ハッシュ・最大連番）を保存し、
+次回以降は mappings.csv と画像を読み直さずに重複判定と連番の割り当てを行う。
+同じ画像が既にある行はスキップするので、同じ temp_dir を何度マージしても結果は変わらない。
+画像は同じファイルシステム上ならハードリンク（--move なら rename）で配置し、コピーはしない。
+
+使い方:
+    python merge_level.py <temp_dir> <target_dir> [--dry-run] [--move]
+
+例:
+    python merge_level.py public/kanji/level-7-36 public/kanji/level-7 --dry-run
+    python merge_level.py public/kanji/level-7-36 public/kanji/level-7
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+from atomic_io import atomic_open
+from mappings_io import (DEFAULT_HEADER, add_columns, append_mappings, image_index, read_mappings,
+                         safe_filename, write_mappings)
+from pipeline_stats import STATS, add_stats_arguments, finish_stats, log, start_stats
+
+INDEX_NAME = '.merge_index.json'
+INDEX_VERSION = 1
+
+
+def file_sha256(path):
+    """ファイル内容のSHA-256を返す"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _csv_stat(csv_path):
+    st = os.stat(csv_path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+class MergeIndex:
+    """マージ先レベルの索引（読み方 → パス、画像ハッシュ → パス、最大連番）"""
+
+    def __init__(self, target_dir):
+        self.target_dir = Path(target_dir)
+        self.path = self.target_dir / INDEX_NAME
+        self.header = None
+        self.hashes = {}
+        self.readings = {}
+        self.max_idx = 0
+        self.rows = 0
+        self.csv = None
+
+    @property
+    def csv_path(self):
+        return self.target_dir / 'mappings.csv'
+
+    def load(self):
+        """保存済みの索引が mappings.csv と一致していれば読み込んで True を返す"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get('version') != INDEX_VERSION or data.get('csv') != _csv_stat(self.csv_path):
+            return False
+        self.header = data['header']
+        self.hashes = data['hashes']
+        self.readings = data['readings']
+        self.max_idx = data['max_idx']
+        self.rows = data['rows']
+        self.csv = data['csv']
+        return True
+
+    def rebuild(self):
+        """mappings.csv と画像から索引を作り直す（初回、または mappings.csv が手で編集された場合）"""
+        self.header, rows = read_mappings(self.csv_path)
+        self.hashes = {}
+        self.readings = {}
+        self.max_idx = 0
+        self.rows = 0
+        for row in rows:
+            self.add(row)
+        self.csv = _csv_stat(self.csv_path)
+
+    def add(self, row, sha256=None):
+        """行を索引に追加する"""
+        path = row.get('path', '')
+        idx = image_index(path)
+        if idx is not None:
+            self.max_idx = max(self.max_idx, idx)
+        self.readings.setdefault(row.get('reading', ''), []).append(path)
+        self.rows += 1
+        if sha256 is None:
+            image_path = self.target_dir / path
+            if path and image_path.is_file():
+                sha256 = file_sha256(image_path)
+        if sha256:
+            self.hashes.setdefault(sha256, path)
+
+    def save(self):
+        self.csv = _csv_stat(self.csv_path)
+        data = {
+            'version': INDEX_VERSION,
+            'csv': self.csv,
+            'header': self.header,
+            'max_idx': self.max_idx,
+            'rows': self.rows,
+            'hashes': self.hashes,
+            'readings': self.readings,
+        }
+        with atomic_open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+
+def place_image(src_path, dst_path, move=False):
+    """画像を配置する。同じファイルシステムならハードリンク/rename、違えばコピー/移動する
+
+    実際に使った方法（'link' / 'rename' / 'copy' / 'move'）を返す
+    """
+    if move:
+        try:
+            os.rename(src_path, dst_path)
+            return 'rename'
+        except OSError:
+            shutil.move(src_path, dst_path)
+            return 'move'
+    try:
+        os.link(src_path, dst_path)
+        return 'link'
+    except OSError:
+        shutil.copy2(src_path, dst_path)
+        return 'copy'
+
+
+def plan_merge(temp_rows, temp_images, index):
+    """追加する行と、スキップする行（重複・画像なし）を決める
+
+    戻り値: (追加する [(行, 元画像のパス, ハッシュ)], スキップする [(行, 理由)])
+    """
+    additions = []
+    skipped = []
+    next_idx = index.max_idx + 1
+    seen = {}
+
+    for tr in temp_rows:
+        src_path = temp_images / os.path.basename(tr.get('path', ''))
+        if not src_path.is_file():
+            skipped.append((tr, f'画像がありません: {src_path}'))
+            continue
+
+        sha256 = file_sha256(src_path)
+        if sha256 in index.hashes:
+            skipped.append((tr, f'既存の画像と同一: {index.hashes[sha256]}'))
+            continue
+        if sha256 in seen:
+            skipped.append((tr, f'マージ元の画像と同一: {seen[sha256]}'))
+            continue
+        seen[sha256] = tr.get('path', '')
+
+        # 読みがあることを前提に安全なファイル名を作る
+        reading = tr.get('reading', '')
+        new_name = f"{next_idx}_{safe_filename(reading)}{src_path.suffix or '.png'}"
+        row = dict(tr)
+        row['path'] = f'images/{new_name}'
+        row.setdefault('additional_info', '')
+        additions.append((row, src_path, sha256))
+        next_idx += 1
+
+    return additions, skipped
+
+
+def merge_level(temp_dir, target_dir, dry_run=False, move=False, rebuild_index=False):
+    """temp_dir を target_dir にマージする。成功したら True を返す"""
+    temp_dir = Path(temp_dir)
+    target_dir = Path(target_dir)
+
+    temp_csv = temp_dir / 'mappings.csv'
+    temp_images = temp_dir / 'images'
+    target_csv = target_dir / 'mappings.csv'
+    target_images = target_dir / 'images'
+
+    if not temp_csv.exists():
+        print('temp mappings.csv not found:', temp_csv)
+        return False
+    if not temp_images.exists():
+        print('temp images dir not found:', temp_images)
+        return False
+
+    temp_header, temp_rows = read_mappings(temp_csv)
+
+    index = MergeIndex(target_dir)
+    with STATS.timer('index'):
+        if target_csv.exists():
+            if rebuild_index or not index.load():
+                print(f'索引を作成中: {index.path}')
+                index.rebuild()
+        else:
+            # 新しいレベル
+            index.header = list(DEFAULT_HEADER)
+
+    with STATS.timer('plan'):
+        additions, skipped = plan_merge(temp_rows, temp_images, index)
+    STATS.count('rows_skipped', len(skipped))
+
+    for row, reason in skipped:
+        log(f"  skip {row.get('path', '')} ({row.get('reading', '')}): {reason}")
+    for row, src_path, _ in additions:
+        note = ''
+        if row.get('reading', '') in index.readings:
+            note = f"  ※同じ読みの既存行: {', '.join(index.readings[row['reading']])}"
+        log(f"  add  {src_path.name} -> {row['path']}{note}")
+
+    # マージ元にだけある列はヘッダーに追加する（この場合だけ全体を書き直す）
+    new_columns = [name for name in temp_header if name and name not in index.header]
+    header = add_columns(index.header, new_columns)
+
+    if dry_run:
+        print(f'dry-run: {len(additions)} rows would be merged into {target_csv} ({len(skipped)} skipped)')
+        if new_columns:
+            print(f"dry-run: columns would be added: {', '.join(new_columns)}")
+        return True
+
+    if not additions:
+        print(f'nothing to merge into {target_csv} ({len(skipped)} skipped)')
+        return True
+
+    target_images.mkdir(parents=True, exist_ok=True)
+    placed = []
+    methods = {}
+    STATS.expect(len(additions))
+    with STATS.timer('place'):
+        for row, src_path, sha256 in additions:
+            dst_path = target_dir / row['path']
+            try:
+                method = place_image(src_path, dst_path, move=move)
+            except Exception as e:
+                print('failed to place', src_path, '->', dst_path, e)
+                continue
+            finally:
+                STATS.progress('画像')
+            methods[method] = methods.get(method, 0) + 1
+            placed.append((row, sha256))
+    for method, n in methods.items():
+        STATS.count(f'images_{method}', n)
+
+    new_rows = [row for row, _ in placed]
+    STATS.count('rows_added', len(new_rows))
+    with STATS.timer('write'):
+        if not target_csv.exists():
+            write_mappings(target_csv, header, new_rows)
+        elif new_columns:
+            _, existing_rows = read_mappings(target_csv)
+            write_mappings(target_csv, header, existing_rows + new_rows)
+        else:
+            append_mappings(target_csv, header, new_rows)
+
+        index.header = header
+        for row, sha256 in placed:
+            index.add(row, sha256)
+        index.save()
+
+    detail = ', '.join(f'{k} {v}' for k, v in sorted(methods.items()))
+    print(f'merged {len(new_rows)} rows into {target_csv} ({detail}; {len(skipped)} skipped)')
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='temp_dir の mappings.csv と images をレベルのディレクトリにマージします')
+    parser.add_argument('temp_dir', help='マージ元（scrape_kanji.py の出力ディレクトリ）')
+    parser.add_argument('target_dir', help='マージ先のレベルのディレクトリ')
+    parser.add_argument('--dry-run', action='store_true', help='変更内容を表示するだけで、ファイルは変更しない')
+    parser.add_argument('--move', action='store_true', help='画像をハードリンクではなく移動（rename）する')
+    parser.add_argument('--rebuild-index', action='store_true', help='マージ先の索引を作り直す')
+    add_stats_arguments(parser)
+    args = parser.parse_args()
+
+    start_stats('merge_level', args)
+    ok = merge_level(args.temp_dir, args.target_dir, dry_run=args.dry_run, move=args.move,
+                     rebuild_index=args.rebuild_index)
+    finish_stats(args)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+各レベルの画像を WebP（エンコーダーがあれば AVIF も）に変換するスクリプト
+
+scrape_kanji.py は取得した PNG / JPEG をそのまま保存するため、1枚あたり数百KBになる。
+このスクリプトは mappings.csv に載っている画像ごとに、
+  - 周囲の余白（左上の画素と同じ色の枠）を切り詰める
+  - 長辺を --max-size 以下に縮小する
+  - メタデータ（EXIF・ICCプロファイル等）を落とす
+の処理をしてから images/<元の名前>.webp (.avif) に書き出し、mappings.csv に webp / avif 列を追加する。
+出力の名前には元の拡張子を残す（1_xxx.png → 1_xxx.png.webp）ため、1_xxx.png と 1_xxx.jpg があっても衝突しない。
+元の画像と path 列はそのまま残す（アプリは webp 列があればそちらを使う）。
+変換結果が元の画像より大きくなる場合は出力を消して列を空にし、元の画像を使わせる。
+
+画像の変換はプロセスプールで並列に行う。元の画像の内容ハッシュと変換の設定（--max-size・--quality など）を
+<レベル>/.optimize_manifest.json に記録し、どちらかが変わった画像だけ変換し直す。
+
+使用方法:
+    python optimize_images.py <レベルのディレクトリ>... [--workers N] [--report report.json]
+
+例:
+    python optimize_images.py public/kanji/level-7 public/kanji/level-8
+    python optimize_images.py public/kanji/level-7 --max-size 800 --quality 75 --no-avif
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from atomic_io import atomic_open
+from image_manifest import sha256_bytes
+from mappings_io import add_columns, read_mappings, write_mappings
+from pipeline_stats import STATS, add_stats_arguments, finish_stats, log, start_stats
+
+try:
+    from PIL import Image, ImageChops, features
+except ImportError:
+    Image = None
+
+DEFAULT_MAX_SIZE = 1024
+DEFAULT_QUALITY = 82
+DEFAULT_AVIF_QUALITY = 60
+
+# 余白とみなす色の差と、切り詰めた後に残す余白（px）
+TRIM_TOLERANCE = 12
+TRIM_PADDING = 8
+
+MANIFEST_NAME = '.optimize_manifest.json'
+
+
+def avif_available():
+    """AVIF のエンコーダーが使えるか（Pillow 11.3 以降、または pillow-avif-plugin）"""
+    if Image is None:
+        return False
+    try:
+        if features.check('avif'):
+            return True
+    except Exception:
+        pass
+    try:
+        import pillow_avif  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def trim_border(im, tolerance=TRIM_TOLERANCE, padding=TRIM_PADDING):
+    """左上の画素と同じ色（または透明）の周囲の枠を切り詰める"""
+    if 'A' in im.getbands() and im.getpixel((0, 0))[-1] == 0:
+        bbox = im.getchannel('A').getbbox()
+    else:
+        rgb = im.convert('RGB')
+        background = Image.new('RGB', rgb.size, rgb.getpixel((0, 0)))
+        diff = ImageChops.difference(rgb, background).convert('L')
+        bbox = diff.point(lambda v: 255 if v > tolerance else 0).getbbox()
+    if not bbox:
+        return im
+
+    left, top, right, bottom = bbox
+    bbox = (max(0, left - padding), max(0, top - padding),
+            min(im.width, right + padding), min(im.height, bottom + padding))
+    if bbox == (0, 0, im.width, im.height):
+        return im
+    return im.crop(bbox)
+
+
+def prepare_image(src_path, max_size, trim=True):
+    """変換前の画像を読み込み、余白の切り詰め・縮小をしてメタデータの無い画像を返す"""
+    with Image.open(src_path) as im:
+        im.load()
+        has_alpha = 'A' in im.getbands() or 'transparency' in im.info
+        im = im.convert('RGBA' if has_alpha else 'RGB')
+    if trim:
+        im = trim_border(im)
+    if max(im.size) > max_size:
+        im.thumbnail((max_size, max_size), Image.LANCZOS)
+    # 新しい画像にコピーして元のファイルの info（EXIF・ICC等）を引き継がない
+    clean = Image.new(im.mode, im.size)
+    clean.paste(im)
+    return clean
+
+
+def _encode_webp(im, quality):
+    buf = io.BytesIO()
+    im.save(buf, 'WEBP', quality=quality, method=6)
+    data = buf.getvalue()
+    # 色数の少ない線画は可逆圧縮の方が小さくなることがある
+    if im.getcolors(256) is not None:
+        buf = io.BytesIO()
+        im.save(buf, 'WEBP', lossless=True, method=6)
+        if len(buf.getvalue()) < len(data):
+            data = buf.getvalue()
+    return data
+
+
+def _encode_avif(im, quality):
+    buf = io.BytesIO()
+    im.save(buf, 'AVIF', quality=quality)
+    return buf.getvalue()
+
+
+def format_settings(fmt, options):
+    """出力の形式ごとの、結果を左右する設定（マニフェストに記録して変更を検出する）"""
+    quality = options['quality'] if fmt == 'webp' else options['avif_quality']
+    return {'max_size': options['max_size'], 'quality': quality, 'trim': options['trim']}
+
+
+def load_manifest(level_dir):
+    try:
+        with open(Path(level_dir) / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f).get('images', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(level_dir, entries):
+    with atomic_open(Path(level_dir) / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump({'images': dict(sorted(entries.items()))}, f, ensure_ascii=False, indent=2)
+
+
+def output_path(src_path, fmt):
+    """変換結果のパス（元の拡張子を残す: 1_xxx.png → 1_xxx.png.webp）"""
+    src_path = Path(src_path)
+    return src_path.with_name(f'{src_path.name}.{fmt}')
+
+
+def optimize_image(src_path, max_size=DEFAULT_MAX_SIZE, quality=DEFAULT_QUALITY, avif=False,
+                   avif_quality=DEFAULT_AVIF_QUALITY, trim=True, redo=None, larger=()):
+    """画像1枚を変換する（プロセスプールで実行される）
+
+    redo は変換し直す形式の一覧（None なら全て）。それ以外の形式も出力が無ければ変換する。
+    larger は前回の変換で元の画像より大きくなった（出力を消した）、変換し直さない形式の一覧
+    戻り値: {'src_bytes', 'webp', 'webp_bytes', 'avif', 'avif_bytes', 'larger', 'converted', 'seconds'}
+    （webp / avif は書き出したファイルのパス。元の画像より大きくなった場合は None で、出力は消す）
+    """
+    start = time.perf_counter()
+    src_path = Path(src_path)
+    formats = ['webp', 'avif'] if avif else ['webp']
+    outputs = {fmt: output_path(src_path, fmt) for fmt in formats}
+
+    result = {'src_bytes': src_path.stat().st_size, 'larger': [], 'converted': False}
+    todo = [fmt for fmt, out in outputs.items()
+            if redo is None or fmt in redo or (fmt not in larger and not out.exists())]
+    if todo:
+        im = prepare_image(src_path, max_size, trim)
+        for fmt in todo:
+            data = _encode_webp(im, quality) if fmt == 'webp' else _encode_avif(im, avif_quality)
+            tmp_path = outputs[fmt].with_name(f'.{outputs[fmt].name}.{os.getpid()}.tmp')
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, outputs[fmt])
+        result['converted'] = True
+
+    for fmt, out in outputs.items():
+        keep = out.exists() and out.stat().st_size < result['src_bytes']
+        if not keep:
+            # 配信されないように消す（build_asset_manifest.py は画像のファイルを全て一覧に載せる）
+            if out.exists():
+                out.unlink()
+            result['larger'].append(fmt)
+        result[fmt] = str(out) if keep else None
+        result[f'{fmt}_bytes'] = out.stat().st_size if keep else result['src_bytes']
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def _format_mb(n):
+    return f"{n / 1024 / 1024:.1f} MB"
+
+
+def optimize_level(level_dir, executor, options):
+    """レベル1つ分の画像を変換して mappings.csv に列を追加し、集計を返す"""
+    level_dir = Path(level_dir)
+    csv_path = level_dir / 'mappings.csv'
+    header, rows = read_mappings(csv_path)
+    formats = ['webp', 'avif'] if options['avif'] else ['webp']
+    manifest = load_manifest(level_dir)
+    settings = {fmt: format_settings(fmt, options) for fmt in formats}
+    encode_options = {name: value for name, value in options.items() if name != 'force'}
+
+    futures = {}
+    for row in rows:
+        src_path = level_dir / row.get('path', '')
+        if not row.get('path') or not src_path.is_file():
+            print(f"  警告: 画像がありません: {src_path}")
+            continue
+        digest = sha256_bytes(src_path.read_bytes())
+        entry = manifest.get(row['path'], {})
+        # 元の画像の内容か設定が前回と違う形式だけ変換し直す
+        redo = [fmt for fmt in formats
+                if options['force'] or entry.get('sha256') != digest or entry.get(fmt) != settings[fmt]]
+        larger = [fmt for fmt in entry.get('larger', []) if fmt not in redo]
+        futures[executor.submit(optimize_image, str(src_path), redo=redo, larger=larger,
+                                **encode_options)] = (row, digest)
+    STATS.expect(len(futures))
+
+    report = {'level': str(level_dir), 'images': len(futures), 'converted': 0, 'failed': 0, 'src_bytes': 0}
+    for fmt in formats:
+        report[f'{fmt}_bytes'] = 0
+    files = []
+    for future in as_completed(futures):
+        row, digest = futures[future]
+        STATS.progress('画像')
+        try:
+            result = future.result()
+        except Exception as e:
+            report['failed'] += 1
+            print(f"  変換に失敗: {row.get('path')} - {e}")
+            continue
+        STATS.add_time('encode', result['seconds'])
+        report['converted'] += result['converted']
+        manifest[row['path']] = dict({'sha256': digest, 'larger': result['larger']}, **settings)
+        report['src_bytes'] += result['src_bytes']
+        for fmt in formats:
+            out = result[fmt]
+            row[fmt] = Path(out).relative_to(level_dir).as_posix() if out else ''
+            report[f'{fmt}_bytes'] += result[f'{fmt}_bytes']
+        files.append(dict({'path': row.get('path'), 'src_bytes': result['src_bytes']},
+                          **{f'{fmt}_bytes': result[f'{fmt}_bytes'] for fmt in formats}))
+        log(f"  {row.get('path')}: {result['src_bytes'] // 1024} KB -> "
+            + ' / '.join(f"{fmt} {result[f'{fmt}_bytes'] // 1024} KB" for fmt in formats))
+
+    with STATS.timer('write'):
+        write_mappings(csv_path, add_columns(header, formats), rows)
+        save_manifest(level_dir, manifest)
+
+    summary = ', '.join(
+        f"{fmt} {_format_mb(report[f'{fmt}_bytes'])} ({report[f'{fmt}_bytes'] / max(1, report['src_bytes']):.0%})"
+        for fmt in formats
+    )
+    print(f"✓ {level_dir}: {report['images']} 枚 (変換 {report['converted']} / 失敗 {report['failed']})"
+          f" 元 {_format_mb(report['src_bytes'])} -> {summary}")
+    report['files'] = sorted(files, key=lambda f: f['path'])
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='各レベルの画像を WebP / AVIF に変換します')
+    parser.add_argument('levels', nargs='+', help='mappings.csv のあるレベルのディレクトリ')
+    parser.add_argument('--workers', type=int, default=None, help='変換するプロセス数 (既定: CPUコア数)')
+    parser.add_argument('--max-size', type=int, default=DEFAULT_MAX_SIZE,
+                        help=f'長辺の最大ピクセル数 (既定: {DEFAULT_MAX_SIZE})')
+    parser.add_argument('--quality', type=int, default=DEFAULT_QUALITY, help=f'WebP の品質 (既定: {DEFAULT_QUALITY})')
+    parser.add_argument('--avif-quality', type=int, default=DEFAULT_AVIF_QUALITY,
+                        help=f'AVIF の品質 (既定: {DEFAULT_AVIF_QUALITY})')
+    parser.add_argument('--no-avif', action='store_true', help='AVIF を作らない')
+    parser.add_argument('--no-trim', action='store_true', help='周囲の余白を切り詰めない')
+    parser.add_argument('--force', action='store_true', help='変換済みの画像も変換し直す')
+    parser.add_argument('--report', help='サイズの集計を JSON で保存するパス')
+    add_stats_arguments(parser)
+    args = parser.parse_args()
+
+    if Image is None:
+        print("エラー: Pillow が必要です (pip install Pillow)")
+        sys.exit(1)
+
+    start_stats('optimize_images', args)
+    avif = not args.no_avif and avif_available()
+    if not args.no_avif and not avif:
+        print("AVIF のエンコーダーが無いため WebP だけを作成します")
+    options = {
+        'max_size': args.max_size,
+        'quality': args.quality,
+        'avif': avif,
+        'avif_quality': args.avif_quality,
+        'trim': not args.no_trim,
+        'force': args.force,
+    }
+
+    reports = []
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for level_dir in args.levels:
+            reports.append(optimize_level(level_dir, executor, options))
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'options': options, 'levels': reports}, f, ensure_ascii=False, indent=2)
+        print(f"✓ サイズの集計を保存: {args.report}")
+    finish_stats(args)
+    sys.exit(0 if all(r['failed'] == 0 for r in reports) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+連番のアニメーションのフレームを1枚の画像（アトラス）にまとめるスクリプト
+
+零のアニメーション（public/images/zeroAnime/Scene1_000.png ... 91枚, 1280x720）は
+フレームごとに1ファイルを取得しており、どのフレームも大部分は透明か、前のフレームと同じである。
+このスクリプトはフレームごとに
+  - 前のフレームから変わった範囲（差分の外接矩形）
+  - フレーム自体の描画範囲（透明でない部分の外接矩形）
+の小さい方だけを切り出してアトラスに詰め、フレームの一覧を atlas.json に書き出す。
+
+    {
+      "format": 1,
+      "version": "<入力のハッシュ>",
+      "width": 1280, "height": 720,
+      "pages": ["/images/zeroAnime/atlas-0.webp"],
+      "frames": [{"duration": 42, "key": true, "rect": [ページ, x, y, 幅, 高さ], "x": 488, "y": 152}, ...]
+    }
+
+key が true のフレームはキャンバス全体を消してから、false のフレームは (x, y) の範囲だけを消してから
+rect の部分を描く（前のフレームに重ねる）。前と全く同じフレームは前のフレームの duration に足す。
+アプリ (src/utils/frameAtlas.ts) はアトラスと atlas.json の2回の取得でアニメーションを再生する。
+
+入力（フレームの内容と設定）のハッシュが前回と同じ場合は作り直さない。Pillow が必要。
+
+使用方法:
+    python pack_frames.py [フレームのディレクトリ] [--pattern 'Scene1_*.png'] [--fps 24] [--format webp|png]
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import sys
+from pathlib import Path
+
+from atomic_io import atomic_write_bytes, atomic_write_text
+from pipeline_stats import STATS, add_stats_arguments, finish_stats, log, start_stats
+
+try:
+    from PIL import Image, ImageChops
+except ImportError:
+    Image = None
+
+# 出力の形式を変えたら上げる（frameAtlas.ts の FRAME_ATLAS_FORMAT も合わせる）
+FORMAT_VERSION = 1
+INDEX_NAME = 'atlas.json'
+DEFAULT_DIR = 'public/images/zeroAnime'
+DEFAULT_PATTERN = 'Scene1_*.png'
+# VisualNovel.tsx の ZERO_FPS と同じ
+DEFAULT_FPS = 24
+# モバイルの GPU でも扱えるアトラスの最大の辺
+MAX_PAGE_SIZE = 4096
+
+
+def normalize(im):
+    """RGBA にし、完全に透明な画素の色を揃える（見た目が同じ画素を差分とみなさないため）"""
+    im = im.convert('RGBA')
+    clear = Image.new('RGBA', im.size, (0, 0, 0, 0))
+    return Image.composite(im, clear, im.getchannel('A'))
+
+
+def _area(box):
+    return (box[2] - box[0]) * (box[3] - box[1]) if box else 0
+
+
+def diff_frames(paths):
+    """フレームごとの [描く画像, (x, y), key, 繰り返し回数] を返す"""
+    frames = []
+    prev = None
+    for path in paths:
+        with Image.open(path) as im:
+            im = normalize(im)
+        STATS.progress('フレーム')
+        content = im.getbbox()
+        if prev is not None:
+            if prev.size != im.size:
+                raise ValueError(f'{path}: フレームの大きさが違います ({im.size} / {prev.size})')
+            delta = ImageChops.difference(im, prev).getbbox()
+            if delta is None:
+                # 前と同じフレームは表示時間を延ばすだけ
+                frames[-1][3] += 1
+                continue
+        # 最初のフレームと、差分より描画範囲の方が小さいフレームは全体を描き直す
+        key = prev is None or _area(content) <= _area(delta)
+        box = content if key else delta
+        if box is None:
+            # 全て透明なフレーム
+            box = (0, 0, 1, 1)
+        frames.append([im.crop(box), box[:2], key, 1])
+        prev = im
+    return frames, prev.size if prev else (0, 0)
+
+
+def pack_rects(sizes, max_size=MAX_PAGE_SIZE):
+    """棚詰めでアトラスに並べる。{番号: (ページ, x, y)} とページごとの大きさを返す"""
+    total = sum(w * h for w, h in sizes.values())
+    widest = max((w for w, _ in sizes.values()), default=1)
+    page_width = min(max_size, max(widest, int(total ** 0.5 * 1.1)))
+    placed = {}
+    pages = [[0, 0]]
+    x = y = shelf = 0
+    for i in sorted(sizes, key=lambda i: (-sizes[i][1], i)):
+        w, h = sizes[i]
+        if x + w > page_width:
+            x, y, shelf = 0, y + shelf, 0
+        if y + h > max_size:
+            pages.append([0, 0])
+            x = y = shelf = 0
+        placed[i] = (len(pages) - 1, x, y)
+        pages[-1][0] = max(pages[-1][0], x + w)
+        pages[-1][1] = max(pages[-1][1], y + h)
+        x += w
+        shelf = max(shelf, h)
+    return placed, pages
+
+
+def encode_page(im, fmt):
+    buf = io.BytesIO()
+    if fmt == 'webp':
+        im.save(buf, 'WEBP', lossless=True, quality=100, method=6)
+    else:
+        im.save(buf, 'PNG', optimize=True)
+    return buf.getvalue()
+
+
+def load_index(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def pack_frames(frame_dir, pattern=DEFAULT_PATTERN, fps=DEFAULT_FPS, fmt='webp', public_dir='public', force=False):
+    """アトラスを作る。作り直した場合は True を返す"""
+    frame_dir = Path(frame_dir)
+    paths = sorted(frame_dir.glob(pattern))
+    if not paths:
+        raise ValueError(f'{frame_dir} に {pattern} のフレームがありません')
+
+    with STATS.timer('hash'):
+        version = hashlib.sha256(f'{FORMAT_VERSION}:{fps}:{fmt}:{MAX_PAGE_SIZE}'.encode('utf-8'))
+        for path in paths:
+            version.update(f'\n{path.name}\t'.encode('utf-8') + hashlib.sha256(path.read_bytes()).digest())
+        version = version.hexdigest()[:16]
+    index_path = frame_dir / INDEX_NAME
+    old = load_index(index_path)
+    if (not force and old and old.get('version') == version
+            and all((Path(public_dir) / url.lstrip('/')).exists() for url in old.get('pages', []))):
+        print(f"✓ {frame_dir}: 変更なし ({len(paths)} フレーム, version {version})")
+        return False
+
+    STATS.expect(len(paths))
+    with STATS.timer('diff'):
+        frames, (width, height) = diff_frames(paths)
+
+    # 内容が同じ切り出しは1つだけ詰める
+    patches = {}
+    patch_of = []
+    for crop, _, _, _ in frames:
+        digest = hashlib.sha256(crop.tobytes() + repr(crop.size).encode('ascii')).digest()
+        patch_of.append(patches.setdefault(digest, len(patches)))
+    crops = {patch_of[i]: frames[i][0] for i in range(len(frames))}
+    placed, page_sizes = pack_rects({i: crop.size for i, crop in crops.items()})
+
+    base_url = '/' + frame_dir.resolve().relative_to(Path(public_dir).resolve()).as_posix()
+    pages = []
+    page_bytes = 0
+    with STATS.timer('encode'):
+        for page, (pw, ph) in enumerate(page_sizes):
+            atlas = Image.new('RGBA', (pw, ph), (0, 0, 0, 0))
+            for i, crop in crops.items():
+                if placed[i][0] == page:
+                    atlas.paste(crop, placed[i][1:])
+            data = encode_page(atlas, fmt)
+            name = f'atlas-{page}.{fmt}'
+            atomic_write_bytes(frame_dir / name, data)
+            pages.append(f'{base_url}/{name}')
+            page_bytes += len(data)
+            log(f"  {name}: {pw}x{ph} {len(data) // 1024} KB")
+        # ページが減った場合に残った古いアトラスを消す
+        for path in frame_dir.glob('atlas-*.*'):
+            if f'{base_url}/{path.name}' not in pages:
+                path.unlink()
+
+    duration = 1000 / fps
+    table = []
+    for i, (crop, (x, y), key, repeat) in enumerate(frames):
+        page, sx, sy = placed[patch_of[i]]
+        table.append({'duration': round(duration * repeat), 'key': key,
+                      'rect': [page, sx, sy, *crop.size], 'x': x, 'y': y})
+    index = {'format': FORMAT_VERSION, 'version': version, 'width': width, 'height': height,
+             'fps': fps, 'pages': pages, 'frames': table}
+    atomic_write_text(index_path, json.dumps(index, ensure_ascii=False, separators=(',', ':')))
+
+    src_bytes = sum(path.stat().st_size for path in paths)
+    keys = sum(1 for f in table if f['key'])
+    print(f"✓ {frame_dir}: {len(paths)} フレーム -> {len(table)} フレーム (全体 {keys} / 差分 {len(table) - keys}), "
+          f"アトラス {len(pages)} 枚 {page_bytes / 1024:.0f} KB (元 {src_bytes / 1024:.0f} KB, version {version})")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='連番のフレームを差分のアトラスと atlas.json にまとめます')
+    parser.add_argument('frames', nargs='?', default=DEFAULT_DIR, help=f'フレームのディレクトリ (既定: {DEFAULT_DIR})')
+    parser.add_argument('--pattern', default=DEFAULT_PATTERN, help=f'フレームのファイル名 (既定: {DEFAULT_PATTERN})')
+    parser.add_argument('--fps', type=int, default=DEFAULT_FPS, help=f'1秒あたりのフレーム数 (既定: {DEFAULT_FPS})')
+    parser.add_argument('--format', choices=['webp', 'png'], default='webp', help='アトラスの形式 (既定: webp, 可逆)')
+    parser.add_argument('--public', default='public', help='公開ディレクトリ（URL の基準、既定: public）')
+    parser.add_argument('--force', action='store_true', help='入力が変わっていなくても作り直す')
+    add_stats_arguments(parser)
+    args = parser.parse_args()
+
+    if Image is None:
+        print("エラー: Pillow が必要です (pip install Pillow)")
+        sys.exit(1)
+
+    start_stats('pack_frames', args)
+    try:
+        pack_frames(args.frames, args.pattern, args.fps, args.format, args.public, force=args.force)
+    except ValueError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    finish_stats(args)
+
+
+if __name__ == '__main__':
+    main()
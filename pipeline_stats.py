@@ -0,0 +1,155 @@
+"""
+コンテンツ生成スクリプト共通の計測と出力の制御
+
+ステージ（fetch / parse / extract / download / write など）ごとの所要時間と、
+リクエスト数・バイト数・キャッシュヒット数などのカウンタを集計する。
+各スクリプトはモジュール共通の STATS に記録し、終了時に集計を表示する。
+
+    --quiet             : 1行ごとの進捗表示をやめ、進捗を1行だけで表示する
+    --profile TRACE     : 集計とステージごとの区間を JSON で書き出す
+    --cprofile OUT      : cProfile の結果を書き出す（python -m pstats OUT で確認できる）
+
+ダウンロードのように複数スレッドで並列に動くステージの時間は、各スレッドの時間の合計になる。
+"""
+
+import cProfile
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PipelineStats:
+    """ステージごとの時間とカウンタ（複数スレッドから記録できる）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self, tool=None, quiet=False):
+        with self._lock:
+            self.tool = tool
+            self.quiet = quiet
+            self.started = time.perf_counter()
+            self.started_at = time.time()
+            self.stages = {}
+            self.counters = {}
+            self.spans = []
+            self.progress_done = 0
+            self.progress_total = 0
+
+    @contextmanager
+    def timer(self, stage):
+        """with STATS.timer('parse'): ... の区間の時間を stage に加算する"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start, start)
+
+    def add_time(self, stage, seconds, start=None):
+        """別プロセスなどで計った時間を stage に加算する"""
+        with self._lock:
+            total = self.stages.setdefault(stage, {'seconds': 0.0, 'calls': 0})
+            total['seconds'] += seconds
+            total['calls'] += 1
+            self.spans.append({
+                'stage': stage,
+                'start': round((start if start is not None else time.perf_counter() - seconds) - self.started, 6),
+                'seconds': round(seconds, 6),
+                'thread': threading.current_thread().name,
+            })
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def record_response(self, response):
+        """HTTPレスポンス1件分のリクエスト数・バイト数・キャッシュヒットを記録する"""
+        if getattr(response, 'from_cache', False):
+            self.count('cache_hits')
+        else:
+            self.count('requests')
+        self.count('bytes_fetched', len(response.content))
+
+    def log(self, *args, **kwargs):
+        """1件ごとの進捗表示（--quiet のときは表示しない）"""
+        if not self.quiet:
+            print(*args, **kwargs)
+
+    def expect(self, n):
+        """進捗の総数を増やす"""
+        with self._lock:
+            self.progress_total += n
+
+    def progress(self, label, n=1):
+        """進捗を進める。--quiet のときは1行の進捗表示を書き換える"""
+        with self._lock:
+            self.progress_done += n
+            done, total = self.progress_done, self.progress_total
+        if self.quiet:
+            sys.stderr.write(f"\r{label} {done}/{total}")
+            if done >= total:
+                sys.stderr.write('\n')
+            sys.stderr.flush()
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def summary(self):
+        """ステージごとの時間とカウンタを表示する"""
+        print(f"\n計測 ({self.tool}): 全体 {self.elapsed():.2f} 秒")
+        for stage, total in self.stages.items():
+            print(f"  {stage:<10} {total['seconds']:8.2f} 秒  ({total['calls']}回)")
+        if self.counters:
+            print('  ' + ' / '.join(f"{name} {value}" for name, value in self.counters.items()))
+
+    def write_trace(self, path):
+        """集計とステージごとの区間を JSON で書き出す"""
+        with self._lock:
+            data = {
+                'tool': self.tool,
+                'argv': sys.argv,
+                'started_at': self.started_at,
+                'elapsed': round(self.elapsed(), 6),
+                'stages': self.stages,
+                'counters': self.counters,
+                'spans': self.spans,
+            }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+STATS = PipelineStats()
+log = STATS.log
+
+
+def add_stats_arguments(parser):
+    """各ツール共通の計測関連オプションを追加する"""
+    group = parser.add_argument_group('計測')
+    group.add_argument('--quiet', '-q', action='store_true', help='1件ごとの表示をやめ、進捗を1行で表示する')
+    group.add_argument('--profile', metavar='TRACE', help='ステージごとの時間とカウンタを JSON で書き出す')
+    group.add_argument('--cprofile', metavar='OUT', help='cProfile の結果を書き出す')
+
+
+def start_stats(tool, args):
+    """add_stats_arguments で追加したオプションに従って計測を始める"""
+    STATS.reset(tool, quiet=args.quiet)
+    if args.cprofile:
+        args._profiler = cProfile.Profile()
+        args._profiler.enable()
+    else:
+        args._profiler = None
+
+
+def finish_stats(args):
+    """計測を終え、集計を表示して --profile / --cprofile の出力を書き出す"""
+    if args._profiler is not None:
+        args._profiler.disable()
+        args._profiler.dump_stats(args.cprofile)
+        print(f"✓ cProfile の結果を保存: {args.cprofile}")
+    STATS.summary()
+    if args.profile:
+        STATS.write_trace(args.profile)
+        print(f"✓ 計測結果を保存: {args.profile}")
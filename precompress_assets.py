@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+ビルド後 (vite build) の dist/ のテキスト資産を事前圧縮するスクリプト
+
+public/ の story.json・endroll.json・各レベルの mappings.csv などは、ビルド後も
+圧縮されないまま、同じ名前で配信されている（そのため長期間キャッシュできない）。
+このスクリプトは dist/ に対して
+  1. *.bak などの配信しないファイルを削除する
+  2. CSV / JSON に内容のハッシュ入りの名前のコピー（story.1a2b3c4d.json）を作り、
+     元の URL → ハッシュ入りの URL の対応を asset-map.json に書き出す
+     （アプリは src/utils/assetUrl.ts でこれを参照し、ハッシュ入りの名前で取得する。
+       内容が変われば URL も変わるので、ハッシュ入りのファイルは immutable としてキャッシュできる）
+  3. テキスト資産の Brotli (.br) / gzip (.gz) 版を最高圧縮で作る（元より小さくなる場合だけ）
+の処理をする。元の名前のファイルも残すため、asset-map.json が無くてもアプリは動く。
+
+Brotli 版を作るには brotli モジュールが必要（pip install Brotli）。無ければ gzip 版だけを作る。
+
+npm run build の後（package.json の postbuild）の最後に実行する。ハッシュ入りの名前を付けるため、
+dist に CSV / JSON を書き出すスクリプト（compile_levels.py・build_asset_manifest.py など）の
+後に実行する必要がある。
+
+使用方法:
+    python precompress_assets.py [dist]
+
+例:
+    npm run build   # postbuild で python precompress_assets.py -q を実行する
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+
+from atomic_io import atomic_write_bytes, atomic_write_text
+from pipeline_stats import STATS, add_stats_arguments, finish_stats, log, start_stats
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MAP_NAME = 'asset-map.json'
+# 決まった URL で取得し続けるためハッシュ入りの名前を付けないファイル
+# （asset-manifest.json は Service Worker が確認する。build_asset_manifest.py を参照）
+UNHASHED_NAMES = {MAP_NAME, 'asset-manifest.json'}
+
+# 配信しないファイル（各スクリプトが public/ 内に置く作業用の記録を含む。
+# .*manifest.json は .scrape_manifest.json・.thumbs_manifest.json・.optimize_manifest.json など）
+EXCLUDE_PATTERNS = ['*.bak', '*~', '.DS_Store', '.*manifest.json', '.merge_index.json', '.scrape_journal.jsonl']
+
+# ハッシュ入りの名前を付けるファイル（アプリが決まった URL で fetch するもの）
+HASHED_SUFFIXES = {'.csv', '.json'}
+# 圧縮するファイル
+COMPRESS_SUFFIXES = {'.csv', '.json', '.js', '.mjs', '.css', '.html', '.svg', '.txt', '.xml', '.webmanifest'}
+# これより小さいファイルは圧縮しない（ヘッダーの方が大きくなる）
+MIN_COMPRESS_SIZE = 1024
+
+HASH_LENGTH = 8
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{%d}$' % HASH_LENGTH)
+
+
+def remove_excluded(dist):
+    removed = []
+    for pattern in EXCLUDE_PATTERNS:
+        for path in sorted(dist.rglob(pattern)):
+            if path.is_file():
+                path.unlink()
+                removed.append(path)
+    return removed
+
+
+def _is_hashed(path):
+    # vite が付けたハッシュ (index-1a2b3c4d.js) や、このスクリプトが付けたハッシュ
+    return bool(HASHED_NAME_RE.search(path.stem)) or path.parent.name == 'assets'
+
+
+def write_hashed_copies(dist):
+    """CSV / JSON にハッシュ入りの名前のコピーを作り {元のURL: ハッシュ入りのURL} を返す"""
+    mapping = {}
+    for path in sorted(dist.rglob('*')):
+        if (not path.is_file() or path.suffix not in HASHED_SUFFIXES or path.name in UNHASHED_NAMES
+                or _is_hashed(path)):
+            continue
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+        hashed = path.with_name(f'{path.stem}.{digest}{path.suffix}')
+        if not hashed.exists():
+            atomic_write_bytes(hashed, data)
+        url = '/' + path.relative_to(dist).as_posix()
+        mapping[url] = '/' + hashed.relative_to(dist).as_posix()
+        log(f"  {url} -> {mapping[url]}")
+    return mapping
+
+
+def remove_stale_hashed(dist, mapping):
+    """以前のビルドで作った、今は使われていないハッシュ入りのファイルを消す"""
+    current = {dist / url.lstrip('/') for url in mapping.values()}
+    for url in mapping:
+        original = dist / url.lstrip('/')
+        pattern = f'{original.stem}.{"[0-9a-f]" * HASH_LENGTH}{original.suffix}'
+        for path in original.parent.glob(pattern):
+            if path not in current:
+                path.unlink()
+                for variant in (path.with_name(path.name + '.br'), path.with_name(path.name + '.gz')):
+                    if variant.exists():
+                        variant.unlink()
+
+
+def compress_file(path):
+    """.br / .gz 版を作り (元のサイズ, 圧縮後の最小サイズ) を返す"""
+    data = path.read_bytes()
+    best = len(data)
+    variants = [('.gz', lambda d: gzip.compress(d, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.insert(0, ('.br', lambda d: brotli.compress(d, quality=11, mode=brotli.MODE_TEXT)))
+    for ext, compress in variants:
+        out = path.with_name(path.name + ext)
+        with STATS.timer(ext.lstrip('.')):
+            compressed = compress(data)
+        if len(compressed) < len(data):
+            atomic_write_bytes(out, compressed)
+            best = min(best, len(compressed))
+        elif out.exists():
+            out.unlink()
+    return len(data), best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ビルド後のテキスト資産を事前圧縮し、ハッシュ入りの名前を付けます')
+    parser.add_argument('dist', nargs='?', default='dist', help='vite build の出力先 (既定: dist)')
+    add_stats_arguments(parser)
+    args = parser.parse_args()
+
+    dist = Path(args.dist)
+    if not (dist / 'index.html').exists():
+        print(f"✗ ビルド結果がありません: {dist} (先に npm run build を実行してください)")
+        sys.exit(1)
+    if brotli is None:
+        print("brotli モジュールが無いため gzip 版だけを作成します (pip install Brotli)")
+
+    start_stats('precompress_assets', args)
+    removed = remove_excluded(dist)
+    for path in removed:
+        print(f"  削除: {path.relative_to(dist)}")
+
+    with STATS.timer('hash'):
+        mapping = write_hashed_copies(dist)
+        remove_stale_hashed(dist, mapping)
+        atomic_write_text(dist / MAP_NAME, json.dumps(mapping, ensure_ascii=False, indent=2))
+
+    total = compressed = files = 0
+    for path in sorted(dist.rglob('*')):
+        if not path.is_file() or path.suffix not in COMPRESS_SUFFIXES or path.stat().st_size < MIN_COMPRESS_SIZE:
+            continue
+        before, after = compress_file(path)
+        total += before
+        compressed += after
+        files += 1
+        log(f"  {path.relative_to(dist)}: {before // 1024} KB -> {after // 1024} KB")
+
+    print(f"✓ 配信しないファイルを {len(removed)} 件削除 / ハッシュ入りの名前 {len(mapping)} 件 ({MAP_NAME})")
+    print(f"✓ {files} ファイルを圧縮: {total / 1024:.0f} KB -> {compressed / 1024:.0f} KB")
+    finish_stats(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,50 @@
 #!/usr/bin/env python3
 """
 ユーザーから提供されたHTMLを直接処理するスクリプト
-"""
 
-# HTMLコンテンツをここに埋め込む
-# ユーザーから提供されたHTMLを保存して処理
+ブラウザで保存・コピーしたページのHTMLを、元のURLのレスポンスとして
+HTTPキャッシュ (.http_cache/) に登録する。登録後は scrape_kanji.py を
+--cache-mode replay で実行すれば、ネットワークに接続せずに同じ処理を実行できる。
+
+使用方法:
+    python process_html_direct.py <URL> [HTMLファイル]    # ファイル省略時は標準入力から読み込む
+
+例:
+    python process_html_direct.py https://w.atwiki.jp/yuia_sk/pages/17.html page_17.html
+    python scrape_kanji.py https://w.atwiki.jp/yuia_sk/pages/17.html public/kanji/level-8 --cache-mode replay
+"""
 
+import argparse
 import sys
 
-# このスクリプトは、標準入力からHTMLを受け取って、
-# scrape_kanji.pyと同じ処理を実行します
+from http_cache import CACHE_DIR, HttpCache
+
+
+def main():
+    parser = argparse.ArgumentParser(description='貼り付けたHTMLをHTTPキャッシュに登録します')
+    parser.add_argument('url', help='HTMLの取得元のURL')
+    parser.add_argument('html_file', nargs='?', help='HTMLファイル（省略時は標準入力）')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help=f'キャッシュの保存先 (既定: {CACHE_DIR})')
+    args = parser.parse_args()
+
+    if args.html_file:
+        with open(args.html_file, 'rb') as f:
+            content = f.read()
+    else:
+        if sys.stdin.isatty():
+            print("HTMLを貼り付けて Ctrl+D で終了してください:")
+        content = sys.stdin.buffer.read()
+
+    if b'<h3' not in content:
+        print("警告: h3タグが含まれていません（Cloudflare のチェックページなどを保存していないか確認してください）")
+
+    cache = HttpCache(cache_dir=args.cache_dir)
+    cache.store(args.url, content, {'Content-Type': 'text/html; charset=utf-8'})
+
+    print(f"✓ キャッシュに登録しました: {args.url} ({len(content)} bytes)")
+    print("次のステップ:")
+    print(f"  python scrape_kanji.py {args.url} <出力ディレクトリ> --cache-mode replay")
+
 
 if __name__ == '__main__':
-    print("このスクリプトは直接実行できません。")
-    print("代わりに、以下のコマンドを使用してください：")
-    print()
-    print("1. ブラウザでHTMLを全選択してコピー")
-    print("2. cat > page_17.html を実行")
-    print("3. 貼り付けてCtrl+Dで保存")
-    print("4. python scrape_kanji.py page_17.html public/kanji/level-8")
-    sys.exit(1)
+    main()
@@ -1,8 +1,130 @@
-// Service Worker: 画像をキャッシュして次回以降の読み込みを高速化します。
-// CSVファイルは常にネットワークから最新版を取得し、画像のみキャッシュします。
+// Service Worker: 画像・音声をキャッシュして次回以降の読み込みを高速化します。
+// CSVファイルは常にネットワークから最新版を取得します。
+//
+// キャッシュの無効化は build_asset_manifest.py が書き出す /asset-manifest.json で行います。
+// 一覧を前回のものと比べて、内容のハッシュが変わった・無くなったファイルだけをキャッシュから消すため、
+// 画像を差し替えても CACHE_NAME を上げる必要はありません。
 
-const CACHE_NAME = 'kanji-images-v2'; // バージョン更新: 古いキャッシュをクリア
+const CACHE_NAME = 'kanji-assets';
 const IMAGE_PATH_PREFIX = '/kanji/';
+const HASHED_DATA_PATTERN = /\.[0-9a-f]{8}\.(csv|json)$/;
+const ASSET_PATTERN = /^\/(kanji|images|nazo|voice)\/.*\.(png|jpg|jpeg|gif|svg|webp|avif|mp3|opus|ogg|m4a)$/i;
+
+// build_asset_manifest.py の FORMAT_VERSION と合わせる
+const ASSET_MANIFEST_FORMAT = 1;
+const ASSET_MANIFEST_URL = '/asset-manifest.json';
+// 前回の一覧をキャッシュ内に保存するキー
+const STORED_MANIFEST_KEY = '/__asset-manifest__';
+// ページを開いたときに一覧を確認する間隔
+const MANIFEST_CHECK_INTERVAL = 10 * 60 * 1000;
+const PRECACHE_CONCURRENCY = 4;
+
+let manifestPromise = null; // 現在の一覧（無ければ null）
+let lastManifestCheck = 0;
+
+function storedManifest() {
+  if (!manifestPromise) {
+    manifestPromise = caches.open(CACHE_NAME)
+      .then((cache) => cache.match(STORED_MANIFEST_KEY))
+      .then((res) => (res ? res.json() : null))
+      .catch(() => null);
+  }
+  return manifestPromise;
+}
+
+// 一覧を取得し、前回から変わったファイルをキャッシュから消す
+async function syncManifest() {
+  lastManifestCheck = Date.now();
+  let next;
+  try {
+    const res = await fetch(ASSET_MANIFEST_URL, { cache: 'no-cache' });
+    // 存在しないファイルでも開発サーバーは index.html を返すため Content-Type も確認する
+    if (!res.ok || !(res.headers.get('content-type') || '').includes('json')) return storedManifest();
+    next = await res.json();
+  } catch (e) {
+    return storedManifest();
+  }
+  if (!next || next.format !== ASSET_MANIFEST_FORMAT || !next.files) return storedManifest();
+
+  const prev = await storedManifest();
+  if (prev && prev.version === next.version) return prev;
+
+  const cache = await caches.open(CACHE_NAME);
+  const requests = await cache.keys();
+  let evicted = 0;
+  await Promise.all(requests.map((req) => {
+    const path = new URL(req.url).pathname;
+    if (path === STORED_MANIFEST_KEY || HASHED_DATA_PATTERN.test(path)) return Promise.resolve();
+    const before = prev && prev.files[path];
+    const after = next.files[path];
+    // 前回の一覧に無い（いつの内容か分からない）ものも消す
+    if (before && after && before[0] === after[0]) return Promise.resolve();
+    evicted++;
+    return cache.delete(req);
+  }));
+  await cache.put(STORED_MANIFEST_KEY, new Response(JSON.stringify(next), {
+    headers: { 'Content-Type': 'application/json' },
+  }));
+  manifestPromise = Promise.resolve(next);
+  if (evicted) {
+    console.log(`[SW] 資産の一覧を更新 (${next.version}): ${evicted} 件をキャッシュから削除`);
+  }
+  return next;
+}
+
+function isCacheable(res) {
+  return res && res.status === 200 && res.type !== 'opaque';
+}
+
+// cache-first。キャッシュに無ければネットワークから取得し、一覧に載っているものだけキャッシュする
+async function cacheFirst(req, path) {
+  const cache = await caches.open(CACHE_NAME);
+  const cached = await cache.match(req);
+  if (cached) return cached;
+
+  const manifest = await storedManifest();
+  // 一覧が無い場合（開発サーバーなど）は従来どおり /kanji/ の画像だけキャッシュする
+  const tracked = manifest ? !!manifest.files[path] : path.startsWith(IMAGE_PATH_PREFIX);
+  try {
+    // 差し替えられたファイルを HTTP キャッシュの古い内容で埋めないように再検証する
+    const res = await fetch(req, tracked ? { cache: 'no-cache' } : undefined);
+    if ((tracked || HASHED_DATA_PATTERN.test(path)) && isCacheable(res)) {
+      cache.put(req, res.clone());
+    }
+    return res;
+  } catch (e) {
+    // ネットワーク失敗時はキャッシュがなければ失敗レスポンス
+    return new Response('Service Unavailable', { status: 503 });
+  }
+}
+
+// 一覧の groups（レベルごとの画像）をまだキャッシュに無いものだけ取得する
+async function precacheGroup(group) {
+  const manifest = await storedManifest();
+  const urls = (manifest && manifest.groups && manifest.groups[group]) || [];
+  const cache = await caches.open(CACHE_NAME);
+  const queue = [];
+  for (const url of urls) {
+    if (!(await cache.match(url))) queue.push(url);
+  }
+  let fetched = 0;
+  const worker = async () => {
+    while (queue.length) {
+      const url = queue.shift();
+      try {
+        const res = await fetch(url, { cache: 'no-cache' });
+        if (isCacheable(res)) {
+          await cache.put(url, res);
+          fetched++;
+        }
+      } catch (e) {
+        // 取得できなかったものは表示するときに取得する
+      }
+    }
+  };
+  await Promise.all(Array.from({ length: PRECACHE_CONCURRENCY }, worker));
+  return { group, total: urls.length, fetched };
+}
 
 self.addEventListener('install', (event) => {
   // 新しい SW をすぐにアクティブ化
@@ -10,7 +132,7 @@ self.addEventListener('install', (event) => {
 });
 
 self.addEventListener('activate', (event) => {
-  // 古いキャッシュを削除
+  // 古いキャッシュ（kanji-images-v2 など）を削除し、資産の一覧を確認する
   event.waitUntil(
     caches.keys().then((keys) =>
       Promise.all(
@@ -21,57 +143,57 @@ self.addEventListener('activate', (event) => {
           return Promise.resolve();
         })
       )
-    ).then(() => self.clients.claim())
+    ).then(() => syncManifest())
+      .then(() => self.clients.claim())
   );
 });
 
-// cache-first: 画像のみキャッシュ。CSVファイルは常に最新を取得
 self.addEventListener('fetch', (event) => {
   try {
     const req = event.request;
     const url = new URL(req.url);
 
+    // ページを開いたときに、一定時間ごとに資産の一覧を確認する
+    if (req.mode === 'navigate' && Date.now() - lastManifestCheck > MANIFEST_CHECK_INTERVAL) {
+      event.waitUntil(syncManifest());
+      return;
+    }
+
+    // precompress_assets.py が付けたハッシュ入りの名前の CSV / JSON は内容が変わらないのでキャッシュする
+    const isHashedData = HASHED_DATA_PATTERN.test(url.pathname);
+
     // CSVファイルは常にネットワークから取得（キャッシュしない）
     const isCsv = url.pathname.endsWith('.csv');
-    if (isCsv) {
+    if (isCsv && !isHashedData) {
       return; // キャッシュ処理をスキップし、通常のfetchに任せる
     }
 
-    // 画像ファイルのみキャッシュ対象
-    const isImage = /\.(png|jpg|jpeg|gif|svg|webp|avif)$/i.test(url.pathname);
-    const isKanjiPath = url.pathname.startsWith(IMAGE_PATH_PREFIX);
-
-    if (req.method === 'GET' && isImage && isKanjiPath) {
-      event.respondWith(
-        caches.open(CACHE_NAME).then((cache) =>
-          cache.match(req).then((cached) => {
-            if (cached) {
-              // キャッシュを返す
-              return cached;
-            }
-            // ネットワークから取得してキャッシュ
-            return fetch(req).then((res) => {
-              // 成功レスポンスのみキャッシュ
-              if (res && res.status === 200 && res.type !== 'opaque') {
-                cache.put(req, res.clone());
-              }
-              return res;
-            }).catch(() => {
-              // ネットワーク失敗時はキャッシュがなければ失敗レスポンス
-              return new Response('Service Unavailable', { status: 503 });
-            });
-          })
-        )
-      );
+    // 音声の Range リクエストはキャッシュの完全なレスポンスでは返せないためブラウザに任せる
+    if (req.method !== 'GET' || url.origin !== self.location.origin || req.headers.has('range')) {
+      return;
+    }
+    if (ASSET_PATTERN.test(url.pathname) || isHashedData) {
+      event.respondWith(cacheFirst(req, url.pathname));
     }
   } catch (e) {
     // URL パース失敗などは無視してフォールバック
   }
 });
 
-// メッセージで強制更新を受け付ける（オプション）
 self.addEventListener('message', (event) => {
-  if (event.data && event.data.type === 'SKIP_WAITING') {
+  if (!event.data) return;
+  // メッセージで強制更新を受け付ける（オプション）
+  if (event.data.type === 'SKIP_WAITING') {
     self.skipWaiting();
   }
+  // サムネイル・画像の先読み（src/utils/precache.ts）
+  if (event.data.type === 'PRECACHE' && event.data.group) {
+    event.waitUntil(
+      syncManifest()
+        .then(() => precacheGroup(event.data.group))
+        .then((result) => {
+          if (event.source) event.source.postMessage({ type: 'PRECACHE_DONE', ...result });
+        })
+    );
+  }
 });
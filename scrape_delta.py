@@ -0,0 +1,79 @@
+"""
+既存のレベルとの差分だけをスクレイピングするための処理（scrape_kanji.py --delta）
+
+ページの各エントリを wiki のID（ID:0001）と画像URLで既存の mappings.csv の行に対応付け、
+新規・変更・変更なし・削除（ページから消えた行）に分類する。
+IDと画像URLの対応は出力ディレクトリのマニフェスト (.scrape_manifest.json) に記録されている。
+マニフェストが無い（または ID を記録していない）場合は、scrape_kanji.py が付けるパス
+（images/<h3の番号>_<読み>.png）で既存の行に対応付ける。
+"""
+
+from collections import namedtuple
+from pathlib import Path
+
+from mappings_io import DEFAULT_HEADER, image_index, read_mappings, scraped_image_path
+
+# new: [(KanjiRecord, パス)]、changed: [(KanjiRecord, 既存の行, 画像を取得し直すか)]
+DeltaPlan = namedtuple('DeltaPlan', ['header', 'rows', 'new', 'changed', 'unchanged', 'removed'])
+
+
+def plan_delta(records, output_dir, manifest):
+    """ページから抽出したレコードを既存の mappings.csv と比較して DeltaPlan を返す"""
+    output_dir = Path(output_dir)
+    csv_path = output_dir / 'mappings.csv'
+    if csv_path.exists():
+        header, rows = read_mappings(csv_path)
+    else:
+        header, rows = list(DEFAULT_HEADER), []
+
+    by_path = {row.get('path'): row for row in rows}
+    known_ids = manifest.paths_by_id()
+    manifest_paths = {entry.get('path') for entry in manifest.entries.values()}
+    used_indexes = {image_index(path) for path in by_path}
+    next_idx = max([idx or 0 for idx in used_indexes] + [0]) + 1
+
+    new = []
+    changed = []
+    unchanged = 0
+    matched = set()
+    for record in records:
+        if not record.reading or not record.image_url:
+            continue
+
+        path = known_ids.get(record.id)
+        if path not in by_path or path in matched:
+            path = scraped_image_path(record.idx, record.reading)
+            if path not in by_path or path in matched:
+                path = None
+
+        if path is None:
+            # 新規。h3の番号が既存の行の連番と重なる場合は末尾の連番を振る
+            idx = record.idx
+            if idx in used_indexes:
+                idx = next_idx
+                next_idx += 1
+            used_indexes.add(idx)
+            path = scraped_image_path(idx, record.reading)
+            matched.add(path)
+            new.append((record, path))
+            continue
+
+        matched.add(path)
+        row = by_path[path]
+        entry = manifest.entries.get(record.image_url, {})
+        # マニフェストが別のURLの画像として記録している場合だけ、画像が差し替えられたとみなす
+        image_changed = (
+            (entry.get('path') != path and path in manifest_paths)
+            or not (output_dir / path).exists()
+        )
+        text_changed = (row.get('reading') != record.reading
+                        or row.get('additional_info', '') != record.additional_info)
+        if image_changed or text_changed:
+            changed.append((record, row, image_changed))
+        else:
+            unchanged += 1
+        if not image_changed:
+            manifest.remember(record.image_url, path, record.id)
+
+    removed = [row for row in rows if row.get('path') not in matched]
+    return DeltaPlan(header, rows, new, changed, unchanged, removed)
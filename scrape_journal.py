@@ -0,0 +1,64 @@
+"""
+スクレイピングの再開用ジャーナル
+
+画像の保存が完了した行を 1行1JSON で <出力ディレクトリ>/.scrape_journal.jsonl に追記する。
+mappings.csv は全件の処理が終わってから書き出すため、途中で落ちた場合は
+このジャーナルを読み込んで (scrape_kanji.py --resume)、保存済みの画像を取得し直さずに再開する。
+mappings.csv の書き出しが完了したらジャーナルは削除する。
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+JOURNAL_NAME = '.scrape_journal.jsonl'
+
+
+class ScrapeJournal:
+    """保存済みの行の追記専用ログ（ダウンロードワーカーから並列に追記される）"""
+
+    def __init__(self, output_dir, resume=False):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / JOURNAL_NAME
+        self.entries = {}
+        self._lock = threading.Lock()
+
+        if resume and self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # 書き込み途中で落ちた最終行は無視する
+                        continue
+                    self.entries[entry['idx']] = entry
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+
+    def completed(self, idx, image_url, path):
+        """同じ画像が保存済みなら、その行の内容を返す"""
+        entry = self.entries.get(idx)
+        if not entry or entry.get('image_url') != image_url or entry.get('path') != path:
+            return None
+        if not (self.output_dir / path).exists():
+            return None
+        return entry
+
+    def append(self, entry):
+        """保存が完了した行を追記する（クラッシュしても残るよう毎回 fsync する）"""
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.entries[entry['idx']] = entry
+
+    def close(self, remove=False):
+        """ジャーナルを閉じる。remove=True なら削除する（mappings.csv の書き出し完了後）"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        if remove:
+            self.path.unlink(missing_ok=True)
@@ -7,302 +7,509 @@
 
 例:
     python scrape_kanji.py https://w.atwiki.jp/yuia_sk/pages/16.html public/kanji/level-7
+
+ページと画像は HTTPキャッシュ (.http_cache/) を経由して取得する。
+--cache-mode replay を指定するとネットワークに接続せずキャッシュだけで実行できる。
+
+複数ページをまとめて処理する場合:
+    python scrape_kanji.py --batch scrape_pages.txt
+
+既存のレベルに新しいエントリだけを追加する場合（変更・追加分だけをダウンロードして追記する）:
+    python scrape_kanji.py https://w.atwiki.jp/yuia_sk/pages/16.html public/kanji/level-7 --delta
+
+どこに時間がかかっているかを調べる場合（進捗は1行だけ表示し、計測結果をJSONで保存する）:
+    python scrape_kanji.py --batch scrape_pages.txt --quiet --profile trace.json --cprofile scrape.prof
 """
 
 import argparse
 import csv
 import os
-import re
 import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from urllib.parse import urljoin
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+from atomic_io import atomic_open, atomic_write_bytes
+from http_cache import add_cache_arguments, cache_from_args
+from image_manifest import ImageManifest
+from kanji_extract import extract_records, extract_records_streaming
+import mappings_io
+from mappings_io import scraped_image_path
+from pipeline_stats import STATS, add_stats_arguments, finish_stats, log, start_stats
+from scrape_delta import plan_delta
+from scrape_journal import ScrapeJournal
 
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# 画像ダウンロードの既定の並列数
+DEFAULT_JOBS = 8
+
+
+def create_session(jobs=DEFAULT_JOBS):
+    """keep-alive接続をホストごとにプールするセッションを作成する
+
+    pool_maxsize をワーカー数に合わせることで、並列ダウンロード中も
+    img.atwiki.jp への接続が使い回され、画像ごとのTCP/TLSハンドシェイクが発生しない
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, jobs))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
 
-def download_image(image_url, save_path):
-    """画像をダウンロードして保存する"""
+
+def download_image(image_url, save_path, session=None, manifest=None, cache=None, wiki_id=None):
+    """画像をダウンロードして保存する
+
+    session を渡すと接続プールを共有する（スレッドから並列に呼び出される）
+    manifest を渡すと条件付きリクエストを送り、変更のない画像は書き込まない
+    cache を渡すとHTTPキャッシュを経由して取得する（キャッシュにあるものはキャッシュ側が再検証する）
+    wiki_id を渡すとマニフェストに wiki のIDも記録する（--delta で既存の行と対応付けるため）
+    """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
-        response = requests.get(image_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        with open(save_path, 'wb') as f:
-            f.write(response.content)
-        print(f"  画像を保存: {save_path}")
-        return True
+        with STATS.timer('download'):
+            return _download_image(image_url, save_path, session, manifest, cache, wiki_id)
     except Exception as e:
         print(f"  画像のダウンロードに失敗: {image_url} - {e}")
         return False
 
 
-def extract_reading_from_element(element, skip_id=False):
-    """要素から読み方を再帰的に抽出する（内部用ヘルパー関数）
+def _download_image(image_url, save_path, session, manifest, cache, wiki_id):
+    """download_image の本体（例外は呼び出し側で処理する）"""
+    headers = {
+        'User-Agent': USER_AGENT
+    }
+    # キャッシュに本文が無い場合もマニフェストの検証子で条件付きリクエストにする
+    if manifest is not None:
+        headers.update(manifest.conditional_headers(image_url, save_path))
+    if cache is not None:
+        response = cache.get(image_url, session=session, headers=headers)
+    else:
+        response = (session or requests).get(image_url, headers=headers, timeout=10)
+    STATS.record_response(response)
     
-    color: #F54738; のspan要素は ''で囲む
-    """
-    parts = []
+    if response.status_code == 304 and manifest is not None:
+        manifest.record_not_modified(image_url)
+        log(f"  変更なし: {save_path}")
+        return True
+    response.raise_for_status()
     
-    for content in element.children:
-        # 文字列ノード
-        if isinstance(content, str):
-            text = content.strip()
-            if not text:
-                continue
-            # HTMLコメントの断片を除外
-            if text.startswith('<!--') or text == '@@@@@':
-                continue
-            # skip_idがTrueの場合、ID表記を除外
-            if skip_id and (text.startswith('ID:') or text.startswith('ID')):
-                continue
-            parts.append(text)
-        
-        # タグノード
-        elif hasattr(content, 'name'):
-            style = content.get('style', '') or ''
-            
-            # color: #F54738 の場合は送り仮名として ''で囲む
-            if '#F54738' in style or '#f54738' in style.lower():
-                # この要素内のテキストを取得（コメントを除外）
-                inner_text = ''.join([
-                    s.strip() for s in content.strings 
-                    if s.strip() and not s.strip().startswith('<!--') and s.strip() != '@@@@@'
-                ])
-                if inner_text:
-                    parts.append(f"'{inner_text}'")
-            else:
-                # 再帰的に子要素を処理
-                sub_parts = extract_reading_from_element(content, skip_id=False)
-                if sub_parts:
-                    parts.append(sub_parts)
+    data = response.content
+    if manifest is not None and manifest.is_unchanged(image_url, data, save_path):
+        manifest.record(image_url, response, data, save_path, skipped=True, wiki_id=wiki_id)
+        log(f"  変更なし: {save_path}")
+        return True
     
-    return ''.join(parts)
+    # 一時ファイルに書いてから置き換える（途中で落ちても壊れたPNGを残さない）
+    atomic_write_bytes(save_path, data)
+    STATS.count('bytes_written', len(data))
+    if manifest is not None:
+        manifest.record(image_url, response, data, save_path, wiki_id=wiki_id)
+    log(f"  画像を保存: {save_path}")
+    return True
 
 
-def extract_reading_from_h3(h3_element):
-    """h3要素から読み方を抽出する
-    
-    例: "ID:0001 あやしい" -> "あや'しい'"
-    color: #F54738; のspan要素は ''で囲む
-    """
-    reading = extract_reading_from_element(h3_element, skip_id=True)
-    
-    if not reading:
-        return None
-    
-    # 全角スペースと「等」を削除
-    reading = reading.replace('　', '').replace('等', '')
-    
-    return reading.strip() if reading else None
+def fetch_page(url, session, cache=None):
+    """ページのHTMLを取得する"""
+    # セッションを使用
+    headers = {
+        'User-Agent': USER_AGENT,
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
+        'Accept-Language': 'ja,en-US;q=0.7,en;q=0.3',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1',
+        'Sec-Fetch-Dest': 'document',
+        'Sec-Fetch-Mode': 'navigate',
+        'Sec-Fetch-Site': 'none',
+        'Cache-Control': 'max-age=0',
+    }
+    with STATS.timer('fetch'):
+        if cache is not None:
+            response = cache.get(url, session=session, headers=headers)
+        else:
+            response = session.get(url, headers=headers, timeout=10)
+        STATS.record_response(response)
+        response.raise_for_status()
+        response.encoding = response.apparent_encoding  # 文字化け対策
+        return response.text
 
 
-def scrape_kanji_data(url, output_dir):
-    """指定されたURLまたはローカルファイルから漢字データをスクレイピングする"""
-    
-    print(f"URLまたはファイルにアクセス中: {url}")
-    
-    # ページを取得
-    try:
-        # ローカルファイルかどうかチェック
-        if os.path.exists(url):
-            print(f"ローカルファイルから読み込み: {url}")
+def parse_page(url, html_content=None, stream=False):
+    """ページを解析して KanjiRecord のリストを返す（バッチモードではプロセスプールで実行される）
+
+    html_content が None の場合は url をローカルファイルとして読み込む
+    stream=True の場合、ローカルファイルを iterparse で読み込む（巨大な保存済みページ向け）
+    """
+    with STATS.timer('parse'):
+        if html_content is None:
+            if stream:
+                return extract_records_streaming(url, url)
             with open(url, 'r', encoding='utf-8') as f:
                 html_content = f.read()
-        else:
-            # セッションを使用
-            session = requests.Session()
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-                'Accept-Language': 'ja,en-US;q=0.7,en;q=0.3',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-                'Sec-Fetch-Dest': 'document',
-                'Sec-Fetch-Mode': 'navigate',
-                'Sec-Fetch-Site': 'none',
-                'Cache-Control': 'max-age=0',
-            }
-            response = session.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            response.encoding = response.apparent_encoding  # 文字化け対策
-            html_content = response.text
-    
-        soup = BeautifulSoup(html_content, 'html.parser')
-    except Exception as e:
-        print(f"エラー: ページの取得に失敗しました - {e}")
-        return False
-    
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # 出力ディレクトリを作成
-    output_path = Path(output_dir)
-    images_dir = output_path / 'images'
+        return extract_records(html_content, url)
+
+
+def _timed_parse_page(url, html_content=None, stream=False):
+    """parse_page を実行し (レコード, 所要時間) を返す（プロセスプールの計測結果を親プロセスに戻すため）"""
+    start = time.perf_counter()
+    records = parse_page(url, html_content, stream)
+    return records, time.perf_counter() - start
+
+
+def _fetch_unless_local(url, session, cache=None):
+    """ローカルファイルなら None（解析側で読み込む）、URLならHTMLを返す"""
+    if os.path.exists(url):
+        log(f"ローカルファイルから読み込み: {url}")
+        return None
+    return fetch_page(url, session, cache)
+
+
+def _download_entry(entry, image_path, session, manifest, cache, journal):
+    """1行分の画像をダウンロードし、成功したらジャーナルに追記する"""
+    success = download_image(entry['image_url'], image_path, session, manifest, cache, entry['id'])
+    if success and journal is not None:
+        journal.append(entry)
+    STATS.progress('画像')
+    return success
+
+
+def _completed_future():
+    future = Future()
+    future.set_result(True)
+    return future
+
+
+def queue_downloads(records, output_dir, executor, session, manifest, cache=None, journal=None, paths=None):
+    """画像のダウンロードをワーカープールに積み、(Future, CSVの行) のリストを返す
+
+    CSVの行はページ上の順序で並べる（完了順ではなく登録順にCSVへ書き出すため）
+    journal に保存済みとして記録されている画像は取得し直さない（--resume）
+    paths（h3の番号 → 保存先のパス）を渡すと、そのレコードは既定のファイル名ではなくそのパスに保存する（--delta）
+    """
+    images_dir = Path(output_dir) / 'images'
     images_dir.mkdir(parents=True, exist_ok=True)
     
-    # CSVデータを格納するリスト
-    csv_data = []
-    
-    # h3タグを全て取得
-    h3_tags = soup.find_all('h3')
+    if paths is None:
+        log(f"\n{len(records)}個のID付きh3タグを発見")
     
-    if not h3_tags:
-        print("警告: h3タグが見つかりませんでした")
-        return False
-    
-    print(f"\n{len(h3_tags)}個のh3タグを発見")
-    
-    for idx, h3 in enumerate(h3_tags, start=1):
-        print(f"\n処理中 [{idx}/{len(h3_tags)}]: {h3.get_text(strip=True)[:50]}...")
+    pending = []
+    resumed = 0
+    first_unfinished = None
+    for record in records:
+        log(f"\n処理中 [{record.idx}] ID:{record.id}")
         
-        # h3のテキストにID:0000のような形式が含まれているかチェック
-        h3_text = h3.get_text(strip=True)
-        if not re.match(r'^ID:\d{4}', h3_text):
-            print(f"  スキップ: ID形式が見つかりません")
+        if not record.reading:
+            log(f"  スキップ: 読み方が見つかりませんでした")
             continue
         
-        # h3から読み方を抽出（h3要素全体を渡す）
-        reading = extract_reading_from_h3(h3)
+        log(f"  読み方: {record.reading}")
         
-        if not reading:
-            print(f"  スキップ: 読み方が見つかりませんでした")
-            continue
+        # 追加テキストがあれば表示
+        if record.additional_info:
+            log(f"  追加情報: {record.additional_info}")
         
-        print(f"  読み方: {reading}")
+        if not record.image_url:
+            log(f"  警告: 画像が見つかりませんでした")
+            continue
         
-        # h3の次の要素から画像を探す
-        current = h3.next_sibling
-        image_url = None
-        image_saved = False
-        has_additional_text = False
-        additional_texts = []
-        main_div = None
+        # 画像ファイル名を生成
+        path = (paths or {}).get(record.idx) or scraped_image_path(record.idx, record.reading)
+        image_path = Path(output_dir) / path
         
-        # h3の後の要素を順に確認
-        while current:
-            # 次のh3が来たら終了
-            if hasattr(current, 'name') and current.name == 'h3':
-                break
-            
-            # imgタグまたはpictureタグを探す
-            if hasattr(current, 'name') and current.name:
-                # divタグを保存（画像とテキストが含まれている）
-                if current.name == 'div' and not image_saved:
-                    main_div = current
-                
-                # pictureタグ内のsource要素を探す
-                picture = current.find('picture') if current.name != 'picture' else current
-                img = None
-                
-                if picture and not image_saved:
-                    # imgタグからsrcを取得
-                    img_tag = picture.find('img')
-                    if img_tag:
-                        image_url = img_tag.get('src')
-                        if image_url:
-                            # プロトコルがない場合は追加
-                            if image_url.startswith('//'):
-                                image_url = 'https:' + image_url
-                            # 相対URLを絶対URLに変換
-                            image_url = urljoin(url, image_url)
-                            
-                            # 画像ファイル名を生成
-                            # ファイル名を安全な形式に変換（'を削除）
-                            safe_reading = reading.replace('、', ',').replace('/', '_').replace('\\', '_').replace("'", '')
-                            image_filename = f"{idx}_{safe_reading}.png"
-                            image_path = images_dir / image_filename
-                            
-                            # 画像をダウンロード
-                            if download_image(image_url, image_path):
-                                image_saved = True
-                                
-                                # main_divから追加情報を抽出
-                                if main_div:
-                                    # divの直接の子要素からテキストノードを抽出
-                                    for child in main_div.children:
-                                        # テキストノードの場合
-                                        if isinstance(child, str):
-                                            text = child.strip()
-                                            if text and not text.startswith('<!--'):
-                                                additional_texts.append(text)
-                                                has_additional_text = True
-                                
-                                # CSVに保存（追加情報があれば含める）
-                                additional_info = '　'.join(additional_texts) if additional_texts else ''
-                                csv_data.append({
-                                    'path': f'images/{image_filename}',
-                                    'reading': reading,
-                                    'additional_info': additional_info
-                                })
-                
-                # pictureが見つからない場合はimgタグを直接探す
-                if not image_saved:
-                    img_tag = current.find('img') if current.name != 'img' else current
-                    if img_tag:
-                        image_url = img_tag.get('src')
-                        if image_url:
-                            # プロトコルがない場合は追加
-                            if image_url.startswith('//'):
-                                image_url = 'https:' + image_url
-                            # 相対URLを絶対URLに変換
-                            image_url = urljoin(url, image_url)
-                            
-                            # 画像ファイル名を生成
-                            safe_reading = reading.replace('、', ',').replace('/', '_').replace('\\', '_').replace("'", '')
-                            image_filename = f"{idx}_{safe_reading}.png"
-                            image_path = images_dir / image_filename
-                            
-                            # 画像をダウンロード
-                            if download_image(image_url, image_path):
-                                image_saved = True
-                                
-                                # main_divから追加情報を抽出
-                                if main_div:
-                                    # divの直接の子要素からテキストノードを抽出
-                                    for child in main_div.children:
-                                        # テキストノードの場合
-                                        if isinstance(child, str):
-                                            text = child.strip()
-                                            if text and not text.startswith('<!--'):
-                                                additional_texts.append(text)
-                                                has_additional_text = True
-                                
-                                # CSVに保存（追加情報があれば含める）
-                                additional_info = '　'.join(additional_texts) if additional_texts else ''
-                                csv_data.append({
-                                    'path': f'images/{image_filename}',
-                                    'reading': reading,
-                                    'additional_info': additional_info
-                                })
-            
-            current = current.next_sibling
+        row = {
+            'path': path,
+            'reading': record.reading,
+            'additional_info': record.additional_info
+        }
         
-        # 追加テキストがあれば表示
-        if has_additional_text:
-            print(f"  追加情報: {', '.join(additional_texts)}")
+        if journal is not None and journal.completed(record.idx, record.image_url, row['path']):
+            log(f"  取得済み（再開）: {image_path}")
+            resumed += 1
+            pending.append((_completed_future(), row))
+            continue
+        if first_unfinished is None:
+            first_unfinished = record.id
         
-        if not image_saved:
-            print(f"  警告: 画像が見つかりませんでした")
+        # 画像のダウンロードはワーカーに任せ、解析結果の処理を先に進める
+        entry = dict(row, idx=record.idx, id=record.id, image_url=record.image_url)
+        STATS.expect(1)
+        future = executor.submit(_download_entry, entry, image_path, session, manifest, cache, journal)
+        pending.append((future, row))
     
-    # CSVファイルに書き込み
+    if resumed:
+        print(f"\n再開: {resumed} 件は取得済み" + (f"、ID:{first_unfinished} から再開します" if first_unfinished else ""))
+    
+    return pending
+
+
+def write_mappings(output_dir, pending, manifest, journal=None):
+    """ダウンロードの結果を集計し、成功した行だけをページ上の順序のままCSVに書き出す
+
+    全ての画像を保存できた場合はジャーナルを削除する。失敗があった場合は残しておき、
+    --resume で失敗した分だけを取得し直せるようにする。
+    """
+    output_path = Path(output_dir)
+    csv_data = [row for future, row in pending if future.result()]
+    failed = len(pending) - len(csv_data)
+    
+    with STATS.timer('write'):
+        manifest.save()
+    counts = manifest.counts
+    print(f"\n✓ 画像: 新規 {counts['new']} 件 / 更新 {counts['updated']} 件 / 変更なし {counts['skipped']} 件"
+          f" / 失敗 {failed} 件")
+    
+    # CSVファイルに書き込み（一時ファイルに書いてから置き換える）
     if csv_data:
         csv_path = output_path / 'mappings.csv'
-        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        with STATS.timer('write'), atomic_open(csv_path, 'w', newline='', encoding='utf-8') as f:
             writer = csv.DictWriter(f, fieldnames=['path', 'reading', 'additional_info'])
             writer.writeheader()
             writer.writerows(csv_data)
         
+        if journal is not None:
+            journal.close(remove=failed == 0)
+            if failed:
+                print(f"  失敗した {failed} 件は --resume で取得し直せます")
+        
         print(f"\n✓ CSVファイルを保存: {csv_path}")
         print(f"✓ 合計 {len(csv_data)} 件のデータを保存しました")
         return True
     else:
+        if journal is not None:
+            journal.close()
         print("\nエラー: データが取得できませんでした")
         return False
 
 
+def queue_delta(records, output_dir, executor, session, manifest, cache=None, journal=None):
+    """既存の mappings.csv と比較し、新規・画像が変わったエントリの画像だけをダウンロードに積む（--delta）
+
+    (DeltaPlan, (Future, CSVの行) のリスト) を返す
+    """
+    with STATS.timer('plan'):
+        plan = plan_delta(records, output_dir, manifest)
+    print(f"\n{len(records)}個のID付きh3タグを発見: 新規 {len(plan.new)} 件 / 変更 {len(plan.changed)} 件"
+          f" / 変更なし {plan.unchanged} 件 / ページに無い行 {len(plan.removed)} 件")
+    
+    paths = {record.idx: path for record, path in plan.new}
+    for record, row, image_changed in plan.changed:
+        if image_changed:
+            paths[record.idx] = row['path']
+    downloads = [record for record in records if record.idx in paths]
+    pending = queue_downloads(downloads, output_dir, executor, session, manifest, cache, journal, paths=paths)
+    return plan, pending
+
+
+def write_delta(output_dir, plan, pending, manifest, journal=None):
+    """差分の取得結果を mappings.csv に反映する（--delta）
+
+    新規の行だけなら既存部分はそのままで末尾に追記し、既存の行が変わった場合だけ全体を書き直す。
+    ページから消えた行は削除せずに報告だけする。
+    """
+    csv_path = Path(output_dir) / 'mappings.csv'
+    succeeded = {row['path'] for future, row in pending if future.result()}
+    failed = len(pending) - len(succeeded)
+    
+    updated = 0
+    for record, row, image_changed in plan.changed:
+        if image_changed and row['path'] not in succeeded:
+            continue
+        row['reading'] = record.reading
+        row['additional_info'] = record.additional_info
+        updated += 1
+    new_rows = [
+        {'path': path, 'reading': record.reading, 'additional_info': record.additional_info}
+        for record, path in plan.new if path in succeeded
+    ]
+    
+    with STATS.timer('write'):
+        manifest.save()
+        if updated or not csv_path.exists():
+            if plan.rows or new_rows:
+                mappings_io.write_mappings(csv_path, plan.header, plan.rows + new_rows)
+        elif new_rows:
+            mappings_io.append_mappings(csv_path, plan.header, new_rows)
+    
+    if journal is not None:
+        journal.close(remove=failed == 0)
+        if failed:
+            print(f"  失敗した {failed} 件は --resume で取得し直せます")
+    
+    print(f"\n✓ 差分: 追加 {len(new_rows)} 件 / 更新 {updated} 件 / 変更なし {plan.unchanged} 件 / 失敗 {failed} 件")
+    if plan.removed:
+        print(f"  ページに無くなった行 ({len(plan.removed)} 件、mappings.csv からは削除していません):")
+        for row in plan.removed:
+            print(f"    {row.get('path')} ({row.get('reading')})")
+    if new_rows or updated:
+        print(f"✓ CSVファイルを保存: {csv_path}")
+    return failed == 0
+
+
+def _report_interrupted(jobs):
+    """中断時に、それまでの取得結果を保存する"""
+    for manifest, journal in jobs:
+        manifest.save()
+        journal.close()
+    print("\n中断しました。--resume を付けて実行すると、保存済みの画像を取得し直さずに再開できます")
+
+
+def scrape_kanji_data(url, output_dir, jobs=DEFAULT_JOBS, stream=False, cache=None, resume=False, delta=False):
+    """指定されたURLまたはローカルファイルから漢字データをスクレイピングする
+
+    ページの解析中は画像のダウンロードをワーカープールに積むだけにし、
+    解析が終わった時点でダウンロードの完了を待つ
+    cache (http_cache.HttpCache) を渡すと、ページと画像をキャッシュ経由で取得する
+    resume=True の場合、前回の実行で保存済みの画像はジャーナルを見て取得し直さない
+    delta=True の場合、既存の mappings.csv に無い・変わったエントリだけを取得して反映する
+    """
+    
+    print(f"URLまたはファイルにアクセス中: {url}")
+    
+    session = create_session(jobs)
+    
+    # ページを取得して一度だけパースする
+    try:
+        records = parse_page(url, _fetch_unless_local(url, session, cache), stream)
+    except Exception as e:
+        print(f"エラー: ページの取得に失敗しました - {e}")
+        return False
+    
+    if not records:
+        print("警告: ID付きのh3タグが見つかりませんでした")
+        return False
+    
+    # 前回の取得結果（ETag・ハッシュ等）と再開用のジャーナルを読み込む
+    manifest = ImageManifest(output_dir)
+    journal = ScrapeJournal(output_dir, resume=resume)
+    
+    executor = ThreadPoolExecutor(max_workers=max(1, jobs))
+    try:
+        if delta:
+            plan, pending = queue_delta(records, output_dir, executor, session, manifest, cache, journal)
+        else:
+            pending = queue_downloads(records, output_dir, executor, session, manifest, cache, journal)
+        log(f"\n画像のダウンロード完了を待機中 ({len(pending)}件, 並列数 {jobs})...")
+        if delta:
+            return write_delta(output_dir, plan, pending, manifest, journal)
+        return write_mappings(output_dir, pending, manifest, journal)
+    except KeyboardInterrupt:
+        executor.shutdown(wait=True, cancel_futures=True)
+        _report_interrupted([(manifest, journal)])
+        return False
+    finally:
+        executor.shutdown(wait=True)
+
+
+def read_batch_spec(spec_path):
+    """バッチ指定ファイルを読み込み (URL, 出力ディレクトリ) のリストを返す
+
+    1行に「URLまたはローカルファイル 出力ディレクトリ」を空白区切りで書く。# 以降はコメント。
+    """
+    pages = []
+    with open(spec_path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            fields = line.split()
+            if len(fields) != 2:
+                raise ValueError(f'{spec_path}:{line_no}: 「URL 出力ディレクトリ」の形式ではありません')
+            pages.append((fields[0], fields[1]))
+    
+    output_dirs = [Path(output_dir).resolve() for _, output_dir in pages]
+    if len(set(output_dirs)) != len(output_dirs):
+        raise ValueError(f'{spec_path}: 同じ出力ディレクトリが複数回指定されています')
+    return pages
+
+
+def scrape_batch(spec_path, jobs=DEFAULT_JOBS, parse_workers=None, stream=False, cache=None, resume=False,
+                 delta=False):
+    """バッチ指定ファイルに書かれた全ページをスクレイピングする
+
+    ページの取得と画像のダウンロードは1つの共有ワーカープールで行い、
+    ページの解析はプロセスプールで並列に行う。解析が終わったページから順に
+    画像のダウンロードを積むので、他のページの解析中も回線が遊ばない。
+    """
+    try:
+        pages = read_batch_spec(spec_path)
+    except (OSError, ValueError) as e:
+        print(f"エラー: バッチ指定ファイルを読み込めませんでした - {e}")
+        return False
+    
+    print(f"{len(pages)}ページをスクレイピングします (解析プロセス {parse_workers or os.cpu_count()}, ダウンロード並列数 {jobs})")
+    
+    session = create_session(jobs)
+    results = {}
+    queued = []
+    
+    downloads = ThreadPoolExecutor(max_workers=max(1, jobs))
+    try:
+        with ProcessPoolExecutor(max_workers=parse_workers) as parsers:
+            fetches = {
+                downloads.submit(_fetch_unless_local, url, session, cache): (url, output_dir)
+                for url, output_dir in pages
+            }
+            parses = {}
+            for future in as_completed(fetches):
+                url, output_dir = fetches[future]
+                try:
+                    html_content = future.result()
+                except Exception as e:
+                    print(f"エラー: ページの取得に失敗しました ({url}) - {e}")
+                    results[output_dir] = False
+                    continue
+                parses[parsers.submit(_timed_parse_page, url, html_content, stream)] = (url, output_dir)
+            
+            for future in as_completed(parses):
+                url, output_dir = parses[future]
+                try:
+                    records, seconds = future.result()
+                except Exception as e:
+                    print(f"エラー: ページの解析に失敗しました ({url}) - {e}")
+                    results[output_dir] = False
+                    continue
+                STATS.add_time('parse', seconds)
+                
+                print(f"\n=== {url} -> {output_dir} ===")
+                if not records:
+                    print("警告: ID付きのh3タグが見つかりませんでした")
+                    results[output_dir] = False
+                    continue
+                
+                manifest = ImageManifest(output_dir)
+                journal = ScrapeJournal(output_dir, resume=resume)
+                if delta:
+                    plan, pending = queue_delta(records, output_dir, downloads, session, manifest, cache, journal)
+                else:
+                    plan = None
+                    pending = queue_downloads(records, output_dir, downloads, session, manifest, cache, journal)
+                queued.append((output_dir, manifest, journal, plan, pending))
+        
+        log(f"\n画像のダウンロード完了を待機中 ({sum(len(p) for *_, p in queued)}件, 並列数 {jobs})...")
+        for output_dir, manifest, journal, plan, pending in queued:
+            print(f"\n=== {output_dir} ===")
+            if plan is not None:
+                results[output_dir] = write_delta(output_dir, plan, pending, manifest, journal)
+            else:
+                results[output_dir] = write_mappings(output_dir, pending, manifest, journal)
+    except KeyboardInterrupt:
+        downloads.shutdown(wait=True, cancel_futures=True)
+        _report_interrupted([(manifest, journal) for _, manifest, journal, _, _ in queued])
+        return False
+    finally:
+        downloads.shutdown(wait=True)
+    
+    print("\n=== 結果 ===")
+    for _, output_dir in pages:
+        print(f"  {'✓' if results.get(output_dir) else '✗'} {output_dir}")
+    return all(results.get(output_dir) for _, output_dir in pages)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='漢字データをスクレイピングしてCSVと画像を保存します',
@@ -311,16 +518,44 @@ def main():
 使用例:
   python scrape_kanji.py https://w.atwiki.jp/yuia_sk/pages/16.html public/kanji/level-7
   python scrape_kanji.py https://w.atwiki.jp/yuia_sk/pages/17.html public/kanji/level-8
+  python scrape_kanji.py --batch scrape_pages.txt
+  python scrape_kanji.py https://w.atwiki.jp/yuia_sk/pages/16.html public/kanji/level-7 --delta
         """
     )
     
-    parser.add_argument('url', help='スクレイピング対象のURL')
-    parser.add_argument('output_dir', help='出力ディレクトリのパス')
+    parser.add_argument('url', nargs='?', help='スクレイピング対象のURL')
+    parser.add_argument('output_dir', nargs='?', help='出力ディレクトリのパス')
+    parser.add_argument('--batch', metavar='SPEC',
+                        help='「URL 出力ディレクトリ」を1行ずつ書いたファイルを指定し、全ページをまとめて処理する')
+    parser.add_argument('--parse-workers', type=int, default=None,
+                        help='バッチモードでページを解析するプロセス数 (既定: CPUコア数)')
+    parser.add_argument('--resume', action='store_true',
+                        help='前回中断した実行の続きから再開する（保存済みの画像は取得し直さない）')
+    parser.add_argument('--delta', action='store_true',
+                        help='既存の mappings.csv と比較し、新規・変更のあったエントリだけを取得して反映する')
+    parser.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                        help=f'画像ダウンロードの並列数 (既定: {DEFAULT_JOBS})')
+    parser.add_argument('--stream', action='store_true',
+                        help='ローカルファイルをストリーミングで解析する（巨大な保存済みページ向け、lxmlが必要）')
+    add_cache_arguments(parser)
+    add_stats_arguments(parser)
     
     args = parser.parse_args()
+    if not args.batch and not (args.url and args.output_dir):
+        parser.error('URL と出力ディレクトリ、または --batch を指定してください')
     
     # スクレイピング実行
-    success = scrape_kanji_data(args.url, args.output_dir)
+    start_stats('scrape_kanji', args)
+    cache = cache_from_args(args)
+    if args.batch:
+        success = scrape_batch(args.batch, jobs=args.jobs, parse_workers=args.parse_workers,
+                               stream=args.stream, cache=cache, resume=args.resume, delta=args.delta)
+    else:
+        success = scrape_kanji_data(args.url, args.output_dir, jobs=args.jobs, stream=args.stream,
+                                    cache=cache, resume=args.resume, delta=args.delta)
+    if cache is not None:
+        print(f"\nHTTPキャッシュ: ヒット {cache.hits} 件 / 取得 {cache.misses} 件 ({cache.mode})")
+    finish_stats(args)
     
     if success:
         print("\n✓ スクレイピングが完了しました!")
@@ -9,6 +9,7 @@ import { DebugPanel } from './components/DebugPanel'
 import './App.css'
 import { type Item, type Level, type Mode } from './types/kanji'
 import { loadKanjiData } from './utils/dataLoader'
+import { canPrecache, precacheLevel, precacheThumbnails } from './utils/precache'
 import * as BN from './utils/bigNumber'
 
 const QuizMode = lazy(() => import('./components/QuizMode'));
@@ -91,6 +92,9 @@ function App() {
   
   const [mode, setMode] = useState<Mode>('list');
   const [studyMode, setStudyMode] = useState(false);
+  // 「画像を保存」（レベルの全ての画像の先読み）の状態
+  const [precacheStatus, setPrecacheStatus] = useState<{ level: Level; text: string } | null>(null);
+  const precacheText = precacheStatus?.level === selectedLevel ? precacheStatus.text : null;
   
   const [investigatingIssues, setInvestigatingIssues] = useState<Article[]>([]);
   const [showIssueBanner, setShowIssueBanner] = useState(true);
@@ -196,6 +200,8 @@ function App() {
         const data = await loadKanjiData(selectedLevel);
         if (!cancelled) {
           setItems(data);
+          // 一覧のサムネイルを先読みしておく（全ての画像は「画像を保存」を押したときだけ）
+          precacheThumbnails(selectedLevel);
         }
       } catch (err: any) {
         if (!cancelled) {
@@ -618,6 +624,23 @@ function App() {
               <button onClick={startQuiz} className="start-quiz-button">
                 問題モード開始
               </button>
+
+              {selectedLevel !== 'extra' && canPrecache() && (
+                <button
+                  onClick={() => {
+                    const level = selectedLevel;
+                    setPrecacheStatus({ level, text: '保存中…' });
+                    precacheLevel(level).then((result) => {
+                      setPrecacheStatus(result ? { level, text: `保存しました (${result.total} 枚)` } : null);
+                    });
+                  }}
+                  className="precache-button"
+                  disabled={precacheText === '保存中…'}
+                  title="このレベルの全ての画像を端末に保存し、オフラインでも表示できるようにします"
+                >
+                  {precacheText ?? '画像を保存'}
+                </button>
+              )}
             </div>
           </div>
           
@@ -1,7 +1,7 @@
 import { useEffect, useState } from 'react'
 import { useNavigate } from 'react-router-dom'
 import ChapterSelect from './ChapterSelect'
-import { loadStory } from './storyParser'
+import { loadChapterTitles } from './storyParser'
 import type { Scene } from './storyParser'
 import { useGamification } from './contexts/GamificationContext'
 
@@ -18,9 +18,9 @@ export default function ChapterSelectPage() {
   const [scenes, setScenes] = useState<Scene[]>([])
   const [loading, setLoading] = useState(true)
   
-  // story.jsonから章データを読み込む
+  // 章のタイトルだけを読み込む（manifest.json が無ければ story.json）
   useEffect(() => {
-    loadStory().then((loadedScenes: Scene[]) => {
+    loadChapterTitles().then((loadedScenes: Scene[]) => {
       setScenes(loadedScenes)
       setLoading(false)
     }).catch(error => {
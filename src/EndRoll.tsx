@@ -1,6 +1,7 @@
 import { useEffect, useRef, useState } from 'react';
 import { useGamification } from './contexts/GamificationContext';
 import { usePresentBox } from './contexts/PresentBoxContext';
+import { fetchAsset } from './utils/assetUrl';
 
 // Background images used in the story
 const STORY_BACKGROUNDS = [
@@ -67,7 +68,7 @@ export default function EndRoll({ onBackToTitle }: EndRollProps) {
   const [endrollData, setEndrollData] = useState(() => normalizeEndroll(null));
   useEffect(() => {
     let mounted = true;
-    fetch('/endroll.json')
+    fetchAsset('/endroll.json')
       .then((r) => r.json())
       .then((j) => {
         if (!mounted) return;
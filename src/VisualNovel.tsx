@@ -1,7 +1,8 @@
 import React, { useState, useEffect } from 'react';
 import { useLocation } from 'react-router-dom';
 import type { Scene } from './storyParser';
-import { loadStory } from './storyParser';
+import { loadStory, loadChapter, loadChapterTitles, prefetchChapterAssets } from './storyParser';
+import { loadFrameAtlas, FramePlayer } from './utils/frameAtlas';
 import { useGamification } from './contexts/GamificationContext';
 import './VisualNovel.css';
 import EndRoll from './EndRoll';
@@ -32,6 +33,8 @@ export default function VisualNovel() {
   const [loading, setLoading] = useState(true);
   const ZERO_FRAMES = 16;
   const ZERO_FPS = 24; // default frames per second for the animation (adjustable)
+  // pack_frames.py でまとめたアトラス（無ければ1枚ずつ読み込む）
+  const ZERO_ATLAS_URL = '/images/zeroAnime/atlas.json';
   const [zeroUnlocked, setZeroUnlocked] = useState(false);
   const [zeroTriggers, setZeroTriggers] = useState<Set<string>>(new Set());
   // ゲート用アンロック管理（シーン単位）
@@ -129,22 +132,29 @@ export default function VisualNovel() {
     try { localStorage.setItem('autoAdvanceEnabled', JSON.stringify(autoAdvanceEnabled)); } catch (e) {}
   }, [autoAdvanceEnabled]);
 
+  // compute zero trigger positions from the dialogues of the given scenes
+  const addZeroTriggers = (loadedScenes: Scene[], firstIndex: number) => {
+    const triggers: string[] = [];
+    const zeroRegex = /^\s*[「『]?\s*零\s*[。\.!！…]*\s*[」』]?\s*$/;
+    loadedScenes.forEach((s: Scene, i: number) => {
+      const si = firstIndex + i;
+      // only register zero triggers for scenes 7 and 8 (1-based)
+      if (si !== 6 && si !== 7) return;
+      (s.dialogues || []).forEach((d: any, di: number) => {
+        const txt = (d.text || '').toString();
+        if (zeroRegex.test(txt)) triggers.push(`${si}:${di}`);
+      });
+    });
+    if (triggers.length > 0) {
+      setZeroTriggers(prev => new Set(Array.from(prev).concat(triggers)));
+    }
+  };
+
   useEffect(() => {
-    loadStory().then((loadedScenes: Scene[]) => {
+    // 章ごとのファイルがあれば章のタイトルだけを読み込み、台詞は章を始めるときに読み込む
+    loadChapterTitles().then((loadedScenes: Scene[]) => {
       setScenes(loadedScenes as Scene[]);
-      // compute zero trigger positions from dialogues in the parsed scenes
-      const triggers = new Set<string>();
-      const zeroRegex = /^\s*[「『]?\s*零\s*[。\.!！…]*\s*[」』]?\s*$/;
-      loadedScenes.forEach((s: Scene, si: number) => {
-        (s.dialogues || []).forEach((d: any, di: number) => {
-          const txt = (d.text || '').toString();
-          if (zeroRegex.test(txt)) {
-            // only register zero triggers for scenes 7 and 8 (1-based)
-            if (si === 6 || si === 7) triggers.add(`${si}:${di}`);
-          }
-        });
-      });
-      setZeroTriggers(triggers);
+      addZeroTriggers(loadedScenes, 0);
       setLoading(false);
       addLog(`Story loaded: ${loadedScenes.length} scenes`);
     });
@@ -152,10 +162,27 @@ export default function VisualNovel() {
 
   // helper: preload assets (images, voice, zero frames, bgm) for a given chapter
   const preloadChapterAssets = async (chapterIndex: number) => {
-    const scene = scenes[chapterIndex];
+    let scene = scenes[chapterIndex];
     if (!scene) return;
     const urls = new Set<string>();
 
+    // 章の台詞をまだ読み込んでいなければ、この章のファイルだけを読み込む
+    const chapter = await loadChapter(chapterIndex);
+    if (chapter) {
+      if (scene.dialogues.length === 0) {
+        scene = chapter;
+        setScenes(prev => prev.map((s, i) => (i === chapterIndex ? chapter : s)));
+        addZeroTriggers([chapter], chapterIndex);
+      }
+    } else if (scene.dialogues.length === 0) {
+      // 章のファイルを読み込めない場合は story.json 全体に戻る
+      const loadedScenes = await loadStory();
+      if (!loadedScenes[chapterIndex]) return;
+      scene = loadedScenes[chapterIndex];
+      setScenes(loadedScenes);
+      addZeroTriggers(loadedScenes, 0);
+    }
+
     // include BGM (第8章は /BGM2.mp3 を使用)
     if (chapterIndex === 8) {
       urls.add('/BGM2.mp3');
@@ -163,36 +190,41 @@ export default function VisualNovel() {
       urls.add('/BGM.mp3');
     }
 
-    if ((scene as any).background) {
-      const name = (scene as any).background;
-      ['.jpg', '.png', '.jpeg', '.webp'].forEach(ext => urls.add(`/images/backgrounds/${name}${ext}`));
-    }
-
-    (scene.dialogues || []).forEach((d: any) => {
-      if (d.background) {
-        const name = d.background;
+    // compile_story.py の章ファイルがあれば、実在する資産だけの一覧を使う
+    if (chapter) {
+      chapter.prefetch.forEach(asset => urls.add(asset.url));
+    } else {
+      if ((scene as any).background) {
+        const name = (scene as any).background;
         ['.jpg', '.png', '.jpeg', '.webp'].forEach(ext => urls.add(`/images/backgrounds/${name}${ext}`));
       }
-      if (Array.isArray(d.characters)) {
-        d.characters.forEach((c: string) => {
-          const img = CHARACTER_IMAGES[c];
-          if (img) urls.add(img);
-          if (c === '零') {
-            for (let i = 1; i <= ZERO_FRAMES; i++) {
-              urls.add(`/images/zeroAnime/frame${String(i).padStart(2, '0')}.png`);
+
+      (scene.dialogues || []).forEach((d: any) => {
+        if (d.background) {
+          const name = d.background;
+          ['.jpg', '.png', '.jpeg', '.webp'].forEach(ext => urls.add(`/images/backgrounds/${name}${ext}`));
+        }
+        if (Array.isArray(d.characters)) {
+          d.characters.forEach((c: string) => {
+            const img = CHARACTER_IMAGES[c];
+            if (img) urls.add(img);
+            if (c === '零') {
+              for (let i = 1; i <= ZERO_FRAMES; i++) {
+                urls.add(`/images/zeroAnime/frame${String(i).padStart(2, '0')}.png`);
+              }
             }
-          }
-        });
-      }
-      if (Array.isArray(d.voice)) {
-        d.voice.forEach((v: string) => {
-          let src = String(v || '').replace(/\\/g, '/');
-          if (!src.startsWith('/')) src = '/' + src.replace(/^\/+/,'');
-          urls.add(src);
-          console.log('📦 Preloading voice:', src);
-        });
-      }
-    });
+          });
+        }
+        if (Array.isArray(d.voice)) {
+          d.voice.forEach((v: string) => {
+            let src = String(v || '').replace(/\\/g, '/');
+            if (!src.startsWith('/')) src = '/' + src.replace(/^\/+/,'');
+            urls.add(src);
+            console.log('📦 Preloading voice:', src);
+          });
+        }
+      });
+    }
 
     const urlArray = Array.from(urls);
     setChapterLoadProgress({loaded: 0, total: urlArray.length});
@@ -217,6 +249,10 @@ export default function VisualNovel() {
 
     // wait for all or timeout
     await Promise.race([Promise.all(promises), new Promise(res => setTimeout(res, 10000))]);
+    // 次の章の資産はバックグラウンドで先読みしておく
+    if (chapterIndex + 1 < scenes.length) {
+      prefetchChapterAssets(chapterIndex + 1).catch(() => {});
+    }
     setTimeout(() => {
       setChapterLoading(false);
       setChapterLoadingText('');
@@ -432,6 +468,8 @@ export default function VisualNovel() {
 
   // zero フレームを事前読み込みして滑らかに再生する
   const zeroFramesRef = React.useRef<HTMLImageElement[] | null>(null);
+  const zeroPlayerRef = React.useRef<FramePlayer | null>(null);
+  const [zeroAtlasReady, setZeroAtlasReady] = useState(false);
   const animRef = React.useRef<number | null>(null);
   const frameIndexRef = React.useRef(0);
   // audio players for dialogue voice playback
@@ -583,78 +621,94 @@ export default function VisualNovel() {
 
   // 一度だけフレームをプリロード
   useEffect(() => {
-    if (zeroFramesRef.current) return;
-
-    // First try deterministic frameNN pattern and keep order
-    const frameOrdered: Array<HTMLImageElement | null> = new Array(ZERO_FRAMES).fill(null);
-    let remainingFrame = ZERO_FRAMES;
-    let anyFrameLoaded = false;
-
-    for (let i = 1; i <= ZERO_FRAMES; i++) {
-      const idx = i - 1;
-      const src = `/images/zeroAnime/frame${String(i).padStart(2, '0')}.png`;
-      const img = new Image();
-      img.onload = () => {
-        frameOrdered[idx] = img;
-        anyFrameLoaded = true;
-        remainingFrame--;
-        if (remainingFrame <= 0) {
-          if (anyFrameLoaded) {
-            zeroFramesRef.current = frameOrdered.filter(Boolean) as HTMLImageElement[];
-          }
-        }
-        // addLog(`Preloaded zero frame: ${src}`);
-      };
-      img.onerror = () => {
-        remainingFrame--;
-        if (remainingFrame <= 0) {
-          if (anyFrameLoaded) {
-            zeroFramesRef.current = frameOrdered.filter(Boolean) as HTMLImageElement[];
-          }
-        }
-      };
-      img.src = src;
-    }
-
-    // If none of the frameNN pattern existed, try Scene1_000..Scene1_099 deterministically
-    setTimeout(() => {
-      if (zeroFramesRef.current && zeroFramesRef.current.length > 0) return;
-      const sceneMapSize = 100;
-      const sceneOrdered: Array<HTMLImageElement | null> = new Array(sceneMapSize).fill(null);
-      let remainingScene = sceneMapSize;
-      let anySceneLoaded = false;
-      for (let i = 0; i < sceneMapSize; i++) {
-        const src = `/images/zeroAnime/Scene1_${String(i).padStart(3, '0')}.png`;
+    if (zeroFramesRef.current || zeroPlayerRef.current) return;
+    let cancelled = false;
+
+    const preloadFrames = () => {
+      // First try deterministic frameNN pattern and keep order
+      const frameOrdered: Array<HTMLImageElement | null> = new Array(ZERO_FRAMES).fill(null);
+      let remainingFrame = ZERO_FRAMES;
+      let anyFrameLoaded = false;
+
+      for (let i = 1; i <= ZERO_FRAMES; i++) {
+        const idx = i - 1;
+        const src = `/images/zeroAnime/frame${String(i).padStart(2, '0')}.png`;
         const img = new Image();
         img.onload = () => {
-          sceneOrdered[i] = img;
-          anySceneLoaded = true;
-          remainingScene--;
-          if (remainingScene <= 0 && anySceneLoaded) {
-            zeroFramesRef.current = sceneOrdered.filter(Boolean) as HTMLImageElement[];
+          frameOrdered[idx] = img;
+          anyFrameLoaded = true;
+          remainingFrame--;
+          if (remainingFrame <= 0) {
+            if (anyFrameLoaded) {
+              zeroFramesRef.current = frameOrdered.filter(Boolean) as HTMLImageElement[];
+            }
           }
-          // addLog(`Preloaded zero frame (alt): ${src}`);
+          // addLog(`Preloaded zero frame: ${src}`);
         };
         img.onerror = () => {
-          remainingScene--;
-          if (remainingScene <= 0 && anySceneLoaded) {
-            zeroFramesRef.current = sceneOrdered.filter(Boolean) as HTMLImageElement[];
+          remainingFrame--;
+          if (remainingFrame <= 0) {
+            if (anyFrameLoaded) {
+              zeroFramesRef.current = frameOrdered.filter(Boolean) as HTMLImageElement[];
+            }
           }
         };
         img.src = src;
       }
-      // final safety: if none loaded, set null
+
+      // If none of the frameNN pattern existed, try Scene1_000..Scene1_099 deterministically
       setTimeout(() => {
-        if (!zeroFramesRef.current) zeroFramesRef.current = null;
-      }, 1000);
-    }, 300);
+        if (zeroFramesRef.current && zeroFramesRef.current.length > 0) return;
+        const sceneMapSize = 100;
+        const sceneOrdered: Array<HTMLImageElement | null> = new Array(sceneMapSize).fill(null);
+        let remainingScene = sceneMapSize;
+        let anySceneLoaded = false;
+        for (let i = 0; i < sceneMapSize; i++) {
+          const src = `/images/zeroAnime/Scene1_${String(i).padStart(3, '0')}.png`;
+          const img = new Image();
+          img.onload = () => {
+            sceneOrdered[i] = img;
+            anySceneLoaded = true;
+            remainingScene--;
+            if (remainingScene <= 0 && anySceneLoaded) {
+              zeroFramesRef.current = sceneOrdered.filter(Boolean) as HTMLImageElement[];
+            }
+            // addLog(`Preloaded zero frame (alt): ${src}`);
+          };
+          img.onerror = () => {
+            remainingScene--;
+            if (remainingScene <= 0 && anySceneLoaded) {
+              zeroFramesRef.current = sceneOrdered.filter(Boolean) as HTMLImageElement[];
+            }
+          };
+          img.src = src;
+        }
+        // final safety: if none loaded, set null
+        setTimeout(() => {
+          if (!zeroFramesRef.current) zeroFramesRef.current = null;
+        }, 1000);
+      }, 300);
+    };
+
+    // アトラスがあればアトラスと atlas.json の2回の取得で済ませる
+    loadFrameAtlas(ZERO_ATLAS_URL).then((atlas) => {
+      if (cancelled) return;
+      if (atlas) {
+        zeroPlayerRef.current = new FramePlayer(atlas);
+        setZeroAtlasReady(true);
+      } else {
+        preloadFrames();
+      }
+    });
+    return () => { cancelled = true; };
   }, []);
 
-  // アニメーションループを常時回し、表示されているときのみ img.src を更新する。
+  // アニメーションループを常時回し、表示されているときのみ img.src（アトラスの場合はキャンバス）を更新する。
   // こうすることで表示・非表示を切り替えても再生位置がリセットされない。
   useEffect(() => {
+    const player = zeroPlayerRef.current;
     const frames = zeroFramesRef.current;
-    if (!frames || frames.length === 0) return;
+    if (!player && (!frames || frames.length === 0)) return;
     if (animRef.current) return; // 既にループ中
 
     const frameDuration = 1000 / ZERO_FPS;
@@ -663,8 +717,14 @@ export default function VisualNovel() {
     const step = (ts: number) => {
       if (!lastTs) lastTs = ts;
       const elapsed = ts - lastTs;
-      if (elapsed >= frameDuration) {
-        frameIndexRef.current = (frameIndexRef.current + 1) % frames.length;
+      if (player) {
+        // 差分のフレームを正しく重ねるため、表示していない間もフレームは順に描く
+        if (player.index < 0 || elapsed >= player.duration) {
+          player.advance();
+          lastTs = ts;
+        }
+      } else if (elapsed >= frameDuration) {
+        frameIndexRef.current = (frameIndexRef.current + 1) % frames!.length;
         lastTs = ts;
       }
 
@@ -677,8 +737,11 @@ export default function VisualNovel() {
       const key = `${currentSceneIndex}:${currentDialogueIndex}`;
       const triggerNow = zeroTriggers.has(key);
       const shouldShow = zeroUnlocked || sceneHasZeroNow || triggerNow || hasZero;
-      if (imgEl && shouldShow && frames[frameIndexRef.current]) {
-        imgEl.src = frames[frameIndexRef.current].src;
+      if (player) {
+        const canvasEl = document.getElementById('zero-sprite-canvas') as HTMLCanvasElement | null;
+        if (canvasEl && shouldShow) player.copyTo(canvasEl);
+      } else if (imgEl && shouldShow && frames![frameIndexRef.current]) {
+        imgEl.src = frames![frameIndexRef.current].src;
       }
 
       animRef.current = requestAnimationFrame(step);
@@ -692,7 +755,7 @@ export default function VisualNovel() {
         animRef.current = null;
       }
     };
-  }, [zeroTriggers, zeroUnlocked, scenes, currentSceneIndex, currentDialogueIndex, ZERO_FPS]);
+  }, [zeroTriggers, zeroUnlocked, scenes, currentSceneIndex, currentDialogueIndex, ZERO_FPS, zeroAtlasReady]);
 
   // シーンが変わったとき、もしそのシーンの characters に 零 が含まれていたら
   // 一度フラグを立てて以後表示を永続化する
@@ -1312,15 +1375,25 @@ export default function VisualNovel() {
               if (charName === '零') {
                 return (
                   <div key={`${charName}-${index}`} className={`zero-gif-container ${isSpeaking ? 'speaking' : ''}`} style={style} aria-hidden>
-                    <img
-                      src={imageSrc}
-                      alt="零"
-                      className="zero-sprite"
-                      draggable={false}
-                      onDragStart={(e) => e.preventDefault()}
-                      id="zero-sprite-img"
-                      style={{width: '100%', height: '100%', objectFit: 'contain'}}
-                    />
+                    {zeroAtlasReady && zeroPlayerRef.current ? (
+                      <canvas
+                        width={zeroPlayerRef.current.atlas.width}
+                        height={zeroPlayerRef.current.atlas.height}
+                        className="zero-sprite"
+                        id="zero-sprite-canvas"
+                        style={{width: '100%', height: '100%', objectFit: 'contain'}}
+                      />
+                    ) : (
+                      <img
+                        src={imageSrc}
+                        alt="零"
+                        className="zero-sprite"
+                        draggable={false}
+                        onDragStart={(e) => e.preventDefault()}
+                        id="zero-sprite-img"
+                        style={{width: '100%', height: '100%', objectFit: 'contain'}}
+                      />
+                    )}
                     <div className="character-name-tag zero-name-tag" style={{position: 'fixed', bottom: '500px', left: `${leftPosition}%`, transform: 'translateX(-50%)', zIndex: 100}}>零</div>
                   </div>
                 );
@@ -1389,15 +1462,25 @@ export default function VisualNovel() {
             if (charName === '零') {
               return (
                 <div key={`${charName}-${index}`} className={`zero-gif-container ${isSpeaking ? 'speaking' : ''}`} style={style} aria-hidden>
-                  <img
-                    src={imageSrc}
-                    alt="零"
-                    className="zero-sprite"
-                    draggable={false}
-                    onDragStart={(e) => e.preventDefault()}
-                    id="zero-sprite-img"
-                    style={{width: '100%', height: '100%', objectFit: 'contain'}}
-                  />
+                  {zeroAtlasReady && zeroPlayerRef.current ? (
+                    <canvas
+                      width={zeroPlayerRef.current.atlas.width}
+                      height={zeroPlayerRef.current.atlas.height}
+                      className="zero-sprite"
+                      id="zero-sprite-canvas"
+                      style={{width: '100%', height: '100%', objectFit: 'contain'}}
+                    />
+                  ) : (
+                    <img
+                      src={imageSrc}
+                      alt="零"
+                      className="zero-sprite"
+                      draggable={false}
+                      onDragStart={(e) => e.preventDefault()}
+                      id="zero-sprite-img"
+                      style={{width: '100%', height: '100%', objectFit: 'contain'}}
+                    />
+                  )}
                   <div className={`character-name-tag zero-name-tag ${isCrowded ? 'crowded' : ''}`} style={{position: 'fixed', bottom: '500px', left: '50%', transform: 'translateX(-50%)', zIndex: 100}}>零</div>
                 </div>
               );
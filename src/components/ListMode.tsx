@@ -2,6 +2,9 @@ import { useState, useRef, useEffect, useMemo, memo, useCallback } from 'react';
 import { FixedSizeList as List } from 'react-window';
 import { type Item, type Level } from '../types/kanji';
 import { formatReadingWithOkurigana } from '../utils/kanjiUtils';
+import { foldReading, loadSearchIndex, searchReadings, type SearchIndex } from '../utils/searchIndex';
+import { loadComponentIndex, searchComponents, type ComponentIndex } from '../utils/componentIndex';
+import { getDataVersion } from '../utils/dataLoader';
 
 interface ListModeProps {
   items: Item[];
@@ -55,7 +58,20 @@ const VirtualizedGrid = memo(({ items, studyMode, revealed, handleCardClick }: {
         cells.push(
           <div key={i} style={{ width: CARD_WIDTH, marginRight: GAP }}>
             <div className={`kanji-card ${studyMode ? 'clickable' : ''}`} onClick={() => handleCardClick(item)}>
-              <img src={item.imageUrl} alt={item.filename} loading="lazy" decoding="async" style={{ width: '100%', height: 'auto' }} />
+              <img
+                src={item.thumbUrl || item.imageUrl}
+                alt={item.filename}
+                loading="lazy"
+                decoding="async"
+                width={item.width}
+                height={item.height}
+                style={{
+                  width: '100%',
+                  height: 'auto',
+                  // 読み込みが終わるまではぼかしたプレースホルダーを表示する
+                  ...(item.lqip ? { backgroundImage: `url("${item.lqip}")`, backgroundSize: 'cover' } : {})
+                }}
+              />
               {studyMode ? (
                 isRevealed ? (
                   <>
@@ -118,6 +134,29 @@ const ListMode = memo(({
   studyMode
 }: ListModeProps) => {
   const [revealed, setRevealed] = useState<Set<string>>(new Set());
+  const [searchIndex, setSearchIndex] = useState<SearchIndex | null>(null);
+  const [componentIndex, setComponentIndex] = useState<ComponentIndex | null>(null);
+  const hasQuery = searchQuery.trim() !== '';
+
+  // 検索を始めたときに build_search_index.py / build_component_index.py の索引を読み込む
+  // （無ければ全ての行を調べる）
+  useEffect(() => {
+    if (!hasQuery) return;
+    let cancelled = false;
+    if (searchMode === 'reading' && !searchIndex) {
+      loadSearchIndex().then((index) => {
+        if (!cancelled && index) setSearchIndex(index);
+      });
+    } else if (searchMode === 'component' && !componentIndex) {
+      loadComponentIndex().then((index) => {
+        if (!cancelled && index) setComponentIndex(index);
+      });
+    }
+    return () => { cancelled = true; };
+  }, [hasQuery, searchMode, searchIndex, componentIndex]);
+
+  // 索引の行番号（mappings.csv の行の順）と items の位置の対応
+  const rowOf = useMemo(() => new Map(items.map((item, i) => [item, i])), [items]);
 
   const definedGenres = useMemo(() => [
     '動物',
@@ -151,14 +190,28 @@ const ListMode = memo(({
           return info.includes(selectedGenre);
         });
 
-    if (searchQuery.trim()) {
+    // 索引が読み込み済みで、このレベルの mappings.csv が読み込んだデータと同じ場合は索引で検索する
+    const levelKey = `level-${selectedLevel}`;
+    const dataVersion = getDataVersion(selectedLevel);
+    const isCurrent = (level?: { count: number; version: string }) =>
+      !!level && !!dataVersion && level.version === dataVersion && level.count === items.length;
+    if (searchQuery.trim() && searchMode === 'reading' && searchIndex
+        && isCurrent(searchIndex.levels[levelKey])) {
+      const rows = searchReadings(searchIndex, levelKey, searchQuery, ['okurigana']);
+      if (rows) filtered = filtered.filter(item => rows.has(rowOf.get(item) ?? -1));
+    } else if (searchQuery.trim() && searchMode === 'component' && componentIndex
+        && isCurrent(componentIndex.levels[levelKey])) {
+      const rows = searchComponents(componentIndex, levelKey, searchQuery);
+      if (rows) filtered = filtered.filter(item => rows.has(rowOf.get(item) ?? -1));
+    } else if (searchQuery.trim()) {
       const query = searchQuery.trim().toLowerCase();
       filtered = filtered.filter(item => {
         if (searchMode === 'reading') {
+          // 索引（build_search_index.py の reading_keys）と同じく、送り仮名の区切りごとに正規化して部分一致を調べる
           const okuriganaMatches = item.reading.match(/'([^']+)'/g);
           if (!okuriganaMatches) return false;
-          const okuriganaText = okuriganaMatches.map(m => m.replace(/'/g, '')).join('');
-          return okuriganaText.toLowerCase().includes(query);
+          const folded = foldReading(query);
+          return okuriganaMatches.some(m => foldReading(m.replace(/'/g, '')).includes(folded));
         } else {
           const components = item.components || '';
           const componentList = components.split(/\s+/).filter(c => c).map(c => c.trim().toLowerCase());
@@ -168,7 +221,7 @@ const ListMode = memo(({
     }
 
     return filtered;
-  }, [items, selectedGenre, searchQuery, searchMode, definedGenres]);
+  }, [items, selectedGenre, searchQuery, searchMode, definedGenres, searchIndex, componentIndex, selectedLevel, rowOf]);
 
   const handleCardClick = useCallback((it: Item) => {
     if (!studyMode) return;
@@ -1,8 +1,9 @@
 import { useState, useEffect, useRef, memo } from 'react';
 import { type Item, type QuizFormat, type Level } from '../types/kanji';
-import { formatReadingWithOkurigana, extractReadingCore, readingWithoutQuotes } from '../utils/kanjiUtils';
+import { formatReadingWithOkurigana, extractReadingCore, readingWithoutQuotes, acceptedReadings } from '../utils/kanjiUtils';
 import { useGamification } from '../contexts/GamificationContext';
 import shuffleArray from '../lib/shuffle';
+import { loadDistractors } from '../utils/dataLoader';
 
 interface QuizModeProps {
   items: Item[];
@@ -65,6 +66,8 @@ const QuizMode = memo(({ items, selectedLevel, onBack, onReady, endless = false
   const [choices, setChoices] = useState<string[]>([]);
   const [correctChoiceIndex, setCorrectChoiceIndex] = useState<number>(-1);
   const [isProcessing, setIsProcessing] = useState(false); // 正誤判定中フラグ
+  // build_distractors.py の読みの似た誤答の表（null なら無作為に選ぶ、undefined は読み込み中）
+  const [distractors, setDistractors] = useState<Record<string, string[]> | null | undefined>(undefined);
   // デバッグ用: 入手したXPの詳細情報
   const [_xpDebugInfo, setXpDebugInfo] = useState<{
     baseXp: number;
@@ -143,6 +146,17 @@ const QuizMode = memo(({ items, selectedLevel, onBack, onReady, endless = false
     }
   }, [quizItems, onReady]);
 
+  // 四択の誤答の表を読み込む（エンドレスは入力形式のみのため不要）
+  useEffect(() => {
+    setDistractors(endless ? null : undefined);
+    if (endless) return;
+    let cancelled = false;
+    loadDistractors(selectedLevel).then((table) => {
+      if (!cancelled) setDistractors(table);
+    });
+    return () => { cancelled = true; };
+  }, [selectedLevel, endless]);
+
   // questionStartTimeはシンプル化のため削除（タイムボーナスなし）
 
   useEffect(() => {
@@ -154,9 +168,13 @@ const QuizMode = memo(({ items, selectedLevel, onBack, onReady, endless = false
 
   const generateChoices = (correctItem: Item, allItems: Item[]): { choices: string[], correctIndex: number } => {
     const correct = correctItem.reading;
+    const correctCore = correctItem.readingCore ?? extractReadingCore(correct);
+    
+    // 読みの似た誤答の表にあればそこから3つ選ぶ
+    const similar = (distractors?.[correct] ?? []).filter(choice => choice !== correctCore);
+    const wrongChoices: string[] = similar.length >= 3 ? shuffleArray(similar).slice(0, 3) : [];
     
     // 最適化: filter を使わずに直接ランダムサンプリング（O(n) → O(1)相当）
-    const wrongChoices: string[] = [];
     const usedIndices = new Set<number>();
     const maxAttempts = Math.min(allItems.length * 2, 100); // 無限ループ防止
     let attempts = 0;
@@ -167,7 +185,7 @@ const QuizMode = memo(({ items, selectedLevel, onBack, onReady, endless = false
       
       if (!usedIndices.has(randomIndex) && allItems[randomIndex].reading !== correct) {
         usedIndices.add(randomIndex);
-        wrongChoices.push(allItems[randomIndex].reading);
+        wrongChoices.push(allItems[randomIndex].readingCore ?? extractReadingCore(allItems[randomIndex].reading));
       }
     }
     
@@ -177,9 +195,9 @@ const QuizMode = memo(({ items, selectedLevel, onBack, onReady, endless = false
     
     for (let i = 0; i < 4; i++) {
       if (i === correctIndex) {
-        choicesArray.push(extractReadingCore(correct));
+        choicesArray.push(correctCore);
       } else {
-        choicesArray.push(extractReadingCore(wrongChoices[wrongIndex] || ''));
+        choicesArray.push(wrongChoices[wrongIndex] || '');
         wrongIndex++;
       }
     }
@@ -188,13 +206,15 @@ const QuizMode = memo(({ items, selectedLevel, onBack, onReady, endless = false
   };
 
   useEffect(() => {
+    // 誤答の表を読み込むまで待つ（読み込んだ後に表示中の選択肢を作り直さないように）
+    if (distractors === undefined) return;
     if (quizFormat === 'choice' && quizItems.length > 0 && quizItems[currentIndex]) {
       // 選択肢生成を即座に実行（シンプル化）
       const result = generateChoices(quizItems[currentIndex], quizItems);
       setChoices(result.choices);
       setCorrectChoiceIndex(result.correctIndex);
     }
-  }, [quizFormat, quizItems, currentIndex]);
+  }, [quizFormat, quizItems, currentIndex, distractors]);
 
   const checkAnswer = () => {
     if (!quizItems[currentIndex]) return;
@@ -225,14 +245,8 @@ const QuizMode = memo(({ items, selectedLevel, onBack, onReady, endless = false
         });
       }
     } else {
-      const correctReading = quizItems[currentIndex].reading;
-      const correctOptions = correctReading.split('、');
-      
-      correct = correctOptions.some(option => {
-        const core = extractReadingCore(option);
-        const full = readingWithoutQuotes(option);
-        return userInput === core || userInput === full;
-      });
+      const item = quizItems[currentIndex];
+      correct = (item.acceptedReadings ?? acceptedReadings(item.reading)).includes(userInput);
     }
     
     if (correct) {
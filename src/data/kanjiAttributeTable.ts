@@ -0,0 +1,21 @@
+// generate_kanji_attributes.py が生成するファイル。直接編集しないこと。
+// 規則と違う属性を持つ特別な漢字（文字コード順）の属性を1字 4 バイトに詰めた表
+// （読み出しは kanjiAttributes.ts の readKanjiTable。表に無い漢字は getDefaultKanjiAttributes の規則で求める）
+
+export const KANJI_TABLE_VERSION = '1ac02c3ae4efe9a9';
+export const KANJI_TABLE_RECORD_SIZE = 4;
+export const KANJI_TABLE_RARITIES = ['common', 'rare', 'epic', 'legendary'] as const;
+export const KANJI_TABLE_ELEMENTS = ['fire', 'water', 'earth', 'wind', 'light', 'dark'] as const;
+export const KANJI_TABLE_SKILLS = ['xp_boost', 'coin_boost', 'combo_bonus', 'streak_power', 'revival', 'lucky_draw', 'synergy', 'multi_answer', 'time_freeze', 'shield'] as const;
+
+// 52字
+export const KANJI_TABLE_CHARS = [
+  '仏光刀剣力土地夜夢天山岩嵐川帝弓心悪愛星森槍水氷泉海滝火炎焔煉王皇盾矢神空竜翔聖輝鎧闇雨雪雲雷風鬼魂魔龍',
+].join('');
+
+// base64（208 バイト）
+export const KANJI_TABLE_DATA = [
+  'EoQPEBJ1Eg8BYw8HAWMOCABACQQIWQcHCnEMEhWDEQsRZQwMEnASDghJBgYJeQkMDnIQDgREBQcXkhgWDEcIBRBEBQYWcxMMEoQQ',
+  'ERKAFgwIVAcIAWINCQVhCA8GiAwSBXEKEQVRCBAGgQ4WAWAPCAJwFAoDkBwPA6AeEhJyEBATkhcXCWkHDQxDCQUTpRwcDWcMCgOi',
+  'GRQPlxYUE6QUFBOlGRkKiQoUFoYTCwRBBQgFaAkNDEcHBhFzEAoMRwgGFoIUDhVkCwsXphsSA6IZFA==',
+].join('');
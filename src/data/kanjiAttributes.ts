@@ -1,5 +1,15 @@
 // 漢字カードの拡張属性データ
-// レアリティ、属性、スキルをCSV形式で定義
+// 特別な漢字の属性は generate_kanji_attributes.py が生成する kanjiAttributeTable.ts の表から読み、
+// それ以外の漢字は文字コードから規則で求める
+
+import {
+  KANJI_TABLE_CHARS,
+  KANJI_TABLE_DATA,
+  KANJI_TABLE_RECORD_SIZE,
+  KANJI_TABLE_RARITIES,
+  KANJI_TABLE_ELEMENTS,
+  KANJI_TABLE_SKILLS,
+} from './kanjiAttributeTable';
 
 export type CardRarity = 'common' | 'rare' | 'epic' | 'legendary';
 export type ElementType = 'fire' | 'water' | 'earth' | 'wind' | 'light' | 'dark';
@@ -49,76 +59,51 @@ export const SKILL_INFO: Record<SkillType, { name: string; icon: string; descrip
   shield: { name: 'シールド', icon: '🛡️', description: 'ミスを無効化' }
 };
 
-// 漢字属性データ（一部抜粋 - 全2136字の初期値）
-// kanji,rarity,element,skill,power,xpBoost,coinBoost
-const KANJI_ATTRIBUTES_CSV = `龍,legendary,fire,combo_bonus,10,25,20
-竜,legendary,fire,combo_bonus,10,25,20
-火,rare,fire,xp_boost,6,15,8
-水,rare,water,coin_boost,6,8,15
-土,common,earth,shield,5,7,7
-風,common,wind,multi_answer,4,8,6
-光,epic,light,lucky_draw,7,18,15
-雷,rare,light,streak_power,7,16,10
-海,rare,water,coin_boost,5,8,16
-森,common,earth,revival,5,7,8
-空,rare,wind,multi_answer,6,12,10
-星,epic,light,xp_boost,8,22,12
-夜,rare,dark,streak_power,8,17,11
-炎,epic,fire,xp_boost,7,20,10
-氷,epic,water,time_freeze,8,12,18
-岩,rare,earth,shield,7,9,12
-嵐,epic,wind,combo_bonus,7,16,14
-聖,legendary,light,revival,10,20,20
-闇,epic,dark,synergy,8,19,11
-焔,legendary,fire,xp_boost,9,28,15
-泉,rare,water,coin_boost,7,10,17
-煉,legendary,fire,xp_boost,10,30,18
-滝,epic,water,coin_boost,8,14,22
-翔,legendary,wind,multi_answer,9,22,20
-輝,legendary,light,lucky_draw,10,25,25
-魔,legendary,dark,synergy,10,27,18
-天,epic,light,xp_boost,7,18,14
-地,epic,earth,coin_boost,7,12,18
-山,common,earth,shield,4,6,6
-川,common,water,revival,4,5,7
-雨,common,water,coin_boost,4,5,8
-雪,rare,water,time_freeze,6,9,13
-雲,common,wind,multi_answer,4,7,6
-王,epic,light,combo_bonus,7,16,16
-皇,legendary,light,combo_bonus,9,23,23
-帝,legendary,dark,combo_bonus,9,24,22
-神,legendary,light,lucky_draw,10,28,28
-仏,epic,light,revival,8,15,16
-悪,epic,dark,streak_power,7,19,12
-鬼,epic,dark,combo_bonus,8,20,14
-魂,rare,dark,revival,6,11,11
-夢,rare,light,lucky_draw,6,12,12
-愛,epic,light,revival,8,16,17
-心,common,light,revival,4,5,6
-力,common,fire,xp_boost,4,9,4
-剣,rare,fire,streak_power,6,14,8
-刀,rare,fire,streak_power,6,15,7
-槍,rare,fire,combo_bonus,6,13,9
-弓,common,wind,multi_answer,4,8,5
-矢,common,wind,streak_power,4,9,5
-盾,rare,earth,shield,6,7,13
-鎧,epic,earth,shield,8,10,20`;
-
-// CSVをパースして属性マップを作成
-export const KANJI_ATTRIBUTES_MAP = new Map<string, KanjiAttributes>();
-
-KANJI_ATTRIBUTES_CSV.split('\n').forEach(line => {
-  const [kanji, rarity, element, skill, power, xpBoost, coinBoost] = line.split(',');
-  KANJI_ATTRIBUTES_MAP.set(kanji, {
+// kanjiAttributeTable.ts の表（base64）は最初に使うときに1度だけ展開する
+let kanjiTableBytes: Uint8Array | null = null;
+
+function getKanjiTableBytes(): Uint8Array {
+  if (!kanjiTableBytes) {
+    const binary = atob(KANJI_TABLE_DATA);
+    kanjiTableBytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) {
+      kanjiTableBytes[i] = binary.charCodeAt(i);
+    }
+  }
+  return kanjiTableBytes;
+}
+
+// 文字コード順の KANJI_TABLE_CHARS を二分探索し、表の番号を返す（無ければ -1）
+export function findKanjiTableIndex(kanji: string): number {
+  if (kanji.length !== 1) return -1;
+  const code = kanji.charCodeAt(0);
+  let lo = 0;
+  let hi = KANJI_TABLE_CHARS.length - 1;
+  while (lo <= hi) {
+    const mid = (lo + hi) >> 1;
+    const c = KANJI_TABLE_CHARS.charCodeAt(mid);
+    if (c === code) return mid;
+    if (c < code) lo = mid + 1;
+    else hi = mid - 1;
+  }
+  return -1;
+}
+
+// 表の index 番目の漢字の属性を読み出す（generate_kanji_attributes.py の pack_table の逆）
+function readKanjiTable(index: number, kanji: string): KanjiAttributes {
+  const bytes = getKanjiTableBytes();
+  const offset = index * KANJI_TABLE_RECORD_SIZE;
+  const [b0, b1, b2, b3] = bytes.subarray(offset, offset + KANJI_TABLE_RECORD_SIZE);
+  return {
     kanji,
-    rarity: rarity as CardRarity,
-    element: element as ElementType,
-    skill: skill as SkillType,
-    power: parseInt(power),
-    xpBoost: parseInt(xpBoost),
-    coinBoost: parseInt(coinBoost)
-  });
-});
+    rarity: KANJI_TABLE_RARITIES[b0 & 0x3],
+    element: KANJI_TABLE_ELEMENTS[b0 >> 2],
+    skill: KANJI_TABLE_SKILLS[b1 & 0xf],
+    power: b1 >> 4,
+    xpBoost: b2,
+    coinBoost: b3,
+  };
+}
 
 // デフォルト属性を生成（データにない漢字用）
 export function getDefaultKanjiAttributes(kanji: string): KanjiAttributes {
@@ -194,9 +179,10 @@ export function getDefaultKanjiAttributes(kanji: string): KanjiAttributes {
   return { kanji, rarity, element, skill, power, xpBoost, coinBoost };
 }
 
-// 漢字の属性を取得（マップにあればそれを、なければデフォルトを生成）
+// 漢字の属性を取得（表にあればそれを、なければデフォルトを生成）
 export function getKanjiAttributes(kanji: string): KanjiAttributes {
-  return KANJI_ATTRIBUTES_MAP.get(kanji) || getDefaultKanjiAttributes(kanji);
+  const index = findKanjiTableIndex(kanji);
+  return index >= 0 ? readKanjiTable(index, kanji) : getDefaultKanjiAttributes(kanji);
 }
 
 // デッキのシナジー効果を計算
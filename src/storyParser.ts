@@ -1,3 +1,5 @@
+import { fetchAsset, fetchJsonAsset } from './utils/assetUrl';
+
 // story.txtファイルをパースしてビジュアルノベル用のデータに変換
 export interface DialogueLine {
   speaker?: string | string[];
@@ -96,33 +98,121 @@ export function parseStory(storyText: string): Scene[] {
   return scenes;
 }
 
-// story.txtを読み込む
+// compile_story.py の FORMAT_VERSION と合わせる
+const STORY_MANIFEST_FORMAT = 1;
+
+export interface ChapterAsset {
+  url: string;
+  bytes: number;
+}
+
+export interface StoryManifestChapter {
+  title: string;
+  file: string;
+  dialogues: number;
+  bytes: number;
+  prefetchBytes: number;
+}
+
+export interface StoryManifest {
+  format: number;
+  version: string;
+  title: string;
+  chapters: StoryManifestChapter[];
+}
+
+export interface StoryChapter extends Scene {
+  prefetch: ChapterAsset[];
+}
+
+// story.json の章を Scene にする
+function toScene(c: any): Scene {
+  return {
+    title: c.title || '',
+    dialogues: (c.dialogues || []).map((d: any) => {
+      let speaker = d.speaker;
+      // normalize combined speaker strings like "彁太郎" into ["彁","太郎"]
+      if (!Array.isArray(speaker) && typeof speaker === 'string') {
+        const s: string = speaker;
+        if (s.includes('彁') && s.includes('太郎')) {
+          speaker = ['彁', '太郎'];
+        }
+      }
+      return { 
+        speaker, 
+        text: d.text,
+        background: d.background,
+        characters: d.characters,
+        voice: d.voice
+      };
+    })
+  };
+}
+
+let manifestPromise: Promise<StoryManifest | null> | null = null;
+const chapterPromises = new Map<number, Promise<StoryChapter | null>>();
+
+// compile_story.py が書き出した章の一覧を読み込む。無い・形式が違う場合は null
+export function loadStoryManifest(): Promise<StoryManifest | null> {
+  if (!manifestPromise) {
+    manifestPromise = fetchJsonAsset('/story/manifest.json')
+      .then((manifest) => (manifest && manifest.format === STORY_MANIFEST_FORMAT ? (manifest as StoryManifest) : null))
+      .catch(() => null);
+  }
+  return manifestPromise;
+}
+
+// 章1つ分のファイル（台詞と先読みする資産の一覧）を読み込む
+export function loadChapter(index: number): Promise<StoryChapter | null> {
+  let promise = chapterPromises.get(index);
+  if (!promise) {
+    promise = loadStoryManifest().then(async (manifest) => {
+      const entry = manifest?.chapters[index];
+      if (!entry) return null;
+      const res = await fetchAsset(entry.file);
+      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      const c = await res.json();
+      return { ...toScene(c), prefetch: c.prefetch || [] };
+    }).catch((error) => {
+      console.error('Failed to load chapter:', index, error);
+      chapterPromises.delete(index);
+      return null;
+    });
+    chapterPromises.set(index, promise);
+  }
+  return promise;
+}
+
+// 章の一覧（タイトルだけ）を返す。章選択画面用
+export async function loadChapterTitles(): Promise<Scene[]> {
+  const manifest = await loadStoryManifest();
+  if (!manifest) return loadStory();
+  return manifest.chapters.map((c) => ({ title: c.title, dialogues: [] }));
+}
+
+// 次の章などの資産を、表示を妨げないようにバックグラウンドで先読みする
+const prefetchedUrls = new Set<string>();
+export async function prefetchChapterAssets(index: number): Promise<void> {
+  const chapter = await loadChapter(index);
+  if (!chapter) return;
+  for (const asset of chapter.prefetch) {
+    if (prefetchedUrls.has(asset.url)) continue;
+    prefetchedUrls.add(asset.url);
+    const link = document.createElement('link');
+    link.rel = 'prefetch';
+    link.href = asset.url;
+    document.head.appendChild(link);
+  }
+}
+
+// story.json（全ての章を含む）を読み込む。章ごとのファイルが無い場合の読み込み先
 export async function loadStory(): Promise<Scene[]> {
   try {
-    const response = await fetch('/story.json');
+    const response = await fetchAsset('/story.json');
     const book = await response.json();
     // book.chapters の形式を Scene[] にマップ
     if (!book || !book.chapters) return [];
-    const scenes: Scene[] = book.chapters.map((c: any) => ({
-      title: c.title || '',
-      dialogues: (c.dialogues || []).map((d: any) => {
-        let speaker = d.speaker;
-        // normalize combined speaker strings like "彁太郎" into ["彁","太郎"]
-        if (!Array.isArray(speaker) && typeof speaker === 'string') {
-          const s: string = speaker;
-          if (s.includes('彁') && s.includes('太郎')) {
-            speaker = ['彁', '太郎'];
-          }
-        }
-        return { 
-          speaker, 
-          text: d.text,
-          background: d.background,
-          characters: d.characters,
-          voice: d.voice
-        };
-      })
-    }));
+    const scenes: Scene[] = book.chapters.map(toScene);
     return scenes;
   } catch (error) {
     console.error('Failed to load story.json:', error);
@@ -1,8 +1,16 @@
 export type Item = {
   filename: string;
   reading: string;
+  // level.json を読み込んだときに求めておく送り仮名なしの読みと正解の一覧
+  readingCore?: string;
+  acceptedReadings?: string[];
   meaning?: string;
   imageUrl: string;
+  // build_thumbnails.py で作った一覧用のサムネイル・プレースホルダーと画像の大きさ
+  thumbUrl?: string;
+  lqip?: string;
+  width?: number;
+  height?: number;
   additionalInfo?: string;
   components?: string;
   kanji?: string;
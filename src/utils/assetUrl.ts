@@ -0,0 +1,35 @@
+// precompress_assets.py がビルド時に書き出す asset-map.json を使い、
+// CSV / JSON を内容のハッシュ入りの URL（長期間キャッシュできる）で取得する。
+// asset-map.json が無い場合（開発サーバーなど）は元の URL をそのまま使う。
+
+let assetMapPromise: Promise<Record<string, string>> | null = null;
+
+function loadAssetMap(): Promise<Record<string, string>> {
+  if (!assetMapPromise) {
+    assetMapPromise = fetch('/asset-map.json', { cache: 'no-cache' })
+      .then((res) => {
+        // 存在しないファイルでも開発サーバーは index.html を返すため Content-Type も確認する
+        if (!res.ok || !(res.headers.get('content-type') || '').includes('json')) return {};
+        return res.json();
+      })
+      .catch(() => ({}));
+  }
+  return assetMapPromise;
+}
+
+export async function assetUrl(path: string): Promise<string> {
+  const map = await loadAssetMap();
+  return map[path] || path;
+}
+
+export async function fetchAsset(path: string, init?: RequestInit): Promise<Response> {
+  return fetch(await assetUrl(path), init);
+}
+
+// ビルド時に生成する JSON を読み込む。無い場合は null（通信のエラーは呼び出し側で扱う）
+export async function fetchJsonAsset(path: string, init?: RequestInit): Promise<any | null> {
+  const res = await fetchAsset(path, init);
+  // 存在しないファイルでも開発サーバーは index.html を返すため Content-Type も確認する
+  if (!res.ok || !(res.headers.get('content-type') || '').includes('json')) return null;
+  return res.json();
+}
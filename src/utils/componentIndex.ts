@@ -0,0 +1,74 @@
+// build_component_index.py が書き出す component-index.json（構成要素 → 行の転置索引）で構成要素を検索する。
+// 索引が無い・レベルの mappings.csv が読み込んだデータと違う場合、呼び出し側で従来どおり全ての行を調べる。
+
+import { fetchJsonAsset } from './assetUrl';
+
+// build_component_index.py の FORMAT_VERSION と合わせる
+export const COMPONENT_INDEX_FORMAT = 2;
+const COMPONENT_INDEX_URL = '/kanji/component-index.json';
+
+export interface ComponentIndex {
+  version: string;
+  // version は mappings.csv のハッシュ（dataLoader.ts の getDataVersion と比べる）
+  levels: Record<string, { offset: number; count: number; version: string }>;
+  // [行の通し番号, 個数, 行の通し番号, 個数, ...]
+  components: Record<string, number[]>;
+  // 部分文字列 → それを含む構成要素（構成要素自身だけの場合は無い）
+  substrings: Record<string, string[]>;
+}
+
+let componentIndexPromise: Promise<ComponentIndex | null> | null = null;
+
+export function loadComponentIndex(): Promise<ComponentIndex | null> {
+  if (!componentIndexPromise) {
+    componentIndexPromise = fetchJsonAsset(COMPONENT_INDEX_URL)
+      .then((data) => (data && data.format === COMPONENT_INDEX_FORMAT ? data as ComponentIndex : null))
+      .catch(() => null);
+  }
+  return componentIndexPromise;
+}
+
+// build_component_index.py の split_components と同じ（全角・半角の空白で区切り、NFKC・小文字化）
+export function splitComponents(text: string): string[] {
+  return text.normalize('NFKC').toLowerCase().split(/\s+/).filter((c) => c);
+}
+
+// 構成要素に検索語を全て含む（同じ語を繰り返した場合はその個数以上含む）行を、レベル内の行番号の集合で返す
+export function searchComponents(index: ComponentIndex, level: string, query: string): Set<number> | null {
+  const range = index.levels[level];
+  if (!range) return null;
+  const terms = new Map<string, number>();
+  for (const term of splitComponents(query)) terms.set(term, (terms.get(term) ?? 0) + 1);
+  if (terms.size === 0) return new Set();
+
+  const matches: Set<number>[] = [];
+  for (const [term, need] of terms) {
+    // 語を含む構成要素（部分一致）の一覧を、このレベルの行だけ足し合わせる。
+    // 一覧は substrings か完全一致で引くため、全ての構成要素は調べない
+    const counts = new Map<number, number>();
+    const matching = Object.hasOwn(index.substrings, term)
+      ? index.substrings[term]
+      : Object.hasOwn(index.components, term) ? [term] : [];
+    for (const component of matching) {
+      const flat = index.components[component];
+      for (let i = 0; i < flat.length; i += 2) {
+        const row = flat[i] - range.offset;
+        if (row >= 0 && row < range.count) counts.set(row, (counts.get(row) ?? 0) + flat[i + 1]);
+      }
+    }
+    const rows = new Set<number>();
+    counts.forEach((count, row) => {
+      if (count >= need) rows.add(row);
+    });
+    matches.push(rows);
+  }
+
+  // 候補の少ない語から絞り込む
+  matches.sort((a, b) => a.size - b.size);
+  let result = matches[0];
+  for (const rows of matches.slice(1)) {
+    result = new Set([...result].filter((row) => rows.has(row)));
+    if (result.size === 0) break;
+  }
+  return result;
+}
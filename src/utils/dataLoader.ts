@@ -1,5 +1,78 @@
 import { type Item, type Level } from '../types/kanji';
 import { parseCSVLine } from './kanjiUtils';
+import { fetchAsset, fetchJsonAsset } from './assetUrl';
+
+// compile_levels.py の FORMAT_VERSION と合わせる
+const COMPILED_FORMAT = 2;
+// build_distractors.py の FORMAT_VERSION と合わせる
+const DISTRACTOR_FORMAT = 2;
+
+type CompiledLevel = {
+  format: number;
+  version: string;
+  count: number;
+  columns: Record<string, unknown[]>;
+};
+
+// 読み込んだレベルの mappings.csv のハッシュ（build_*_index.py の索引の levels の version と比べる）
+const dataVersions = new Map<Level, string>();
+
+export function getDataVersion(level: Level): string | undefined {
+  return dataVersions.get(level);
+}
+
+// mappings_io.py の mappings_version と同じ（内容の SHA-256 の先頭 16 桁）。計算できない環境では undefined
+async function mappingsVersion(data: ArrayBuffer): Promise<string | undefined> {
+  if (typeof crypto === 'undefined' || !crypto.subtle) return undefined;
+  const digest = new Uint8Array(await crypto.subtle.digest('SHA-256', data));
+  return Array.from(digest.subarray(0, 8), (b) => b.toString(16).padStart(2, '0')).join('');
+}
+
+// mappings.csv の画像のパスを URL にする（/ で始まるパスはそのまま）
+function levelUrl(levelDir: string, path: string): string {
+  return path.startsWith('/') ? path : `${levelDir}/${path}`;
+}
+
+// compile_levels.py がビルド時に dist に書き出した level.json を読み込む。無い・形式が違う場合は null
+async function loadCompiledLevel(levelDir: string, isExtra: boolean): Promise<{ items: Item[]; version: string } | null> {
+  try {
+    const data = (await fetchJsonAsset(`${levelDir}/level.json`)) as CompiledLevel | null;
+    if (!data || data.format !== COMPILED_FORMAT || !data.columns) {
+      return null;
+    }
+
+    const names = Object.keys(data.columns);
+    const items: Item[] = new Array(data.count);
+    for (let i = 0; i < data.count; i++) {
+      const item: any = { filename: '', reading: '', imageUrl: '' };
+      for (const name of names) {
+        const value = data.columns[name][i];
+        // readingCore は送り仮名だけの読みでは空文字列になる（null は読みと同じ）
+        if (value !== null && (value !== '' || name === 'readingCore')) {
+          item[name] = value;
+        }
+      }
+      // 他の列の値をつなぐだけで求められる列は level.json に無いため、ここで求める
+      if (isExtra) {
+        item.questionType = item.answer2 ? 'correction' : 'reading';
+        if (!item.answer2) item.reading = item.answer || '';
+      } else {
+        item.imageUrl = levelUrl(levelDir, item.webp || item.filename);
+        if (item.thumb) item.thumbUrl = levelUrl(levelDir, item.thumb);
+        // 送り仮名が無い行は readingCore・acceptedReadings が省かれている
+        item.readingCore ??= item.reading;
+        item.acceptedReadings ??= [item.readingCore];
+      }
+      delete item.webp;
+      delete item.thumb;
+      items[i] = item as Item;
+    }
+    return { items, version: data.version };
+  } catch (e) {
+    console.warn('level.json を読み込めないため CSV を使います', e);
+    return null;
+  }
+}
 
 export async function loadKanjiData(selectedLevel: Level): Promise<Item[]> {
   // エクストラは指定期間のみ利用可能にする
@@ -21,15 +94,26 @@ export async function loadKanjiData(selectedLevel: Level): Promise<Item[]> {
     throw new Error('準備中です');
   }
 
+  const levelDir = selectedLevel === 'extra' ? `/kanji/extra` : `/kanji/level-${selectedLevel}`;
+
+  // 変換済みの level.json があれば CSV の解析を省く
+  const compiled = await loadCompiledLevel(levelDir, selectedLevel === 'extra');
+  if (compiled) {
+    dataVersions.set(selectedLevel, compiled.version);
+    return compiled.items;
+  }
+
   // CSV を fetch
-  const csvPath = selectedLevel === 'extra' 
-    ? `/kanji/extra/mappings.csv`
-    : `/kanji/level-${selectedLevel}/mappings.csv`;
-  const res = await fetch(csvPath);
+  const csvPath = `${levelDir}/mappings.csv`;
+  const res = await fetchAsset(csvPath);
   if (!res.ok) {
     throw new Error(`CSV取得失敗: ${res.status}`);
   }
-  const text = await res.text();
+  const bytes = await res.arrayBuffer();
+  const version = await mappingsVersion(bytes);
+  if (version) dataVersions.set(selectedLevel, version);
+  else dataVersions.delete(selectedLevel);
+  const text = new TextDecoder().decode(bytes);
   const lines = text.split(/\r?\n/).filter(Boolean);
   
   // ヘッダー行を解析
@@ -82,13 +166,20 @@ export async function loadKanjiData(selectedLevel: Level): Promise<Item[]> {
     mapped = data.map(d => {
       const fname = d[filenameField];
       const kanjiChar = kanjiField ? d[kanjiField] : null;
-      const imageUrl = fname?.startsWith('/') ? fname : `/kanji/level-${selectedLevel}/${fname}`;
+      // optimize_images.py で変換済みなら WebP を使う（無ければ元の画像）
+      const imagePath = d.webp || fname;
+      const imageUrl = imagePath?.startsWith('/') ? imagePath : `/kanji/level-${selectedLevel}/${imagePath}`;
+      const thumbUrl = d.thumb ? `/kanji/level-${selectedLevel}/${d.thumb}` : undefined;
       
       return {
         filename: fname || kanjiChar || '',
         reading: d.reading || d['reading'] || '',
         meaning: d.meaning,
         imageUrl,
+        thumbUrl,
+        lqip: d.lqip || undefined,
+        width: d.width ? Number(d.width) : undefined,
+        height: d.height ? Number(d.height) : undefined,
         kanji: kanjiChar || null,
         additionalInfo: d.additional_info || d['additional_info'] || '',
         components: d.components || d['components'] || '',
@@ -98,3 +189,23 @@ export async function loadKanjiData(selectedLevel: Level): Promise<Item[]> {
   
   return mapped;
 }
+
+// build_distractors.py が書き出した四択の誤答の表（読み → 読みの似た選択肢）を読み込む。
+// 無い・形式が違う・読み込んだ mappings.csv と version が一致しない場合は null
+export async function loadDistractors(selectedLevel: Level): Promise<Record<string, string[]> | null> {
+  if (selectedLevel === 'extra') return null;
+  try {
+    const data = await fetchJsonAsset(`/kanji/level-${selectedLevel}/distractors.json`);
+    if (!data || data.format !== DISTRACTOR_FORMAT || !data.distractors) {
+      return null;
+    }
+    const dataVersion = getDataVersion(selectedLevel);
+    if (!dataVersion || data.version !== dataVersion) {
+      return null;
+    }
+    return data.distractors as Record<string, string[]>;
+  } catch (e) {
+    console.warn('distractors.json を読み込めないため選択肢を無作為に選びます', e);
+    return null;
+  }
+}
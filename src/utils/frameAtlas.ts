@@ -0,0 +1,89 @@
+// pack_frames.py が書き出すアトラス（atlas.json + atlas-N.webp）で連番のアニメーションを再生する。
+// 差分のフレームは前のフレームに重ねて描くため、フレームは必ず 0 から順に描く。
+
+import { fetchJsonAsset } from './assetUrl';
+
+// pack_frames.py の FORMAT_VERSION と合わせる
+export const FRAME_ATLAS_FORMAT = 1;
+
+export interface AtlasFrame {
+  duration: number;
+  key: boolean;
+  rect: [page: number, x: number, y: number, width: number, height: number];
+  x: number;
+  y: number;
+}
+
+export interface FrameAtlas {
+  version: string;
+  width: number;
+  height: number;
+  frames: AtlasFrame[];
+  images: HTMLImageElement[];
+}
+
+function loadImage(src: string): Promise<HTMLImageElement> {
+  return new Promise((resolve, reject) => {
+    const img = new Image();
+    img.onload = () => resolve(img);
+    img.onerror = () => reject(new Error(`画像を読み込めません: ${src}`));
+    img.src = src;
+  });
+}
+
+// atlas.json とアトラスの画像を読み込む。無い・形式が違う場合は null
+export async function loadFrameAtlas(url: string): Promise<FrameAtlas | null> {
+  try {
+    const data = await fetchJsonAsset(url);
+    if (!data || data.format !== FRAME_ATLAS_FORMAT || !Array.isArray(data.frames) || data.frames.length === 0) return null;
+    const images = await Promise.all((data.pages as string[]).map(loadImage));
+    return { version: data.version, width: data.width, height: data.height, frames: data.frames, images };
+  } catch (e) {
+    console.warn('フレームのアトラスを読み込めないため1枚ずつ読み込みます', e);
+    return null;
+  }
+}
+
+// 画面外のキャンバスにフレームを順に描き、表示用のキャンバスに写す
+export class FramePlayer {
+  readonly atlas: FrameAtlas;
+  private readonly canvas: HTMLCanvasElement;
+  private readonly ctx: CanvasRenderingContext2D;
+  index = -1;
+
+  constructor(atlas: FrameAtlas) {
+    this.atlas = atlas;
+    this.canvas = document.createElement('canvas');
+    this.canvas.width = atlas.width;
+    this.canvas.height = atlas.height;
+    this.ctx = this.canvas.getContext('2d')!;
+  }
+
+  // 現在のフレームの表示時間（ミリ秒）
+  get duration(): number {
+    return this.atlas.frames[Math.max(this.index, 0)].duration;
+  }
+
+  advance(): void {
+    this.index = (this.index + 1) % this.atlas.frames.length;
+    const frame = this.atlas.frames[this.index];
+    const [page, sx, sy, w, h] = frame.rect;
+    if (frame.key) {
+      this.ctx.clearRect(0, 0, this.atlas.width, this.atlas.height);
+    } else {
+      this.ctx.clearRect(frame.x, frame.y, w, h);
+    }
+    this.ctx.drawImage(this.atlas.images[page], sx, sy, w, h, frame.x, frame.y, w, h);
+  }
+
+  // 表示用のキャンバスに現在のフレームを写す（同じフレームは写し直さない）
+  copyTo(target: HTMLCanvasElement): void {
+    const frame = String(this.index);
+    if (target.dataset.frame === frame) return;
+    const ctx = target.getContext('2d');
+    if (!ctx) return;
+    ctx.clearRect(0, 0, target.width, target.height);
+    ctx.drawImage(this.canvas, 0, 0);
+    target.dataset.frame = frame;
+  }
+}
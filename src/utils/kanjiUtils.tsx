@@ -59,3 +59,16 @@ export function extractReadingCore(reading: string): string {
 export function readingWithoutQuotes(reading: string): string {
   return reading.replace(/'/g, '');
 }
+
+// 正解とする読みの一覧（「、」区切りの読みごとに、送り仮名なし・ありの両方）
+// compile_levels.py の accepted_readings と同じ
+export function acceptedReadings(reading: string): string[] {
+  const answers: string[] = [];
+  for (const rawOption of reading.split('、')) {
+    const option = rawOption.trim();
+    for (const answer of [extractReadingCore(option), readingWithoutQuotes(option)]) {
+      if (!answers.includes(answer)) answers.push(answer);
+    }
+  }
+  return answers;
+}
@@ -0,0 +1,63 @@
+import { type Level } from '../types/kanji';
+
+// 選んだレベルの画像を Service Worker (public/sw.js) にバックグラウンドで先読みさせる。
+// 先読みする画像の一覧は build_asset_manifest.py が書き出す asset-manifest.json の groups にあり、
+// 一覧用のサムネイル（level-N-thumbs）はレベルを選んだときに、全ての画像（level-N）は
+// 利用者が「画像を保存」を押したときだけ先読みする（通信量が大きいため）。
+// Service Worker が無い・まだ制御していない場合や、データセーバーが有効な場合は何もしない。
+// PRECACHE_TIMEOUT_MS までに Service Worker が答えない場合は null を返し、もう一度頼めるようにする
+// （キャッシュ済みの画像は取得し直さないため、続きから先読みされる）。
+
+export type PrecacheResult = { group: string; total: number; fetched: number };
+
+const PRECACHE_TIMEOUT_MS = 3 * 60 * 1000;
+
+const requested = new Map<string, Promise<PrecacheResult | null>>();
+
+function postPrecache(group: string): Promise<PrecacheResult | null> {
+  if (typeof navigator === 'undefined' || !('serviceWorker' in navigator)) return Promise.resolve(null);
+  const controller = navigator.serviceWorker.controller;
+  if (!controller) return Promise.resolve(null);
+  let promise = requested.get(group);
+  if (!promise) {
+    promise = new Promise<PrecacheResult | null>((resolve) => {
+      const finish = (result: PrecacheResult | null) => {
+        clearTimeout(timer);
+        navigator.serviceWorker.removeEventListener('message', onMessage);
+        // 答えが無い・失敗した場合は記録を消して、もう一度頼めるようにする
+        if (!result) requested.delete(group);
+        resolve(result);
+      };
+      const onMessage = (event: MessageEvent) => {
+        if (event.data?.type !== 'PRECACHE_DONE' || event.data.group !== group) return;
+        finish(event.data as PrecacheResult);
+      };
+      const timer = setTimeout(() => finish(null), PRECACHE_TIMEOUT_MS);
+      navigator.serviceWorker.addEventListener('message', onMessage);
+      try {
+        controller.postMessage({ type: 'PRECACHE', group });
+      } catch (e) {
+        // requested に入れた後に消すため、次のマイクロタスクで終える
+        queueMicrotask(() => finish(null));
+      }
+    });
+    requested.set(group, promise);
+  }
+  return promise;
+}
+
+export function canPrecache(): boolean {
+  return typeof navigator !== 'undefined' && 'serviceWorker' in navigator && !!navigator.serviceWorker.controller;
+}
+
+// レベルを選んだときに一覧用のサムネイルだけを先読みする
+export function precacheThumbnails(level: Level): void {
+  if (level === 'extra' || (navigator as any).connection?.saveData) return;
+  void postPrecache(`level-${level}-thumbs`);
+}
+
+// レベルの全ての画像を先読みする（オフラインでも問題モードを遊べるようにする）
+export function precacheLevel(level: Level): Promise<PrecacheResult | null> {
+  if (level === 'extra') return Promise.resolve(null);
+  return postPrecache(`level-${level}`);
+}
@@ -0,0 +1,77 @@
+// build_search_index.py が書き出す search-index.json（全レベルの読みの接尾辞配列）で読みを検索する。
+// 索引が無い・レベルの mappings.csv が読み込んだデータと違う場合、呼び出し側で従来どおり全ての行を調べる。
+
+import { fetchJsonAsset } from './assetUrl';
+
+// build_search_index.py の FORMAT_VERSION と合わせる
+export const SEARCH_INDEX_FORMAT = 2;
+const SEARCH_INDEX_URL = '/kanji/search-index.json';
+
+export type ReadingKind = 'full' | 'core' | 'okurigana';
+
+export interface SearchIndex {
+  version: string;
+  kinds: ReadingKind[];
+  // version は mappings.csv のハッシュ（dataLoader.ts の getDataVersion と比べる）
+  levels: Record<string, { offset: number; count: number; version: string }>;
+  keys: Array<[text: string, kind: number, items: number[]]>;
+  suffixes: number[];
+}
+
+let searchIndexPromise: Promise<SearchIndex | null> | null = null;
+
+export function loadSearchIndex(): Promise<SearchIndex | null> {
+  if (!searchIndexPromise) {
+    searchIndexPromise = fetchJsonAsset(SEARCH_INDEX_URL)
+      .then((data) => (data && data.format === SEARCH_INDEX_FORMAT ? data as SearchIndex : null))
+      .catch(() => null);
+  }
+  return searchIndexPromise;
+}
+
+// build_search_index.py の fold と同じ正規化（全角・半角の統一、カタカナ → ひらがな、小文字化）
+export function foldReading(text: string): string {
+  return Array.from(text.normalize('NFKC').trim().toLowerCase(), (c) => {
+    const code = c.charCodeAt(0);
+    return code >= 0x30a1 && code <= 0x30f6 ? String.fromCharCode(code - 0x60) : c;
+  }).join('');
+}
+
+function suffixAt(index: SearchIndex, i: number): string {
+  return index.keys[index.suffixes[i * 2]][0].slice(index.suffixes[i * 2 + 1]);
+}
+
+// 読みに query を含む（prefix なら query で始まる）行を、レベル内の行番号の集合で返す
+export function searchReadings(
+  index: SearchIndex,
+  level: string,
+  query: string,
+  kinds?: ReadingKind[],
+  prefix = false,
+): Set<number> | null {
+  const range = index.levels[level];
+  if (!range) return null;
+  const q = foldReading(query);
+  const rows = new Set<number>();
+  if (!q) return rows;
+  const kindIds = new Set((kinds ?? index.kinds).map((k) => index.kinds.indexOf(k)));
+
+  // query 以上になる最初の接尾辞を二分探索し、query で始まる間だけ進む
+  const total = index.suffixes.length / 2;
+  let lo = 0;
+  let hi = total;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (suffixAt(index, mid) < q) lo = mid + 1;
+    else hi = mid;
+  }
+  for (let i = lo; i < total; i++) {
+    if (!suffixAt(index, i).startsWith(q)) break;
+    const [, kind, items] = index.keys[index.suffixes[i * 2]];
+    if (!kindIds.has(kind) || (prefix && index.suffixes[i * 2 + 1] !== 0)) continue;
+    for (const n of items) {
+      if (n >= range.offset && n < range.offset + range.count) rows.add(n - range.offset);
+    }
+  }
+  return rows;
+}
@@ -1,9 +1,19 @@
 #!/usr/bin/env python3
+import argparse
+
 import requests
 from bs4 import BeautifulSoup
 
-url = "https://w.atwiki.jp/yuia_sk/pages/16.html"
-response = requests.get(url, timeout=10)
+from http_cache import add_cache_arguments, cache_from_args
+
+parser = argparse.ArgumentParser(description='ページのh3とその下の要素を表示します')
+parser.add_argument('url', nargs='?', default="https://w.atwiki.jp/yuia_sk/pages/16.html")
+add_cache_arguments(parser)
+args = parser.parse_args()
+
+url = args.url
+cache = cache_from_args(args)
+response = cache.get(url, timeout=10) if cache is not None else requests.get(url, timeout=10)
 response.encoding = response.apparent_encoding
 
 soup = BeautifulSoup(response.text, 'html.parser')
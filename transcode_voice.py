@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+ボイス（public/voice）を配信用に変換するスクリプト
+
+public/voice の MP3（444ファイル・約35MB, 160kbps）は書き出したそのままの状態で配信されており、
+台詞ごとに1ファイルずつ取得するため、モバイル回線では再生が始まるまでに時間がかかる。
+このスクリプトは story.json が参照しているボイスごとに ffmpeg で
+  - 先頭・末尾の無音を切り詰める
+  - ラウドネスを揃える（loudnorm, -16 LUFS）
+  - 音声向けの低ビットレート（モノラル）に変換する
+    mp3  : 24kHz 40kbps（既定。全てのブラウザで再生できる）
+    opus : 24kbps Ogg Opus（さらに小さいが、古い Safari では再生できない）
+の処理をして public/voice/<出力先>/ に書き出し、story.json の voice の参照を書き換える。
+
+元のファイルの内容のハッシュと設定を .voice_store/<出力先>/manifest.json に記録し
+（public/ の外に置き、配信しない）、変わっていないファイルは変換し直さない。story.json の参照が書き換え済みでも、
+記録から元のファイルをたどって変換し直せる。
+--move-sources を付けると、変換が終わった元のファイルを voice_src/ に移して配信対象から外す
+（voice_src/ と .voice_store/ は .gitignore に入っている）。
+
+ffmpeg（libmp3lame / libopus 付き）が必要。
+
+使用方法:
+    python transcode_voice.py [--codec mp3|opus] [--jobs N] [--report report.json] [--move-sources]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from atomic_io import atomic_open, atomic_write_text
+from merge_level import file_sha256
+from pipeline_stats import STATS, add_stats_arguments, finish_stats, log, start_stats
+
+PUBLIC_DIR = Path('public')
+SOURCE_DIR = Path('voice_src')
+STORE_DIR = Path('.voice_store')
+MANIFEST_NAME = 'manifest.json'
+# 以前の版が出力先（public/ の中）に書いていた記録。見つかれば読み込んで STORE_DIR に移す
+LEGACY_MANIFEST_NAME = '.voice_manifest.json'
+
+# 無音とみなす音量と、切り詰めた後に残す無音（秒）
+SILENCE_THRESHOLD = '-50dB'
+SILENCE_KEEP = 0.05
+LOUDNESS = 'loudnorm=I=-16:TP=-1.5:LRA=11'
+
+CODECS = {
+    'mp3': {'ext': '.mp3', 'args': ['-c:a', 'libmp3lame', '-b:a', '40k', '-ar', '24000']},
+    'opus': {'ext': '.opus', 'args': ['-c:a', 'libopus', '-b:a', '24k', '-application', 'voip', '-ar', '48000']},
+}
+
+
+def audio_filter():
+    trim = (f'silenceremove=start_periods=1:start_threshold={SILENCE_THRESHOLD}'
+            f':start_silence={SILENCE_KEEP}')
+    # 末尾の無音は反転してから先頭として切り詰める
+    return f'{trim},areverse,{trim},areverse,{LOUDNESS}'
+
+
+def transcode(src_path, out_path, codec):
+    """ffmpeg で1ファイルを変換する（スレッドプールで実行される）。(出力のバイト数, 秒数) を返す"""
+    start = time.perf_counter()
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_name(f'.{out_path.stem}.{os.getpid()}.{threading.get_ident()}{out_path.suffix}')
+    cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y', '-i', str(src_path),
+           '-af', audio_filter(), '-ac', '1', '-map_metadata', '-1', *CODECS[codec]['args'], str(tmp_path)]
+    try:
+        subprocess.run(cmd, check=True, capture_output=True)
+        os.replace(tmp_path, out_path)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(e.stderr.decode('utf-8', 'replace').strip() or f'ffmpeg の終了コード {e.returncode}')
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return out_path.stat().st_size, time.perf_counter() - start
+
+
+def normalize_ref(ref):
+    """story.json の voice の参照（voice\\001_....mp3）を public/ からの相対パスにする"""
+    return str(ref).replace('\\', '/').lstrip('/')
+
+
+def story_refs(story):
+    """[(章の番号, voice の参照)] を story.json に出てくる順に返す"""
+    refs = []
+    for i, chapter in enumerate(story.get('chapters') or []):
+        for dialogue in chapter.get('dialogues') or []:
+            for ref in dialogue.get('voice') or []:
+                refs.append((i, ref))
+    return refs
+
+
+def rewrite_story_refs(text, replacements):
+    """story.json の文字列中の voice の参照を置き換える（他の部分の書式はそのまま残す）"""
+    for old, new in replacements.items():
+        text = text.replace(json.dumps(old, ensure_ascii=False), json.dumps(new, ensure_ascii=False))
+    return text
+
+
+class VoiceManifest:
+    """.voice_store/<出力先>/manifest.json: 元のファイル → 変換結果の記録"""
+
+    def __init__(self, out, public_dir=PUBLIC_DIR, store_dir=STORE_DIR):
+        self.path = Path(store_dir) / out / MANIFEST_NAME
+        self.legacy_path = Path(public_dir) / out / LEGACY_MANIFEST_NAME
+        self.files = {}
+        for path in (self.path, self.legacy_path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.files = json.load(f).get('files', {})
+                break
+            except (OSError, ValueError):
+                continue
+        self.by_output = {entry['output']: name for name, entry in self.files.items()}
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'files': dict(sorted(self.files.items()))}, f, ensure_ascii=False, indent=2)
+        if self.legacy_path.exists():
+            self.legacy_path.unlink()
+
+    def original_name(self, rel):
+        """参照（元のファイルか変換後のファイル）から元のファイルの名前を返す"""
+        return self.by_output.get(rel, Path(rel).name)
+
+
+def find_source(name, public_dir, source_dir, voice_dir):
+    for path in (source_dir / name, public_dir / voice_dir / name):
+        if path.is_file():
+            return path
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ボイスを低ビットレートに変換し、音量を揃えて無音を切り詰めます')
+    parser.add_argument('--story', default='public/story.json', help='voice を参照している story.json')
+    parser.add_argument('--codec', choices=sorted(CODECS), default='mp3', help='変換先の形式 (既定: mp3)')
+    parser.add_argument('--out', default='voice/enc', help='public/ からの出力先 (既定: voice/enc)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 4, help='同時に実行する ffmpeg の数')
+    parser.add_argument('--force', action='store_true', help='変わっていないファイルも変換し直す')
+    parser.add_argument('--move-sources', action='store_true',
+                        help=f'変換した元のファイルを {SOURCE_DIR}/ に移して配信対象から外す')
+    parser.add_argument('--report', help='章ごとの集計を JSON で保存するパス')
+    add_stats_arguments(parser)
+    args = parser.parse_args()
+
+    if not shutil.which('ffmpeg'):
+        print("エラー: ffmpeg が見つかりません (https://ffmpeg.org/ からインストールしてください)")
+        sys.exit(1)
+
+    start_stats('transcode_voice', args)
+    story_path = Path(args.story)
+    story_text = story_path.read_text(encoding='utf-8')
+    story = json.loads(story_text.lstrip('﻿'))
+    refs = story_refs(story)
+    manifest = VoiceManifest(args.out)
+    settings = {'codec': args.codec, 'filter': audio_filter(), 'args': CODECS[args.codec]['args']}
+
+    # 参照ごとに元のファイルを決める（同じファイルは1回だけ変換する）
+    jobs = {}
+    missing = []
+    for _, ref in refs:
+        name = manifest.original_name(normalize_ref(ref))
+        if name in jobs:
+            continue
+        src = find_source(name, PUBLIC_DIR, SOURCE_DIR, 'voice')
+        if src is None:
+            missing.append(ref)
+            continue
+        out_rel = f"{args.out}/{Path(name).stem}{CODECS[args.codec]['ext']}"
+        jobs[name] = (src, out_rel)
+    for ref in missing:
+        print(f"  警告: 元のファイルがありません: {ref}")
+
+    futures = {}
+    reused = failed = 0
+    with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+        for name, (src, out_rel) in jobs.items():
+            with STATS.timer('hash'):
+                digest = file_sha256(src)
+            entry = manifest.files.get(name)
+            if (not args.force and entry and entry['sha256'] == digest and entry['settings'] == settings
+                    and entry['output'] == out_rel and (PUBLIC_DIR / out_rel).exists()):
+                reused += 1
+                continue
+            manifest.files[name] = {'sha256': digest, 'settings': settings, 'output': out_rel,
+                                    'src_bytes': src.stat().st_size}
+            futures[executor.submit(transcode, src, PUBLIC_DIR / out_rel, args.codec)] = name
+        STATS.expect(len(futures))
+
+        for future in as_completed(futures):
+            name = futures[future]
+            STATS.progress('ボイス')
+            try:
+                size, seconds = future.result()
+            except Exception as e:
+                failed += 1
+                del manifest.files[name]
+                print(f"  ✗ 変換に失敗: {name} - {e}")
+                continue
+            STATS.add_time('transcode', seconds)
+            manifest.files[name]['out_bytes'] = size
+            log(f"  {name}: {manifest.files[name]['src_bytes'] // 1024} KB -> {size // 1024} KB")
+    manifest.save()
+
+    # story.json の参照を変換後のファイルに書き換える
+    replacements = {}
+    for _, ref in refs:
+        name = manifest.original_name(normalize_ref(ref))
+        entry = manifest.files.get(name)
+        if entry and normalize_ref(ref) != entry['output']:
+            # 元の参照の区切り文字（\ か /）に合わせる
+            sep = '\\' if '\\' in ref else '/'
+            replacements[ref] = entry['output'].replace('/', sep)
+    if replacements:
+        with STATS.timer('write'):
+            atomic_write_text(story_path, rewrite_story_refs(story_text, replacements))
+        print(f"✓ {story_path}: voice の参照を {len(replacements)} 件書き換えました")
+
+    if args.move_sources:
+        SOURCE_DIR.mkdir(exist_ok=True)
+        moved = 0
+        for name, (src, _) in jobs.items():
+            if name in manifest.files and src.parent != SOURCE_DIR:
+                shutil.move(str(src), SOURCE_DIR / name)
+                moved += 1
+        print(f"✓ 元のファイル {moved} 件を {SOURCE_DIR}/ に移しました")
+
+    # 章ごとの集計
+    chapters = {}
+    for index, ref in refs:
+        entry = manifest.files.get(manifest.original_name(normalize_ref(ref)))
+        if not entry or 'out_bytes' not in entry:
+            continue
+        title = story['chapters'][index].get('title', '')
+        c = chapters.setdefault(index, {'chapter': index, 'title': title, 'voices': 0, 'src_bytes': 0, 'out_bytes': 0})
+        c['voices'] += 1
+        c['src_bytes'] += entry['src_bytes']
+        c['out_bytes'] += entry['out_bytes']
+    for c in chapters.values():
+        c['saved_bytes'] = c['src_bytes'] - c['out_bytes']
+        print(f"  {c['title']}: {c['voices']} 件 {c['src_bytes'] / 1024 / 1024:.1f} MB -> "
+              f"{c['out_bytes'] / 1024 / 1024:.1f} MB ({c['saved_bytes'] // 1024} KB 削減)")
+
+    src_total = sum(c['src_bytes'] for c in chapters.values())
+    out_total = sum(c['out_bytes'] for c in chapters.values())
+    print(f"✓ 変換 {len(futures) - failed} 件 / 変更なし {reused} 件 / 失敗 {failed} 件"
+          f"  {src_total / 1024 / 1024:.1f} MB -> {out_total / 1024 / 1024:.1f} MB")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'settings': settings, 'chapters': list(chapters.values())}, f, ensure_ascii=False, indent=2)
+        print(f"✓ 章ごとの集計を保存: {args.report}")
+    finish_stats(args)
+    sys.exit(0 if failed == 0 else 1)
+
+
+if __name__ == '__main__':
+    main()